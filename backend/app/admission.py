@@ -0,0 +1,247 @@
+"""
+요청 수용 제어(admission control) / 부하 차단
+- 엔드포인트 그룹(게이트)별 동시 처리 수와 대기열 길이를 제한하는 순수 ASGI 미들웨어
+  - 동시 처리 수가 차면 대기열에서 순서대로(FIFO) 기다리고, 대기열도 차면 즉시 429 + Retry-After
+  - 대기 시간이 ADMISSION_QUEUE_TIMEOUT 또는 클라이언트 기한을 넘으면 503 + Retry-After
+- 클라이언트 기한: X-Request-Timeout 헤더(초). 수용 이후에는 contextvar로 핸들러에 전달되어
+  LLM 업스트림 호출 타임아웃 등을 남은 시간으로 줄이는 데 쓰인다(remaining_seconds).
+- 게이트에 속하지 않는 경로(health/metrics/series 등)와 결과 캐시에 이미 있는 /qa 질문은 대기열을 거치지 않는다.
+- 게이트 상태는 워커 프로세스(이벤트 루프)별이다. 멀티 워커 배포 시 한도는 워커당 값이다.
+"""
+
+import asyncio
+import json
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from .metrics import ADMISSION_TOTAL, ADMISSION_WAITING, STAGE_SECONDS
+from .settings import settings
+
+
+DEADLINE_HEADER = b"x-request-timeout"
+
+_deadline: ContextVar[Optional[float]] = ContextVar("monchat_deadline", default=None)
+
+
+def remaining_seconds(default: Optional[float] = None) -> Optional[float]:
+    """현재 요청 기한까지 남은 시간(초, 0 이상). 기한이 없으면 default"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return default
+    return max(0.0, deadline - time.monotonic())
+
+
+def cap_timeout(timeout: float) -> float:
+    """설정 타임아웃을 요청 기한 이내로 줄인 값(기한이 이미 지났으면 TimeoutError)"""
+    left = remaining_seconds()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise TimeoutError("request deadline exceeded")
+    return min(timeout, left)
+
+
+class Gate:
+    """동시 처리 수 + 대기열 길이 제한(이벤트 루프 단일 스레드에서만 사용)"""
+
+    def __init__(self, name: str, limit: int, queue: int) -> None:
+        self.name = name
+        self.limit = max(1, limit)
+        self.queue = max(0, queue)
+        self.active = 0
+        self._waiters: "deque[asyncio.Future]" = deque()
+        # 처리 시간 지수 이동 평균(초): Retry-After 추정용
+        self._service_ewma = 1.0
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for f in self._waiters if not f.done())
+
+    async def acquire(self, timeout: float) -> str:
+        """'ok' | 'full'(대기열 초과) | 'timeout'(대기 시간 초과)"""
+        if self.active < self.limit and not self.waiting:
+            self.active += 1
+            return "ok"
+        if self.waiting >= self.queue or timeout <= 0:
+            return "full" if self.waiting >= self.queue else "timeout"
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        ADMISSION_WAITING.labels(gate=self.name).inc()
+        try:
+            # release()가 슬롯을 그대로 넘겨주므로 깨어난 요청은 active를 다시 올리지 않는다.
+            await asyncio.wait_for(fut, timeout)
+            return "ok"
+        except asyncio.TimeoutError:
+            # 타임아웃과 슬롯 인계가 같은 루프 틱에 겹치면 이미 받은 슬롯을 사용한다.
+            return "ok" if fut.done() and not fut.cancelled() else "timeout"
+        except asyncio.CancelledError:
+            # 대기 중 연결 종료: 인계받은 슬롯이 있으면 다음 대기자에게 넘긴다.
+            if fut.done() and not fut.cancelled():
+                self.release()
+            raise
+        finally:
+            ADMISSION_WAITING.labels(gate=self.name).dec()
+            try:
+                self._waiters.remove(fut)
+            except ValueError:
+                pass
+
+    def release(self, service_seconds: Optional[float] = None) -> None:
+        if service_seconds is not None:
+            self._service_ewma = 0.8 * self._service_ewma + 0.2 * service_seconds
+        while self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self.active -= 1
+
+    def retry_after(self) -> int:
+        """대기열이 비워질 때까지의 추정 시간(초, 최소 1)"""
+        backlog = self.waiting + self.active
+        return max(1, int(round(self._service_ewma * backlog / self.limit)))
+
+
+def _parse_deadline(scope) -> Optional[float]:
+    for name, value in scope.get("headers", ()):
+        if name == DEADLINE_HEADER:
+            try:
+                seconds = float(value.decode("latin-1"))
+            except ValueError:
+                return None
+            return time.monotonic() + seconds if seconds > 0 else None
+    return None
+
+
+def _qa_cached(body: bytes) -> bool:
+    """/qa 요청 본문의 질문이 결과 캐시에 있는지(세대 번호 재조회 없이 메모리만 확인)"""
+    from .qa_cache import get_qa_cache
+    from .routers.qa import QARequest, qa_cache_key
+
+    cache = get_qa_cache()
+    if cache is None:
+        return False
+    try:
+        # 질문 분석(상대 시간/호스트) 결과까지 반영해야 핸들러와 같은 키가 된다.
+        key = qa_cache_key(QARequest.model_validate_json(body))
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return False
+    return cache.peek(key)
+
+
+def default_gates() -> list[tuple[str, Gate, Optional[Callable[[bytes], bool]]]]:
+    """(경로 접두사, 게이트, 캐시 우회 판정 함수) 목록. 경로는 긴 접두사부터 비교한다.
+
+    비동기 /qa 경로(/qa/async, QA_ASYNC=true면 /qa도)는 스레드 풀을 점유하지 않으므로 별도 게이트(qa_async)를 쓴다.
+    """
+    qa = Gate("qa", settings.ADMISSION_QA_CONCURRENCY, settings.ADMISSION_QA_QUEUE)
+    qa_async = Gate("qa_async", settings.ADMISSION_QA_ASYNC_CONCURRENCY, settings.ADMISSION_QA_ASYNC_QUEUE)
+    llm = Gate("llm_chat", settings.ADMISSION_LLM_CONCURRENCY, settings.ADMISSION_LLM_QUEUE)
+    return [
+        ("/qa/batch", qa, None),
+        ("/qa/async", qa_async, _qa_cached),
+        ("/qa", qa_async if settings.QA_ASYNC else qa, _qa_cached),
+        ("/llm/chat", llm, None),
+    ]
+
+
+class AdmissionMiddleware:
+    """게이트 경로 요청에 수용 제어를 적용하는 ASGI 미들웨어"""
+
+    def __init__(self, app, gates=None) -> None:
+        self.app = app
+        self.gates = sorted(gates if gates is not None else default_gates(), key=lambda g: -len(g[0]))
+
+    def _match(self, path: str):
+        for prefix, gate, probe in self.gates:
+            if path == prefix or path.startswith(prefix + "/"):
+                return gate, probe
+        return None, None
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        gate, probe = self._match(scope["path"])
+        if gate is None:
+            await self.app(scope, receive, send)
+            return
+
+        deadline = _parse_deadline(scope)
+        if probe is not None:
+            body = await _read_body(receive)
+            receive = _replay(body, receive)
+            if probe(body):
+                ADMISSION_TOTAL.labels(gate=gate.name, result="bypass").inc()
+                await self._call(scope, receive, send, deadline)
+                return
+
+        wait = settings.ADMISSION_QUEUE_TIMEOUT
+        if deadline is not None:
+            wait = min(wait, deadline - time.monotonic())
+        t0 = time.perf_counter()
+        result = await gate.acquire(wait)
+        STAGE_SECONDS.labels(endpoint=gate.name, stage="queue").observe(time.perf_counter() - t0)
+        if result != "ok":
+            ADMISSION_TOTAL.labels(gate=gate.name, result=f"rejected_{result}").inc()
+            await _reject(send, 429 if result == "full" else 503, gate, result)
+            return
+
+        ADMISSION_TOTAL.labels(gate=gate.name, result="admitted").inc()
+        started = time.perf_counter()
+        try:
+            await self._call(scope, receive, send, deadline)
+        finally:
+            gate.release(time.perf_counter() - started)
+
+    async def _call(self, scope, receive, send, deadline: Optional[float]) -> None:
+        token = _deadline.set(deadline)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _deadline.reset(token)
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+
+def _replay(body: bytes, receive):
+    """이미 읽은 본문을 한 번 돌려준 뒤에는 원래 receive(연결 종료 감지 등)로 위임"""
+    sent = False
+
+    async def replay():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return replay
+
+
+async def _reject(send, status: int, gate: Gate, reason: str) -> None:
+    detail = "queue full" if reason == "full" else "queue wait timed out"
+    body = json.dumps({"detail": f"{gate.name} overloaded: {detail}", "gate": gate.name}).encode("utf-8")
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("ascii")),
+                (b"retry-after", str(gate.retry_after()).encode("ascii")),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
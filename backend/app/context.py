@@ -0,0 +1,262 @@
+"""
+LLM 프롬프트용 검색 결과 컨텍스트 압축
+- /qa 결과 행은 ts나 지표 1개만 다른 근사 중복이 많아, 그대로 붙이면 프롬프트 토큰(=생성 지연)만 늘어난다.
+- 압축 단계
+  1) 'key=value' 행 파싱(로그 라인 'YYYYMMDD HHMMSS host message' 포함)
+  2) 잡음 제거: 빈 값(ts= 등), 정상 상태값(OK/UP/NORMAL), Hostname이 있는 행의 IP,
+     모든 행에서 값이 같은 필드(머리글 1줄로 올림)
+  3) 근사 중복 병합: 같은 필드 구성에서 값이 최대 1개 수치 필드(지표)만 다른 행을 한 줄로 묶는다.
+     메시지/심각도 등 문자열 값이 다른 행은 별도 줄로 남긴다.
+     → "N occurrences between t1–t2 on hosts h1,h2: ... CPU_Usage=24~81"
+  4) 토큰 예산: 검색 순위(첫 등장 순) 그대로 예산 안에 드는 줄까지만 싣고 나머지는 생략 줄로 표시
+- 토큰 수는 토크나이저 없이 추정한다(ASCII 4자당 1토큰, 한글 등 비ASCII 1자당 1토큰).
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Optional, Union
+
+from .settings import settings
+
+
+_KV_SPLIT = re.compile(r"\s+(?=[A-Za-z_][A-Za-z0-9_()/]*=)")
+_LOG_LINE = re.compile(r"^﻿?(\d{8})\s+(\d{6})\s+(\S+)\s+(.*)$")
+_TS_KEYS = ("ts", "YYYYMMDDHHmmss", "YYYYMMDDHHMMSS")
+_HOST_KEYS = ("Hostname", "HOSTNAME", "host")
+_OK_STATES = {"OK", "UP", "NORMAL"}
+# 호스트 목록 표시 상한(초과분은 +N으로 표시)
+_MAX_HOSTS = 5
+
+
+def estimate_tokens(text: str) -> int:
+    """프롬프트 토큰 수 추정(ASCII 4자당 1토큰 + 비ASCII 1자당 1토큰)"""
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+@dataclass
+class CompactResult:
+    text: str
+    rows_in: int
+    lines_out: int
+    tokens_before: int
+    tokens_after: int
+    # 토큰 예산 초과로 생략한 줄 수
+    dropped: int
+
+    def stats(self) -> dict:
+        return {
+            "rows_in": self.rows_in,
+            "lines_out": self.lines_out,
+            "tokens_before": self.tokens_before,
+            "tokens_after": self.tokens_after,
+            "dropped": self.dropped,
+        }
+
+
+def _parse(text: str) -> tuple[Optional[datetime], str, dict]:
+    """(시각, 호스트, 나머지 필드). key=value 형식이 아니면 필드 {'text': 원문}"""
+    m = _LOG_LINE.match(text)
+    if m:
+        d, t, host, msg = m.groups()
+        try:
+            ts = datetime.strptime(d + t, "%Y%m%d%H%M%S")
+        except ValueError:
+            ts = None
+        return ts, host, {"type": "log", "Event_Message": msg}
+    if "=" not in text:
+        return None, "", {"text": text.strip()}
+    fields: dict = {}
+    for part in _KV_SPLIT.split(text.strip()):
+        key, sep, value = part.partition("=")
+        if sep:
+            fields[key.lstrip("﻿")] = value.strip()
+        elif fields:
+            # 'key=' 앞 구분이 안 되는 꼬리 텍스트는 직전 값에 붙인다.
+            last = next(reversed(fields))
+            fields[last] = f"{fields[last]} {part}".strip()
+    ts = None
+    raw_ts = next((fields.pop(k) for k in _TS_KEYS if k in fields and fields[k]), "")
+    for k in _TS_KEYS:
+        fields.pop(k, None)
+    if raw_ts:
+        try:
+            ts = datetime.strptime(str(raw_ts)[:14], "%Y%m%d%H%M%S")
+        except ValueError:
+            fields["ts"] = raw_ts
+    host = next((fields.pop(k) for k in _HOST_KEYS if fields.get(k)), "")
+    if host:
+        fields.pop("IP", None)
+    # 빈 값/정상 상태값은 정보가 없으므로 제거
+    return ts, host, {k: v for k, v in fields.items() if v and v.upper() not in _OK_STATES}
+
+
+def _to_number(value: str) -> Optional[float]:
+    try:
+        return float(value.rstrip("%"))
+    except ValueError:
+        return None
+
+
+def _format_num(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else f"{v:.1f}"
+
+
+class _Group:
+    """근사 중복 행 묶음: 기준 필드 + (선택) 값이 달라지는 수치 필드 1개"""
+
+    def __init__(self, ts: Optional[datetime], host: str, fields: dict) -> None:
+        self.fields = fields
+        self.varying: Optional[str] = None
+        self.values: list[str] = []
+        self.count = 1
+        self.first = self.last = ts
+        self.hosts: dict[str, None] = {host: None} if host else {}
+
+    def add(self, ts: Optional[datetime], host: str, fields: dict, varying: Optional[str]) -> None:
+        if varying is not None:
+            if self.varying is None:
+                self.varying = varying
+                self.values.append(self.fields[varying])
+            self.values.append(fields[varying])
+        elif self.varying is not None:
+            self.values.append(fields[self.varying])
+        self.count += 1
+        if host:
+            self.hosts[host] = None
+        if ts is not None:
+            self.first = ts if self.first is None else min(self.first, ts)
+            self.last = ts if self.last is None else max(self.last, ts)
+
+    def _varying_text(self) -> str:
+        nums = [_to_number(v) for v in self.values]
+        lo, hi = min(nums), max(nums)
+        return _format_num(lo) if lo == hi else f"{_format_num(lo)}~{_format_num(hi)}"
+
+    def render(self, common: dict) -> str:
+        if list(self.fields) == ["text"]:
+            body = self.fields["text"]
+        else:
+            body = " ".join(
+                f"{k}={self._varying_text() if k == self.varying else v}"
+                for k, v in self.fields.items()
+                if k not in common
+            )
+        hosts = list(self.hosts)
+        host_text = ",".join(hosts[:_MAX_HOSTS]) + (f",+{len(hosts) - _MAX_HOSTS}" if len(hosts) > _MAX_HOSTS else "")
+        if self.count == 1:
+            head = " ".join(x for x in (_format_ts(self.first), host_text) if x)
+            return f"{head}: {body}" if head and body else head or body
+        when = _format_span(self.first, self.last)
+        head = f"{self.count} occurrences" + (f" between {when}" if when else "")
+        if host_text:
+            head += f" on hosts {host_text}" if len(hosts) > 1 else f" on host {host_text}"
+        return f"{head}: {body}" if body else head
+
+
+def _format_ts(ts: Optional[datetime]) -> str:
+    return ts.strftime("%Y-%m-%d %H:%M") if ts else ""
+
+
+def _format_span(first: Optional[datetime], last: Optional[datetime]) -> str:
+    if first is None:
+        return ""
+    if last is None or last == first:
+        return _format_ts(first)
+    end = last.strftime("%H:%M") if last.date() == first.date() else _format_ts(last)
+    return f"{_format_ts(first)}–{end}"
+
+
+def _signature(fields: dict, skip: Optional[str] = None) -> tuple:
+    return tuple((k, None if k == skip else v) for k, v in fields.items())
+
+
+def _group_rows(parsed: list[tuple[Optional[datetime], str, dict]]) -> list[_Group]:
+    """값이 최대 1개 수치 필드만 다른 행을 첫 등장 순서대로 묶는다(행 수 x 필드 수)"""
+    groups: list[_Group] = []
+    exact: dict[tuple, _Group] = {}
+    # 수치 필드 1개를 가린 서명 → 그 필드 값이 달라도 합칠 수 있는 그룹
+    masked: dict[tuple, _Group] = {}
+    for ts, host, fields in parsed:
+        sig = _signature(fields)
+        group = exact.get(sig)
+        if group is not None:
+            group.add(ts, host, fields, None)
+            continue
+        numeric = [k for k, v in fields.items() if _to_number(v) is not None]
+        joined = False
+        for k in numeric:
+            group = masked.get(_signature(fields, k))
+            if group is not None and group.varying in (None, k):
+                group.add(ts, host, fields, k)
+                joined = True
+                break
+        if joined:
+            continue
+        group = _Group(ts, host, fields)
+        groups.append(group)
+        exact[sig] = group
+        for k in numeric:
+            masked.setdefault(_signature(fields, k), group)
+    return groups
+
+
+def _content(row: Union[str, dict]) -> str:
+    if isinstance(row, dict):
+        return str(row.get("content") or "")
+    return str(row)
+
+
+def compact_rows(
+    rows: Iterable[Union[str, dict]],
+    budget_tokens: Optional[int] = None,
+) -> CompactResult:
+    """검색 결과 행(문자열 또는 /qa answers 항목)을 토큰 예산 안의 컨텍스트 텍스트로 압축
+
+    Args:
+        rows: 검색 순위 순 행 목록(dict면 content 필드 사용)
+        budget_tokens: 컨텍스트 토큰 상한(None이면 LLM_CONTEXT_TOKEN_BUDGET, 0 이하면 무제한)
+    """
+    texts = [t for t in (_content(r) for r in rows) if t.strip()]
+    budget = settings.LLM_CONTEXT_TOKEN_BUDGET if budget_tokens is None else budget_tokens
+    tokens_before = estimate_tokens("\n".join(texts))
+    parsed = [_parse(t) for t in texts]
+
+    # 모든 행에서 같은 값인 필드는 머리글로 한 번만 표시(행이 2개 이상일 때)
+    common: dict = {}
+    if len(parsed) > 1:
+        first = parsed[0][2]
+        common = {
+            k: v for k, v in first.items() if k != "text" and all(p[2].get(k) == v for p in parsed[1:])
+        }
+    lines = [g.render(common) for g in _group_rows(parsed)]
+    header = ("common: " + " ".join(f"{k}={v}" for k, v in common.items())) if common else ""
+
+    out: list[str] = [header] if header else []
+    used = estimate_tokens(header)
+    dropped = 0
+    for i, line in enumerate(lines):
+        cost = estimate_tokens(line) + 1
+        if budget > 0 and used + cost > budget:
+            dropped = len(lines) - i
+            out.append(f"... (+{dropped} more lines omitted)")
+            break
+        out.append(line)
+        used += cost
+    text = "\n".join(out)
+    return CompactResult(
+        text=text,
+        rows_in=len(texts),
+        lines_out=len(lines) - dropped,
+        tokens_before=tokens_before,
+        tokens_after=estimate_tokens(text),
+        dropped=dropped,
+    )
+
+
+def build_prompt(prompt: str, context: str) -> str:
+    """컨텍스트 블록 + 사용자 질문 형태의 단일 턴 프롬프트"""
+    if not context:
+        return prompt
+    return f"다음은 검색된 모니터링 데이터입니다.\n<context>\n{context}\n</context>\n\n{prompt}"
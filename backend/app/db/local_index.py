@@ -0,0 +1,259 @@
+"""
+로컬 벡터 인덱스(pgvector 미사용 환경용)
+- ETL이 (일자, 소스) 단위 샤드로 임베딩을 저장하고, API는 파일을 메모리 매핑(np.memmap)하여 검색한다.
+- 샤드 파일 구성(LOCAL_INDEX_DIR/<YYYYMMDD>_<feed>.*):
+  - .f16     : L2 정규화된 float16 행렬(count x dim, row-major). 코사인 유사도 = 내적
+  - .meta    : 행별 메타데이터 JSON(UTF-8)을 이어 붙인 파일
+  - .offsets : .meta 내 행별 시작 오프셋(uint64, count+1개) → i번째 행 = meta[off[i]:off[i+1]]
+  - .json    : 헤더(dim/count/dtype/model). 마지막에 원자적으로 교체되므로 헤더가 있으면 샤드가 완성된 것
+  - .hnsw    : (선택) hnswlib 그래프. LOCAL_INDEX_HNSW=true이고 hnswlib가 설치된 경우에만 생성/사용
+- 로딩은 헤더 읽기 + memmap 뿐이라 기동/리로드 비용이 거의 없다. 검색은 블록 단위 float32 변환 후 행렬곱.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+from ..settings import settings
+from ..tracing import span
+
+
+# 검색 시 float16 → float32 변환 블록 크기(행): 메모리 사용량 상한
+_BLOCK_ROWS = 65536
+
+
+def _shard_name(day: str, feed: str) -> str:
+    return f"{day}_{feed}"
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def write_shard(
+    day: str,
+    feed: str,
+    texts: list[str],
+    vectors,
+    base_dir: Optional[Union[str, Path]] = None,
+) -> Path:
+    """(일자, 소스) 샤드를 기록(기존 샤드는 교체). 헤더 경로 반환"""
+    base = Path(base_dir or settings.LOCAL_INDEX_DIR)
+    base.mkdir(parents=True, exist_ok=True)
+    name = _shard_name(day, feed)
+    mat = np.asarray(vectors, dtype=np.float32)
+    if mat.ndim != 2 or len(mat) != len(texts):
+        raise ValueError(f"vectors shape {mat.shape} does not match {len(texts)} texts")
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    mat = (mat / np.maximum(norms, 1e-12)).astype(np.float16)
+
+    metas = [
+        json.dumps({"source": day, "feed": feed, "content": t}, ensure_ascii=False).encode("utf-8")
+        for t in texts
+    ]
+    offsets = np.zeros(len(metas) + 1, dtype=np.uint64)
+    if metas:
+        offsets[1:] = np.cumsum([len(m) for m in metas], dtype=np.uint64)
+
+    # 헤더를 먼저 지워 두어 교체 중인 샤드를 검색 측이 읽지 않도록 한다.
+    header_path = base / f"{name}.json"
+    if header_path.exists():
+        header_path.unlink()
+    _write_atomic(base / f"{name}.f16", mat.tobytes())
+    _write_atomic(base / f"{name}.meta", b"".join(metas))
+    _write_atomic(base / f"{name}.offsets", offsets.tobytes())
+    hnsw = _build_hnsw(base / f"{name}.hnsw", mat) if settings.LOCAL_INDEX_HNSW else False
+    header = {
+        "day": day,
+        "feed": feed,
+        "dim": int(mat.shape[1]) if mat.size else settings.EMBEDDING_DIM,
+        "count": int(len(texts)),
+        "dtype": "float16",
+        "model": settings.EMBEDDING_MODEL,
+        "hnsw": hnsw,
+    }
+    _write_atomic(header_path, json.dumps(header).encode("utf-8"))
+    return header_path
+
+
+def _build_hnsw(path: Path, mat: np.ndarray) -> bool:
+    """hnswlib 그래프 생성(미설치/빈 샤드면 생략)"""
+    try:
+        import hnswlib
+    except ImportError:
+        print("[LOCAL_INDEX] hnswlib is not installed, skip HNSW graph")
+        return False
+    if len(mat) == 0:
+        return False
+    index = hnswlib.Index(space="ip", dim=mat.shape[1])
+    index.init_index(max_elements=len(mat), ef_construction=200, M=16)
+    index.add_items(mat.astype(np.float32), np.arange(len(mat)))
+    tmp = path.with_name(path.name + ".tmp")
+    index.save_index(str(tmp))
+    os.replace(tmp, path)
+    return True
+
+
+def drop_old_shards(retention_days: Optional[int] = None, base_dir: Optional[Union[str, Path]] = None) -> list[str]:
+    """보존 기간(기본 ETL_DAYS)보다 오래된 일자 샤드 파일 삭제"""
+    base = Path(base_dir or settings.LOCAL_INDEX_DIR)
+    if not base.exists():
+        return []
+    days = settings.ETL_DAYS if retention_days is None else retention_days
+    cutoff = (datetime.now().date() - timedelta(days=days - 1)).strftime("%Y%m%d")
+    dropped = []
+    for header in base.glob("*.json"):
+        day = header.stem.split("_", 1)[0]
+        if len(day) == 8 and day.isdigit() and day < cutoff:
+            for suffix in (".json", ".f16", ".meta", ".offsets", ".hnsw"):
+                p = header.with_suffix(suffix)
+                if p.exists():
+                    p.unlink()
+            dropped.append(header.stem)
+    return dropped
+
+
+class _Shard:
+    """메모리 매핑된 샤드 1개"""
+
+    def __init__(self, header_path: Path) -> None:
+        self.header_path = header_path
+        self.mtime = header_path.stat().st_mtime
+        header = json.loads(header_path.read_text(encoding="utf-8"))
+        self.day: str = header["day"]
+        self.feed: str = header["feed"]
+        self.count: int = header["count"]
+        self.dim: int = header["dim"]
+        base = header_path.with_suffix("")
+        if self.count:
+            self.vectors = np.memmap(f"{base}.f16", dtype=np.float16, mode="r", shape=(self.count, self.dim))
+            self.offsets = np.memmap(f"{base}.offsets", dtype=np.uint64, mode="r", shape=(self.count + 1,))
+        else:
+            self.vectors = np.zeros((0, self.dim), dtype=np.float16)
+            self.offsets = np.zeros(1, dtype=np.uint64)
+        self._meta_path = Path(f"{base}.meta")
+        self._hnsw = None
+        if header.get("hnsw") and settings.LOCAL_INDEX_HNSW:
+            self._hnsw = self._load_hnsw(Path(f"{base}.hnsw"))
+
+    def _load_hnsw(self, path: Path):
+        try:
+            import hnswlib
+        except ImportError:
+            return None
+        index = hnswlib.Index(space="ip", dim=self.dim)
+        index.load_index(str(path), max_elements=self.count)
+        index.set_ef(max(64, settings.LOCAL_INDEX_HNSW_EF))
+        return index
+
+    def top_k(self, q: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """(행 인덱스, 코사인 유사도) 상위 k개(유사도 내림차순)"""
+        k = min(k, self.count)
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        if self._hnsw is not None:
+            labels, distances = self._hnsw.knn_query(q[None, :], k=k)
+            # hnswlib ip 공간의 거리 = 1 - 내적
+            return labels[0].astype(np.int64), (1.0 - distances[0]).astype(np.float32)
+        best_idx = np.empty(0, dtype=np.int64)
+        best_score = np.empty(0, dtype=np.float32)
+        for start in range(0, self.count, _BLOCK_ROWS):
+            block = np.asarray(self.vectors[start:start + _BLOCK_ROWS], dtype=np.float32)
+            scores = block @ q
+            kk = min(k, len(scores))
+            part = np.argpartition(-scores, kk - 1)[:kk]
+            best_idx = np.concatenate([best_idx, part + start])
+            best_score = np.concatenate([best_score, scores[part]])
+            if len(best_idx) > k:
+                keep = np.argpartition(-best_score, k - 1)[:k]
+                best_idx, best_score = best_idx[keep], best_score[keep]
+        order = np.argsort(-best_score)
+        return best_idx[order], best_score[order]
+
+    def meta(self, i: int) -> dict:
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        with self._meta_path.open("rb") as f:
+            f.seek(start)
+            return json.loads(f.read(end - start))
+
+
+class LocalVectorIndex:
+    """LOCAL_INDEX_DIR의 샤드 집합. 헤더 변경(mtime) 시 해당 샤드만 다시 매핑한다."""
+
+    def __init__(self, base_dir: Optional[Union[str, Path]] = None) -> None:
+        self.base = Path(base_dir or settings.LOCAL_INDEX_DIR)
+        self._shards: dict[str, _Shard] = {}
+        self._lock = threading.Lock()
+
+    def refresh(self) -> None:
+        headers = {p.stem: p for p in self.base.glob("*.json")} if self.base.exists() else {}
+        with self._lock:
+            for name in list(self._shards):
+                if name not in headers:
+                    del self._shards[name]
+            for name, path in headers.items():
+                try:
+                    mtime = path.stat().st_mtime
+                except FileNotFoundError:
+                    continue
+                shard = self._shards.get(name)
+                if shard is None or shard.mtime != mtime:
+                    try:
+                        self._shards[name] = _Shard(path)
+                    except (OSError, ValueError, KeyError):
+                        # 교체 중인 샤드는 다음 조회에서 다시 시도
+                        self._shards.pop(name, None)
+
+    def search(
+        self,
+        query_vec,
+        top_k: int = 5,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+    ) -> list[dict]:
+        """코사인 유사도 상위 top_k 행(search_similar와 같은 형태: id/source/content/score)"""
+        from .vector import to_date
+
+        self.refresh()
+        lo = to_date(date_from).strftime("%Y%m%d") if date_from else None
+        hi = to_date(date_to).strftime("%Y%m%d") if date_to else None
+        q = np.asarray(query_vec, dtype=np.float32)
+        q = q / max(float(np.linalg.norm(q)), 1e-12)
+        candidates: list[tuple[float, _Shard, int]] = []
+        with span("local_index.search", top_k=top_k):
+            for shard in list(self._shards.values()):
+                if (lo and shard.day < lo) or (hi and shard.day > hi) or shard.dim != len(q):
+                    continue
+                idx, scores = shard.top_k(q, top_k)
+                candidates.extend((float(s), shard, int(i)) for i, s in zip(idx, scores))
+            candidates.sort(key=lambda c: -c[0])
+            rows = []
+            for score, shard, i in candidates[:top_k]:
+                meta = shard.meta(i)
+                rows.append(
+                    {
+                        "id": f"{shard.day}_{shard.feed}:{i}",
+                        "source": meta.get("source"),
+                        "content": meta.get("content"),
+                        "score": score,
+                    }
+                )
+        return rows
+
+
+_local_index: Optional[LocalVectorIndex] = None
+
+
+def get_local_index() -> LocalVectorIndex:
+    global _local_index
+    if _local_index is None:
+        _local_index = LocalVectorIndex()
+    return _local_index
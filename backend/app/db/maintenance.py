@@ -0,0 +1,280 @@
+"""
+VectorDB 유지보수 작업
+- 보존 기간 정리: ETL_DAYS보다 오래된 일자 파티션 DETACH/DROP, 레거시 테이블 잔여 행 배치 삭제
+- VACUUM (ANALYZE): 재적재(delete-then-insert)로 생긴 dead tuple 정리 및 플래너 통계 갱신
+- ANN 인덱스 재구성: 마지막 빌드 시점 대비 행 수 변화율(drift)이 VECTORDB_REINDEX_DRIFT를 넘으면
+  - ivfflat lists가 현재 행 수에 맞지 않으면 새 lists로 CREATE INDEX CONCURRENTLY 후 교체
+  - 그 외에는 REINDEX INDEX CONCURRENTLY (중심점 재계산)
+  (이전 버전은 빈 파티션에 인덱스를 미리 만들었으므로 그런 인덱스는 빌드 기록이 없어 최초 실행 시 재구성된다)
+- ANN 인덱스가 없는 적재된 파티션(적재 경로 밖에서 행이 들어온 경우 등)에는 행 수에 맞는 lists로 인덱스를 만든다.
+- 실행 전/후 테이블·인덱스 크기와 프로브 질의 지연시간을 보고한다.
+
+CLI: python tools/vector_maintenance.py [--dry-run] [--force-reindex]
+"""
+
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from ..settings import settings
+from .vector import (
+    _STATS_TABLE,
+    _STORAGE_TYPES,
+    _record_build,
+    drop_old_partitions,
+    ensure_ann_index,
+    get_pg_connection,
+    ivfflat_lists,
+    list_partitions,
+    search_similar,
+    storage_type,
+)
+
+
+def _autocommit_connection():
+    # VACUUM / CREATE INDEX CONCURRENTLY / REINDEX CONCURRENTLY는 트랜잭션 블록 안에서 실행할 수 없다.
+    conn = get_pg_connection()
+    conn.autocommit = True
+    return conn
+
+
+def relation_sizes(cur) -> dict:
+    """documents 파티션별 행 수 추정치/테이블·인덱스 크기(byte)"""
+    out: dict = {"partitions": {}, "table_bytes": 0, "index_bytes": 0}
+    for name, _ in list_partitions(cur):
+        cur.execute(
+            "SELECT c.reltuples::bigint AS est_rows, pg_table_size(c.oid) AS table_bytes, "
+            "pg_indexes_size(c.oid) AS index_bytes FROM pg_class c WHERE c.relname = %s;",
+            (name,),
+        )
+        row = cur.fetchone()
+        if not row:
+            continue
+        out["partitions"][name] = dict(row)
+        out["table_bytes"] += int(row["table_bytes"])
+        out["index_bytes"] += int(row["index_bytes"])
+    return out
+
+
+def probe_latency(queries: Optional[int] = None, top_k: int = 5) -> Optional[dict]:
+    """최근 적재 문서의 임베딩을 질의 벡터로 사용해 search_similar 지연시간(ms) 측정"""
+    n = settings.MAINTENANCE_PROBE_QUERIES if queries is None else queries
+    if n <= 0:
+        return None
+    with get_pg_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT embedding::text AS vec FROM documents WHERE embedding IS NOT NULL "
+                "ORDER BY event_date DESC, id DESC LIMIT %s;",
+                (n,),
+            )
+            vecs = [r["vec"] for r in cur.fetchall()]
+    conn.close()
+    if not vecs:
+        return None
+    timings = []
+    for vec in vecs:
+        t0 = time.perf_counter()
+        search_similar(vec, top_k=top_k)
+        timings.append((time.perf_counter() - t0) * 1000.0)
+    return {
+        "queries": len(timings),
+        "p50_ms": round(statistics.median(timings), 2),
+        "max_ms": round(max(timings), 2),
+    }
+
+
+def _delete_legacy_rows(cur, cutoff, batch_size: int) -> int:
+    """이관 후 남은 documents_legacy(일반 테이블)의 보존 기간 밖 행을 배치 단위로 삭제"""
+    cur.execute("SELECT to_regclass('documents_legacy') IS NOT NULL AS present;")
+    if not cur.fetchone()["present"]:
+        return 0
+    total = 0
+    while True:
+        cur.execute(
+            "DELETE FROM documents_legacy WHERE ctid IN ("
+            "SELECT ctid FROM documents_legacy WHERE created_at < %s LIMIT %s);",
+            (cutoff, batch_size),
+        )
+        total += cur.rowcount
+        if cur.rowcount < batch_size:
+            return total
+
+
+def _index_state(cur, partition: str) -> list[dict]:
+    """파티션의 ANN 인덱스(ivfflat/hnsw) 목록과 마지막 빌드 시점 행 수"""
+    cur.execute(
+        "SELECT i.relname AS index_name, am.amname AS method, i.reloptions AS options, s.rows_at_build "
+        "FROM pg_index x JOIN pg_class i ON i.oid = x.indexrelid JOIN pg_class t ON t.oid = x.indrelid "
+        "JOIN pg_am am ON am.oid = i.relam LEFT JOIN vector_index_stats s ON s.index_name = i.relname "
+        "WHERE t.relname = %s AND am.amname IN ('ivfflat', 'hnsw');",
+        (partition,),
+    )
+    return [dict(r) for r in cur.fetchall()]
+
+
+def _current_lists(options) -> int:
+    for opt in options or []:
+        key, _, value = opt.partition("=")
+        if key == "lists":
+            return int(value)
+    return 100  # pgvector 기본값
+
+
+def _rebuild_ivfflat(cur, index_name: str, table: str, lists: int) -> None:
+    """새 lists로 인덱스를 동시 생성한 뒤 기존 인덱스와 교체(검색 중단 없음)"""
+    ops = _STORAGE_TYPES[storage_type()][1]
+    tmp = f"{index_name}_rebuild"
+    cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {tmp};")
+    cur.execute(
+        f"CREATE INDEX CONCURRENTLY {tmp} ON {table} USING ivfflat (embedding {ops}) WITH (lists = {lists});"
+    )
+    cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name};")
+    cur.execute(f"ALTER INDEX {tmp} RENAME TO {index_name};")
+
+
+def run_maintenance(
+    dry_run: bool = False,
+    force_reindex: bool = False,
+    vacuum: bool = True,
+    retention: Optional[bool] = None,
+) -> dict:
+    """보존 정리 → VACUUM ANALYZE → drift 기반 인덱스 재구성 실행 후 보고서 반환
+
+    - dry_run: 변경 없이 대상(삭제할 파티션, 재구성할 인덱스)만 보고
+    - force_reindex: drift와 무관하게 모든 ANN 인덱스 재구성
+    """
+    retention = settings.ETL_RETENTION_ENABLED if retention is None else retention
+    drift_limit = settings.VECTORDB_REINDEX_DRIFT
+    report: dict = {"dry_run": dry_run, "dropped": [], "legacy_deleted": 0, "vacuumed": [], "reindexed": []}
+    t_start = time.perf_counter()
+
+    conn = _autocommit_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(_STATS_TABLE)
+            report["before"] = relation_sizes(cur)
+    finally:
+        conn.close()
+    report["latency_before"] = probe_latency()
+
+    # 1) 보존 기간 정리
+    cutoff = datetime.now().date() - timedelta(days=settings.ETL_DAYS - 1)
+    if retention:
+        if dry_run:
+            # 파티션명 접미사(YYYYMMDD)가 보존 시작일보다 이전인 파티션
+            report["dropped"] = [
+                n for n in report["before"]["partitions"] if n.rsplit("_", 1)[-1] < cutoff.strftime("%Y%m%d")
+            ]
+        else:
+            report["dropped"] = drop_old_partitions(settings.ETL_DAYS)
+            conn = _autocommit_connection()
+            try:
+                with conn.cursor() as cur:
+                    report["legacy_deleted"] = _delete_legacy_rows(
+                        cur, cutoff, settings.MAINTENANCE_DELETE_BATCH
+                    )
+            finally:
+                conn.close()
+
+    conn = _autocommit_connection()
+    try:
+        with conn.cursor() as cur:
+            partitions = [n for n, _ in list_partitions(cur)]
+            for name in partitions:
+                if name in report["dropped"]:
+                    continue
+                # 2) dead tuple 정리 + 통계 갱신(정확한 행 수를 얻기 위해 인덱스 판단 전에 수행)
+                if vacuum and not dry_run:
+                    cur.execute(f"VACUUM (ANALYZE) {name};")
+                    report["vacuumed"].append(name)
+                cur.execute(f"SELECT count(*) AS n FROM {name};")
+                rows = int(cur.fetchone()["n"])
+                indexes = _index_state(cur, name)
+                if not indexes and rows > 0:
+                    # 적재 후 인덱스가 만들어지지 않은 파티션: 현재 행 수로 최초 빌드
+                    entry = {
+                        "index": f"idx_{name}_embedding",
+                        "rows": rows,
+                        "rows_at_build": None,
+                        "drift": None,
+                        "action": "build",
+                        "lists": ivfflat_lists(rows),
+                    }
+                    if not dry_run:
+                        t0 = time.perf_counter()
+                        ensure_ann_index(cur, name)
+                        entry["seconds"] = round(time.perf_counter() - t0, 2)
+                    report["reindexed"].append(entry)
+                    continue
+                # 3) drift 기반 인덱스 재구성
+                for idx in indexes:
+                    base = idx["rows_at_build"]
+                    if base is None:
+                        # 기록이 없으면 빈 파티션에서 만들어진 인덱스로 간주
+                        base = 0
+                    drift = abs(rows - base) / max(base, 1)
+                    if rows == 0 or (drift < drift_limit and not force_reindex):
+                        continue
+                    action = "reindex"
+                    lists = None
+                    if idx["method"] == "ivfflat":
+                        lists = _current_lists(idx["options"])
+                        wanted = ivfflat_lists(rows)
+                        # lists가 2배 이상 어긋나면 새 lists로 재생성, 아니면 중심점만 재계산
+                        if max(wanted, lists) / min(wanted, lists) >= 2:
+                            action, lists = "rebuild", wanted
+                    entry = {
+                        "index": idx["index_name"],
+                        "rows": rows,
+                        "rows_at_build": idx["rows_at_build"],
+                        "drift": round(drift, 3),
+                        "action": action,
+                        "lists": lists,
+                    }
+                    if not dry_run:
+                        t0 = time.perf_counter()
+                        if action == "rebuild":
+                            _rebuild_ivfflat(cur, idx["index_name"], name, lists)
+                        else:
+                            cur.execute(f"REINDEX INDEX CONCURRENTLY {idx['index_name']};")
+                        entry["seconds"] = round(time.perf_counter() - t0, 2)
+                        _record_build(cur, idx["index_name"], name, rows, lists)
+                    report["reindexed"].append(entry)
+            report["after"] = relation_sizes(cur)
+    finally:
+        conn.close()
+
+    report["latency_after"] = probe_latency() if not dry_run else report["latency_before"]
+    report["seconds"] = round(time.perf_counter() - t_start, 2)
+    return report
+
+
+def _mb(n: int) -> str:
+    return f"{n / (1024 * 1024):.1f}MB"
+
+
+def print_report(report: dict) -> None:
+    """유지보수 보고서 요약 출력"""
+    before, after = report["before"], report["after"]
+    tag = "[MAINT][dry-run]" if report["dry_run"] else "[MAINT]"
+    print(
+        f"{tag} size | table {_mb(before['table_bytes'])} -> {_mb(after['table_bytes'])}, "
+        f"index {_mb(before['index_bytes'])} -> {_mb(after['index_bytes'])}"
+    )
+    if report["dropped"]:
+        print(f"{tag} retention | dropped partitions: {', '.join(report['dropped'])}")
+    if report["legacy_deleted"]:
+        print(f"{tag} retention | deleted {report['legacy_deleted']} legacy rows")
+    if report["vacuumed"]:
+        print(f"{tag} vacuum | {len(report['vacuumed'])} partitions")
+    for e in report["reindexed"]:
+        print(
+            f"{tag} {e['action']} | {e['index']} rows={e['rows']} rows_at_build={e['rows_at_build']} "
+            f"drift={e['drift']}" + (f" lists={e['lists']}" if e["lists"] else "")
+        )
+    lb, la = report.get("latency_before"), report.get("latency_after")
+    if lb and la:
+        print(f"{tag} latency | p50 {lb['p50_ms']}ms -> {la['p50_ms']}ms, max {lb['max_ms']}ms -> {la['max_ms']}ms")
+    print(f"{tag} done | {report['seconds']}s")
@@ -2,15 +2,21 @@
 Oracle 연결 유틸리티 (싱글 인스턴스 + RAC 지원)
 - python-oracledb(thin) 사용: 별도 클라이언트 없이 동작, Windows 빌드 도구 불요
 - RAC의 경우 ADDRESS_LIST 기반 DSN을 생성하여 로드밸런싱/페일오버를 지원
+- oracledb는 실제 연결 시점에만 임포트한다(Oracle 미사용 실행의 기동 시간/메모리 절감).
 """
 
-import oracledb
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 from ..settings import settings
+from ..tracing import span
+
+if TYPE_CHECKING:
+    import oracledb
 
 
 def _build_single_dsn() -> str:
     """싱글 인스턴스용 DSN 문자열 생성"""
+    import oracledb
+
     return oracledb.makedsn(
         host=settings.ORACLE_HOST,
         port=settings.ORACLE_PORT,
@@ -49,11 +55,13 @@ def _build_rac_dsn() -> str:
     return description
 
 
-def get_oracle_connection() -> oracledb.Connection:
+def get_oracle_connection() -> "oracledb.Connection":
     """Oracle 연결 생성 (SINGLE/RAC 모드 모두 지원)
 
     python-oracledb는 기본 thin 모드로 동작하여 별도의 Instant Client가 필요 없다.
     """
+    import oracledb
+
     if settings.ORACLE_MODE.upper() == "RAC":
         dsn = _build_rac_dsn()
     else:
@@ -78,9 +86,10 @@ def fetch_table_rows_by_date(table_prefix: str, date_str: str) -> list[str]:
     table_name = f"{table_prefix}_{date_str}"
     sql = f"SELECT * FROM {table_name}"
     rows_text: list[str] = []
+    import oracledb
 
     try:
-        with get_oracle_connection() as conn:
+        with span("oracle.fetch", table=table_name), get_oracle_connection() as conn:
             with conn.cursor() as cur:
                 cur.execute(sql)
                 col_names = [d[0] for d in cur.description]
@@ -0,0 +1,237 @@
+"""
+스테이징 적재 + 파티션 교체(blue/green)
+- 일자 d의 재적재를 라이브 파티션(documents_YYYYMMDD)이 아닌 섀도 테이블(documents_YYYYMMDD_stage)에 한다.
+  섀도 테이블은 라이브 파티션의 기존 행을 복사해 시작하므로 (일자, 소스) 단위 재적재/체크포인트 규칙이 그대로 적용된다.
+- 적재가 끝나면 섀도 테이블에 일자 범위 CHECK 제약, PK/호스트 인덱스, ANN 인덱스(현재 행 수에 맞는 ivfflat lists)를
+  만들고 ANALYZE까지 마친 뒤(검색 측과 무관, 오래 걸려도 됨) 짧은 트랜잭션 하나로 교체한다.
+    DETACH 라이브 → DROP 라이브 → 섀도 테이블/인덱스 이름 변경 → ATTACH → 세대 증가 → COMMIT
+  ATTACH는 CHECK 제약으로 범위 검증을 생략하고, 부모 인덱스와 같은 인덱스가 이미 있으므로 인덱스도 새로 만들지 않는다.
+- 검색 측은 교체 전에는 이전 파티션 전체, 교체 후에는 인덱스/통계가 준비된 새 파티션 전체만 본다(적재 중간 상태 없음).
+- DETACH는 documents에 ACCESS EXCLUSIVE 잠금을 잡으므로 진행 중인 검색이 끝날 때까지 기다린다.
+  ETL_STAGING_LOCK_TIMEOUT(초)을 넘기면 검색을 막지 않도록 포기하고 ETL_STAGING_SWAP_RETRIES회까지 다시 시도한다.
+- 교체 전에 중단되면 섀도 테이블이 남아 다음 실행에서 이어서 적재/교체한다(보존 기간이 지나면 drop_old_partitions가 정리).
+- 같은 일자의 섀도 테이블은 하나이므로 준비 → 적재 → 교체 전체를 일자별 advisory lock(stage_lock)으로 직렬화한다.
+  ETL_JOBS의 소스별 잡이 같은 일자를 동시에 처리하면 뒤 잡은 앞 잡의 교체가 끝난 뒤 새 라이브 파티션에서 다시 시작한다.
+"""
+
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Iterator, Optional
+
+from ..settings import settings
+from .maintenance import _index_state
+from .vector import (
+    _STATS_TABLE,
+    _STORAGE_TYPES,
+    DateLike,
+    _record_build,
+    bump_generation,
+    get_pg_connection,
+    ivfflat_lists,
+    partition_name,
+    storage_type,
+    to_date,
+)
+
+
+# 생성 컬럼(host/ip)은 값을 넣을 수 없으므로 복사 시 제외한다.
+_COPY_COLUMNS = "id, source, feed, content, event_date, created_at, embedding, etl_chunk"
+
+
+def stage_name(day: DateLike) -> str:
+    """섀도 테이블명: documents_YYYYMMDD_stage"""
+    return f"{partition_name(day)}_stage"
+
+
+def _table_exists(cur, name: str) -> bool:
+    cur.execute("SELECT to_regclass(%s) IS NOT NULL AS found;", (name,))
+    return bool(cur.fetchone()["found"])
+
+
+@contextmanager
+def stage_lock(day: DateLike) -> Iterator[None]:
+    """일자별 스테이징 잠금(세션 advisory lock). 다른 실행이 같은 일자를 스테이징 중이면 끝날 때까지 기다린다.
+
+    잠금 전용 연결을 블록 동안 유지하며, 실행이 비정상 종료되면 연결이 끊기면서 잠금도 풀린다.
+    """
+    d = to_date(day)
+    stage = stage_name(d)
+    conn = get_pg_connection()
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_try_advisory_lock(hashtext(%s)) AS locked;", (stage,))
+            if not cur.fetchone()["locked"]:
+                print(f"[ETL] {d:%Y%m%d} | waiting for staging lock on {stage}")
+                t0 = time.perf_counter()
+                cur.execute("SELECT pg_advisory_lock(hashtext(%s));", (stage,))
+                print(f"[ETL] {d:%Y%m%d} | staging lock acquired after {time.perf_counter() - t0:.1f}s")
+        try:
+            yield
+        finally:
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_advisory_unlock(hashtext(%s));", (stage,))
+    finally:
+        conn.close()
+
+
+def _stage_indexes(stage: str, live: str) -> list[tuple[str, str, Optional[str]]]:
+    """[(섀도 인덱스명, 교체 후 인덱스명, CREATE INDEX SQL | None(PK))]"""
+    ops = _STORAGE_TYPES[storage_type()][1]
+    out: list[tuple[str, str, Optional[str]]] = [
+        # 부모의 PK/호스트 인덱스와 같은 정의여야 ATTACH가 새로 만들지 않고 연결만 한다.
+        (f"{stage}_pkey", f"{live}_pkey", None),
+        (
+            f"{stage}_host_event_date_idx",
+            f"{live}_host_event_date_idx",
+            f"CREATE INDEX IF NOT EXISTS {stage}_host_event_date_idx ON {stage} (host, event_date);",
+        ),
+        (
+            f"idx_{stage}_embedding",
+            f"idx_{live}_embedding",
+            # lists는 build_stage_indexes에서 행 수로 채운다.
+            f"CREATE INDEX IF NOT EXISTS idx_{stage}_embedding ON {stage} "
+            f"USING ivfflat (embedding {ops}) WITH (lists = {{lists}});",
+        ),
+    ]
+    if settings.VECTORDB_BINARY_QUANT:
+        out.append(
+            (
+                f"idx_{stage}_embedding_bq",
+                f"idx_{live}_embedding_bq",
+                f"CREATE INDEX IF NOT EXISTS idx_{stage}_embedding_bq ON {stage} "
+                f"USING hnsw ((binary_quantize(embedding)::bit({settings.EMBEDDING_DIM})) bit_hamming_ops);",
+            )
+        )
+    return out
+
+
+def prepare_stage(day: DateLike) -> tuple[str, bool]:
+    """섀도 테이블 준비. (테이블명, 이전 실행이 남긴 섀도 테이블 재사용 여부)
+
+    새로 만들 때는 라이브 파티션의 행(id 포함)을 복사한다. 적재 중에는 인덱스를 두지 않는다(교체 전에 일괄 생성).
+    """
+    d = to_date(day)
+    live, stage = partition_name(d), stage_name(d)
+    with get_pg_connection() as conn:
+        with conn.cursor() as cur:
+            if _table_exists(cur, stage):
+                print(f"[ETL] {d:%Y%m%d} | reuse staging table {stage}")
+                return stage, True
+            # 기본값(id 시퀀스 공유)/NOT NULL/생성 컬럼까지 documents와 같은 구조
+            cur.execute(
+                f"CREATE TABLE {stage} (LIKE documents INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING GENERATED);"
+            )
+            copied = 0
+            if _table_exists(cur, live):
+                cur.execute(f"INSERT INTO {stage} ({_COPY_COLUMNS}) SELECT {_COPY_COLUMNS} FROM {live};")
+                copied = cur.rowcount
+        conn.commit()
+    print(f"[ETL] {d:%Y%m%d} | staging table {stage} created ({copied} rows copied from {live})")
+    return stage, False
+
+
+def discard_stage(day: DateLike) -> None:
+    """섀도 테이블 삭제(변경 사항이 없어 교체하지 않는 경우)"""
+    with get_pg_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP TABLE IF EXISTS {stage_name(day)};")
+        conn.commit()
+
+
+def build_stage_indexes(day: DateLike) -> int:
+    """교체 전 준비(라이브 검색과 무관): 일자 범위 CHECK, PK/호스트/ANN 인덱스, ANALYZE. 섀도 테이블 행 수 반환"""
+    d = to_date(day)
+    live, stage = partition_name(d), stage_name(d)
+    upper = d + timedelta(days=1)
+    with get_pg_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(f"SELECT count(*) AS n FROM {stage};")
+            rows = int(cur.fetchone()["n"])
+            lists = ivfflat_lists(rows)
+            cur.execute(f"ALTER TABLE {stage} DROP CONSTRAINT IF EXISTS {stage}_bounds;")
+            cur.execute(
+                f"ALTER TABLE {stage} ADD CONSTRAINT {stage}_bounds "
+                f"CHECK (event_date >= '{d.isoformat()}' AND event_date < '{upper.isoformat()}');"
+            )
+            cur.execute(
+                "SELECT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = %s) AS found;", (f"{stage}_pkey",)
+            )
+            if not cur.fetchone()["found"]:
+                cur.execute(f"ALTER TABLE {stage} ADD CONSTRAINT {stage}_pkey PRIMARY KEY (id, event_date);")
+            for _, _, sql in _stage_indexes(stage, live):
+                if sql:
+                    cur.execute(sql.format(lists=lists))
+        conn.commit()
+    t0 = time.perf_counter()
+    conn = get_pg_connection()
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            # 교체 직후 첫 검색부터 새 파티션 통계로 계획하도록 미리 수집
+            cur.execute(f"ANALYZE {stage};")
+    finally:
+        conn.close()
+    print(f"[ETL] {d:%Y%m%d} | {stage} indexed ({rows} rows, lists={lists}, analyze {time.perf_counter() - t0:.2f}s)")
+    return rows
+
+
+def _swap(cur, d, live: str, stage: str) -> None:
+    upper = d + timedelta(days=1)
+    cur.execute(f"SET LOCAL lock_timeout = '{int(settings.ETL_STAGING_LOCK_TIMEOUT * 1000)}ms';")
+    if _table_exists(cur, live):
+        cur.execute(f"ALTER TABLE documents DETACH PARTITION {live};")
+        cur.execute(f"DROP TABLE {live};")
+    cur.execute(f"ALTER TABLE {stage} RENAME TO {live};")
+    for staged, final, _ in _stage_indexes(stage, live):
+        cur.execute(f"ALTER INDEX IF EXISTS {staged} RENAME TO {final};")
+    cur.execute(
+        f"ALTER TABLE documents ATTACH PARTITION {live} "
+        f"FOR VALUES FROM ('{d.isoformat()}') TO ('{upper.isoformat()}');"
+    )
+    # ATTACH 범위 검증에만 쓰인 제약(파티션 경계와 중복)
+    cur.execute(f"ALTER TABLE {live} DROP CONSTRAINT {stage}_bounds;")
+
+
+def swap_stage(day: DateLike, rows: Optional[int] = None) -> int:
+    """섀도 테이블을 라이브 파티션과 원자적으로 교체. 새 적재 세대 번호 반환
+
+    lock_timeout으로 실패하면(진행 중인 검색이 잠금을 오래 잡은 경우) 잠시 후 다시 시도한다.
+    """
+    from psycopg2 import errors
+
+    d = to_date(day)
+    live, stage = partition_name(d), stage_name(d)
+    attempts = max(1, settings.ETL_STAGING_SWAP_RETRIES)
+    for attempt in range(1, attempts + 1):
+        conn = get_pg_connection()
+        try:
+            t0 = time.perf_counter()
+            with conn.cursor() as cur:
+                _swap(cur, d, live, stage)
+                # 검색 결과가 바뀌므로 교체와 같은 트랜잭션에서 API 결과 캐시 무효화
+                generation = bump_generation(cur)
+            conn.commit()
+            held = time.perf_counter() - t0
+        except errors.LockNotAvailable:
+            conn.rollback()
+            print(f"[ETL] {d:%Y%m%d} | swap lock timeout (attempt {attempt}/{attempts})")
+            if attempt == attempts:
+                raise
+            time.sleep(min(5.0, attempt * 1.0))
+            continue
+        finally:
+            conn.close()
+        break
+    print(f"[ETL] {d:%Y%m%d} | swapped {stage} -> {live} in {held * 1000:.0f}ms (generation {generation})")
+    if rows is not None:
+        # 교체로 새로 만든 ANN 인덱스를 유지보수 drift 계산 기준에 기록
+        with get_pg_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(_STATS_TABLE)
+                for idx in _index_state(cur, live):
+                    lists = ivfflat_lists(rows) if idx["method"] == "ivfflat" else None
+                    _record_build(cur, idx["index_name"], live, rows, lists)
+            conn.commit()
+    return generation
@@ -2,11 +2,26 @@
 pgvector(PostgreSQL) 연결 및 유사도 검색 유틸리티
 - 환경변수는 `backend.app.settings.Settings`에서 로드됨
 - 이 모듈은 DB 연결, 스키마 생성, 벡터 유사도 검색 기능을 제공
+- `documents`는 이벤트 일자(event_date) 기준 일 단위 RANGE 파티션 테이블로 관리한다.
+- psycopg2는 연결 시점에만 임포트한다(VectorDB 미사용 실행의 기동 시간 절감).
 """
 
-import psycopg2
-from psycopg2.extras import RealDictCursor
+import math
+from datetime import date, datetime, timedelta
+from typing import Optional, Union
+
 from ..settings import settings
+from ..metrics import track_inflight
+from ..tracing import span
+
+
+DateLike = Union[date, datetime, str]
+
+# 저장 모드별 컬럼 타입/ivfflat 연산자 클래스
+_STORAGE_TYPES = {
+    "vector": ("vector", "vector_cosine_ops"),
+    "halfvec": ("halfvec", "halfvec_cosine_ops"),
+}
 
 
 def get_pg_connection():
@@ -15,6 +30,9 @@ def get_pg_connection():
     환경변수로부터 접속 정보를 읽어 연결을 생성한다.
     반환된 커넥션은 context manager(with)와 함께 사용하는 것을 권장한다.
     """
+    import psycopg2
+    from psycopg2.extras import RealDictCursor
+
     conn = psycopg2.connect(
         host=settings.VECTORDB_HOST,
         port=settings.VECTORDB_PORT,
@@ -27,45 +45,633 @@ def get_pg_connection():
     return conn
 
 
+def to_date(value: DateLike) -> date:
+    """YYYYMMDD/YYYY-MM-DD 문자열 또는 date/datetime을 date로 변환"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = str(value).strip()
+    if len(text) == 8 and text.isdigit():
+        return datetime.strptime(text, "%Y%m%d").date()
+    return datetime.strptime(text[:10], "%Y-%m-%d").date()
+
+
+def partition_name(day: DateLike) -> str:
+    """일자 파티션 테이블명: documents_YYYYMMDD"""
+    return f"documents_{to_date(day).strftime('%Y%m%d')}"
+
+
+def storage_type(storage: Optional[str] = None) -> str:
+    """임베딩 컬럼 타입(vector | halfvec) 반환"""
+    mode = (storage or settings.VECTORDB_STORAGE).strip().lower()
+    if mode not in _STORAGE_TYPES:
+        raise ValueError(f"unsupported VECTORDB_STORAGE: {mode} (vector | halfvec)")
+    return _STORAGE_TYPES[mode][0]
+
+
+def vector_cast(storage: Optional[str] = None) -> str:
+    """SQL 바인딩 파라미터 캐스팅 문자열 예: '::halfvec(1024)'"""
+    return f"::{storage_type(storage)}({settings.EMBEDDING_DIM})"
+
+
+def ivfflat_lists(rows: int) -> int:
+    """pgvector 권장 ivfflat lists: 100만 행 이하는 rows/1000, 초과 시 sqrt(rows)"""
+    if rows <= 1_000_000:
+        return max(1, rows // 1000)
+    return int(math.sqrt(rows))
+
+
+def _index_sql(name: str, storage: Optional[str] = None, lists: Optional[int] = None) -> list[str]:
+    """파티션(테이블) 하나에 대한 ANN 인덱스 생성 SQL
+
+    - ivfflat 코사인 인덱스(저장 모드별 연산자 클래스, lists 지정 시 WITH (lists = N))
+    - VECTORDB_BINARY_QUANT=true면 binary_quantize 표현식 HNSW 인덱스(해밍 거리) 추가
+    """
+    vtype = storage_type(storage)
+    ops = _STORAGE_TYPES[vtype][1]
+    with_lists = f" WITH (lists = {lists})" if lists else ""
+    stmts = [
+        # 파티션별 ANN 인덱스: 파티션 단위로 인덱스 크기가 제한되어 재구성/삭제가 저렴하다.
+        f"CREATE INDEX IF NOT EXISTS idx_{name}_embedding ON {name} "
+        f"USING ivfflat (embedding {ops}){with_lists};",
+    ]
+    if settings.VECTORDB_BINARY_QUANT:
+        stmts.append(
+            f"CREATE INDEX IF NOT EXISTS idx_{name}_embedding_bq ON {name} "
+            f"USING hnsw ((binary_quantize(embedding)::bit({settings.EMBEDDING_DIM})) bit_hamming_ops);"
+        )
+    return stmts
+
+
+def _create_partition_sql(day: date) -> list[str]:
+    """단일 일자 파티션 생성 SQL
+
+    ANN 인덱스는 만들지 않는다. ivfflat은 생성 시점의 행으로 중심점을 학습하므로 빈 파티션에 만들면
+    이후 적재 행이 사실상 임의의 리스트에 배정되어 재현율이 무너진다(적재 후 ensure_ann_index로 생성).
+    """
+    name = partition_name(day)
+    upper = day + timedelta(days=1)
+    return [
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF documents "
+        f"FOR VALUES FROM ('{day.isoformat()}') TO ('{upper.isoformat()}');",
+    ]
+
+
+# 인덱스별 마지막 빌드 시점 행 수(유지보수 drift 계산 기준)
+_STATS_TABLE = """
+CREATE TABLE IF NOT EXISTS vector_index_stats (
+    index_name TEXT PRIMARY KEY,
+    table_name TEXT NOT NULL,
+    rows_at_build BIGINT NOT NULL,
+    lists INT,
+    built_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+"""
+
+
+def _record_build(cur, index_name: str, table: str, rows: int, lists: Optional[int]) -> None:
+    cur.execute(
+        "INSERT INTO vector_index_stats (index_name, table_name, rows_at_build, lists, built_at) "
+        "VALUES (%s, %s, %s, %s, NOW()) ON CONFLICT (index_name) DO UPDATE SET "
+        "rows_at_build = EXCLUDED.rows_at_build, lists = EXCLUDED.lists, built_at = EXCLUDED.built_at;",
+        (index_name, table, rows, lists),
+    )
+
+
+def ensure_ann_index(cur, partition: str, storage: Optional[str] = None) -> Optional[int]:
+    """적재된 파티션에 ANN 인덱스가 없으면 현재 행 수에 맞는 lists로 생성. 생성했으면 lists 반환
+
+    적재와 같은 트랜잭션에서 호출하면 새 행과 인덱스가 함께 커밋된다(CREATE INDEX는 검색(읽기)을 막지 않음).
+    빈 파티션은 인덱스 없이 두어 플래너가 순차 스캔하게 한다. 이후 행 수 변화는 유지보수(drift 재구성)가 맡는다.
+    """
+    names = [f"idx_{partition}_embedding"] + ([f"idx_{partition}_embedding_bq"] if settings.VECTORDB_BINARY_QUANT else [])
+    cur.execute("SELECT bool_and(to_regclass(n) IS NOT NULL) AS found FROM unnest(%s::text[]) AS n;", (names,))
+    if cur.fetchone()["found"]:
+        return None
+    cur.execute(f"SELECT count(*) AS n FROM {partition};")
+    rows = int(cur.fetchone()["n"])
+    if rows == 0:
+        return None
+    lists = ivfflat_lists(rows)
+    for stmt in _index_sql(partition, storage, lists):
+        cur.execute(stmt)
+    cur.execute(_STATS_TABLE)
+    _record_build(cur, names[0], partition, rows, lists)
+    for name in names[1:]:
+        _record_build(cur, name, partition, rows, None)
+    print(f"[VECTORDB] {partition} ANN index built ({rows} rows, lists={lists})")
+    return lists
+
+
+def _is_partitioned(cur) -> Optional[bool]:
+    """documents 테이블 상태 확인: None(없음) / True(파티션) / False(일반 힙 테이블)"""
+    cur.execute(
+        "SELECT c.relkind FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE c.relname = 'documents' AND n.nspname = current_schema();"
+    )
+    row = cur.fetchone()
+    if not row:
+        return None
+    return row["relkind"] == "p"
+
+
+def ensure_partitions(cur, days_back: Optional[int] = None, days_ahead: Optional[int] = None) -> list[str]:
+    """오늘 기준 과거 days_back일 ~ 미래 days_ahead일 파티션 생성 보장
+
+    ETL 적재 대상 일자와 다가올 일자의 파티션을 미리 만들어 두어
+    적재 시점에 DDL 잠금이 발생하지 않도록 한다.
+    """
+    back = settings.ETL_DAYS if days_back is None else days_back
+    ahead = settings.VECTORDB_PARTITION_AHEAD_DAYS if days_ahead is None else days_ahead
+    today = datetime.now().date()
+    created: list[str] = []
+    for offset in range(-back + 1, ahead + 1):
+        day = today + timedelta(days=offset)
+        for stmt in _create_partition_sql(day):
+            cur.execute(stmt)
+        created.append(partition_name(day))
+    return created
+
+
+def ensure_partition_for(cur, day: DateLike) -> str:
+    """특정 일자의 파티션 생성 보장(백필 등 범위 밖 일자 적재 시 사용)"""
+    d = to_date(day)
+    for stmt in _create_partition_sql(d):
+        cur.execute(stmt)
+    return partition_name(d)
+
+
+# ETL 적재 세대 번호(적재/파티션 삭제 시 증가). API 결과 캐시 무효화 기준
+_GENERATION_TABLE = """
+CREATE TABLE IF NOT EXISTS etl_generation (
+    id INT PRIMARY KEY,
+    generation BIGINT NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+"""
+
+
+# ETL 청크 체크포인트: (일자, 소스) 문서 목록 중 임베딩/적재가 커밋된 청크(etl.checkpoint)
+_CHECKPOINT_TABLE = """
+CREATE TABLE IF NOT EXISTS etl_checkpoint (
+    event_date DATE NOT NULL,
+    feed TEXT NOT NULL,
+    chunk_no INT NOT NULL,
+    chunks_total INT NOT NULL,
+    row_start INT NOT NULL,
+    row_end INT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    loaded_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    pending BOOLEAN NOT NULL DEFAULT FALSE,
+    PRIMARY KEY (event_date, feed, chunk_no)
+);
+"""
+
+
+def _pending_table_sql() -> list[str]:
+    """체크포인트 적재 중인 청크 행(etl.checkpoint). 마지막 청크 트랜잭션에서 documents로 옮겨진다(검색 대상 아님)."""
+    return [
+        f"""
+        CREATE TABLE IF NOT EXISTS etl_pending_documents (
+            source TEXT,
+            feed TEXT NOT NULL,
+            content TEXT,
+            event_date DATE NOT NULL,
+            created_at TIMESTAMP DEFAULT NOW(),
+            embedding {storage_type()}({settings.EMBEDDING_DIM}),
+            etl_chunk INT NOT NULL
+        );
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_etl_pending_documents_key "
+        "ON etl_pending_documents (event_date, feed, etl_chunk);",
+    ]
+
+
+# 적재된 호스트 목록(질문 분석기의 호스트명/IP 인식용). ETL 적재 시 (일자, 소스) 단위로 갱신
+_HOSTS_TABLE = """
+CREATE TABLE IF NOT EXISTS etl_hosts (
+    host TEXT PRIMARY KEY,
+    ip TEXT,
+    last_seen DATE NOT NULL
+);
+"""
+
+# documents.host/ip: 본문의 'Hostname=...'/'IP=...'(로그 라인은 세 번째 필드)에서 DB가 계산하는 생성 컬럼
+_HOST_EXPR = (
+    "COALESCE(substring(content from '(?:Hostname|HOSTNAME|host)=([^[:space:]]+)'), "
+    "substring(content from '^[0-9]{8}[[:space:]]+[0-9]{6}[[:space:]]+([^[:space:]]+)'))"
+)
+_IP_EXPR = "substring(content from 'IP=([0-9A-Fa-f:.]+)')"
+
+
+def bump_generation(cur) -> int:
+    """적재 세대 번호 증가(적재와 같은 트랜잭션에서 호출하여 커밋과 동시에 반영). 새 번호 반환"""
+    cur.execute(
+        "INSERT INTO etl_generation (id, generation) VALUES (1, 1) "
+        "ON CONFLICT (id) DO UPDATE SET generation = etl_generation.generation + 1, updated_at = NOW() "
+        "RETURNING generation;"
+    )
+    return int(cur.fetchone()["generation"])
+
+
+def get_generation() -> int:
+    """현재 적재 세대 번호(기록이 없으면 0)"""
+    conn = get_pg_connection()
+    try:
+        with conn, conn.cursor() as cur:
+            cur.execute("SELECT generation FROM etl_generation WHERE id = 1;")
+            row = cur.fetchone()
+    finally:
+        conn.close()
+    return int(row["generation"]) if row else 0
+
+
+# 재적재 시 교체할 행: 해당 소스 행 + feed 컬럼 추가 전에 적재된 행(feed IS NULL, legacy 이관분 포함)
+# 소스를 알 수 없는 이전 행은 그 일자를 처음 다시 적재할 때 함께 지워 업그레이드 후 중복 적재를 막는다.
+FEED_MATCH_SQL = "(feed = %s OR feed IS NULL)"
+
+
+def delete_feed_rows(cur, day: DateLike, feed: str) -> int:
+    """해당 일자/소스의 기존 행(+ 소스 미기록 이전 행) 삭제(같은 트랜잭션에서 재적재하여 중복 적재 방지). 삭제 건수 반환"""
+    cur.execute(
+        f"DELETE FROM documents WHERE event_date = %s AND {FEED_MATCH_SQL}",
+        (to_date(day), feed),
+    )
+    return cur.rowcount
+
+
+def insert_documents(
+    cur,
+    day: DateLike,
+    feeds: list[str],
+    texts: list[str],
+    vectors,
+    chunk: Optional[int] = None,
+    table: str = "documents",
+) -> int:
+    """문서 행 적재(source=YYYYMMDD, 임베딩은 저장 모드 타입으로 캐스팅)
+
+    - chunk: ETL 체크포인트 청크 번호
+    - table: 적재 대상(기본 documents, 스테이징 적재 시 섀도 테이블)
+    """
+    d = to_date(day)
+    source = d.strftime("%Y%m%d")
+    cast = vector_cast()
+    sql = (
+        f"INSERT INTO {table} (source, feed, content, event_date, embedding, etl_chunk) "
+        f"VALUES (%s, %s, %s, %s, %s{cast}, %s)"
+    )
+    for text, vec, feed in zip(texts, vectors, feeds):
+        # pgvector는 벡터 문자열 형식('[v1,v2,...]')을 받으며, psycopg2 기본 커서에서는 명시적 캐스팅이 안전하다.
+        vec_str = "[" + ",".join(f"{float(x):.6f}" for x in vec) + "]"
+        cur.execute(sql, (source, feed, text, d, vec_str, chunk))
+    return len(texts)
+
+
+def upsert_hosts(cur, day: DateLike, feed: str, table: str = "documents") -> None:
+    """해당 일자/소스 적재분의 호스트(IP)를 etl_hosts에 반영(적재와 같은 트랜잭션에서 호출)"""
+    cur.execute(
+        "INSERT INTO etl_hosts (host, ip, last_seen) "
+        f"SELECT host, MAX(ip), MAX(event_date) FROM {table} "
+        "WHERE event_date = %s AND feed = %s AND host IS NOT NULL GROUP BY host "
+        "ON CONFLICT (host) DO UPDATE SET ip = COALESCE(EXCLUDED.ip, etl_hosts.ip), "
+        "last_seen = GREATEST(etl_hosts.last_seen, EXCLUDED.last_seen);",
+        (to_date(day), feed),
+    )
+
+
+def list_known_hosts(days: Optional[int] = None) -> list[tuple[str, Optional[str]]]:
+    """최근 days일(기본 ETL_DAYS) 안에 적재된 호스트 [(호스트, IP)]"""
+    since = datetime.now().date() - timedelta(days=(settings.ETL_DAYS if days is None else days) - 1)
+    conn = get_pg_connection()
+    try:
+        with conn, conn.cursor() as cur:
+            cur.execute("SELECT host, ip FROM etl_hosts WHERE last_seen >= %s;", (since,))
+            return [(row["host"], row["ip"]) for row in cur.fetchall()]
+    finally:
+        conn.close()
+
+
 def ensure_schema():
     """pgvector 확장/테이블/인덱스 생성 보장
 
     - vector 확장이 없으면 생성
-    - `documents` 테이블이 없으면 생성 (임베딩 벡터 컬럼 포함)
-    - 벡터 검색 성능을 위한 ivfflat 인덱스 생성(없으면)
+    - `documents` 파티션 테이블이 없으면 생성 (event_date 기준 일 단위 RANGE 파티션)
+    - 기존 일반(힙) 테이블이 있으면 documents_legacy로 이름을 바꾸고 데이터를 파티션으로 이관
+    - 최근 ETL_DAYS일 + 향후 VECTORDB_PARTITION_AHEAD_DAYS일 파티션 생성(ANN 인덱스는 적재 후 ensure_ann_index가 생성)
+    - feed 컬럼에는 ETL 소스 이름(mock_db/oracle/was_log/db_log)을 기록한다(소스별 재적재 단위).
+    - etl_chunk 컬럼/etl_checkpoint/etl_pending_documents 테이블은 청크 단위 재시작 적재(etl.checkpoint)에 쓰인다.
+    - host/ip는 본문에서 계산되는 생성 컬럼이다(질문 분석기의 호스트 제약 검색용, (host, event_date) 인덱스).
+      기존 테이블에 처음 추가할 때는 테이블 재작성이 일어나므로 적재가 없는 시간에 실행한다.
+    - 임베딩 컬럼 타입은 VECTORDB_STORAGE(vector | halfvec)를 따른다.
+      기존 테이블의 타입이 다르면 migrate_storage()(tools/ensure_schema.py --migrate-storage)로 변환한다.
     """
     create_ext = "CREATE EXTENSION IF NOT EXISTS vector;"
+    # 파티션 테이블의 PK는 파티션 키를 포함해야 한다.
     create_table = f"""
     CREATE TABLE IF NOT EXISTS documents (
-        id SERIAL PRIMARY KEY,
+        id BIGSERIAL,
         source TEXT,
+        feed TEXT,
         content TEXT,
+        event_date DATE NOT NULL,
         created_at TIMESTAMP DEFAULT NOW(),
-        embedding vector({settings.EMBEDDING_DIM})
-    );
+        embedding {storage_type()}({settings.EMBEDDING_DIM}),
+        PRIMARY KEY (id, event_date)
+    ) PARTITION BY RANGE (event_date);
     """
-    # cosine 유사도 기반 인덱스. 검색은 <-> 연산자를 사용
-    create_index = "CREATE INDEX IF NOT EXISTS idx_documents_embedding ON documents USING ivfflat (embedding vector_cosine_ops);"
 
     with get_pg_connection() as conn:
         with conn.cursor() as cur:
             cur.execute(create_ext)
+            state = _is_partitioned(cur)
+            if state is False:
+                # 구 스키마(일반 테이블) → 파티션 테이블로 이관
+                cur.execute("ALTER TABLE documents RENAME TO documents_legacy;")
+                cur.execute("ALTER INDEX IF EXISTS idx_documents_embedding RENAME TO idx_documents_legacy_embedding;")
             cur.execute(create_table)
-            cur.execute(create_index)
+            # 소스(feed)별 재적재를 위한 컬럼(이전 스키마 보강)
+            cur.execute("ALTER TABLE documents ADD COLUMN IF NOT EXISTS feed TEXT;")
+            # ETL 체크포인트 청크 번호(체크포인트 없이 적재한 행은 NULL)
+            cur.execute("ALTER TABLE documents ADD COLUMN IF NOT EXISTS etl_chunk INT;")
+            cur.execute(f"ALTER TABLE documents ADD COLUMN IF NOT EXISTS host TEXT GENERATED ALWAYS AS ({_HOST_EXPR}) STORED;")
+            cur.execute(f"ALTER TABLE documents ADD COLUMN IF NOT EXISTS ip TEXT GENERATED ALWAYS AS ({_IP_EXPR}) STORED;")
+            # 파티션 테이블 인덱스: 기존/향후 파티션 모두에 생성된다.
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_documents_host ON documents (host, event_date);")
+            cur.execute(_GENERATION_TABLE)
+            cur.execute(_CHECKPOINT_TABLE)
+            # 적재 중(미게시) 청크 표시: 이전 스키마의 체크포인트는 모두 documents에 커밋된 청크다.
+            cur.execute("ALTER TABLE etl_checkpoint ADD COLUMN IF NOT EXISTS pending BOOLEAN NOT NULL DEFAULT FALSE;")
+            for stmt in _pending_table_sql():
+                cur.execute(stmt)
+            cur.execute(_HOSTS_TABLE)
+            cur.execute(_STATS_TABLE)
+            cur.execute("SELECT EXISTS (SELECT 1 FROM etl_hosts) AS has_hosts;")
+            if not cur.fetchone()["has_hosts"]:
+                # 호스트 목록 도입 전 적재분에서 1회 채움
+                cur.execute(
+                    "INSERT INTO etl_hosts (host, ip, last_seen) "
+                    "SELECT host, MAX(ip), MAX(event_date) FROM documents WHERE host IS NOT NULL GROUP BY host;"
+                )
+            current = current_storage(cur)
+            if current and current != storage_type():
+                print(
+                    f"[schema] documents.embedding is {current} but VECTORDB_STORAGE={storage_type()}; "
+                    "run `python tools/ensure_schema.py --migrate-storage` to convert existing rows"
+                )
+            ensure_partitions(cur)
+            if state is False:
+                _migrate_legacy_rows(cur)
         conn.commit()
 
 
-def search_similar(query_vec, top_k=5):
-    """질의 벡터에 대한 유사 문서 검색
+def current_storage(cur) -> Optional[str]:
+    """documents.embedding 컬럼의 실제 타입(vector | halfvec) 조회"""
+    cur.execute(
+        "SELECT t.typname FROM pg_attribute a "
+        "JOIN pg_class c ON c.oid = a.attrelid "
+        "JOIN pg_type t ON t.oid = a.atttypid "
+        "WHERE c.relname = 'documents' AND a.attname = 'embedding' AND NOT a.attisdropped;"
+    )
+    row = cur.fetchone()
+    return row["typname"] if row else None
 
-    매칭 점수(score)는 1 - cosine_distance 로 계산하여 1에 가까울수록 유사함을 의미한다.
-    - 정렬에는 `<->`(distance) 사용
-    - 점수 계산에는 `<=>`(cosine distance) 사용 후 1 - distance 변환
+
+def migrate_storage(storage: Optional[str] = None) -> Optional[str]:
+    """기존 행의 임베딩 컬럼 타입을 VECTORDB_STORAGE(또는 storage)로 변환
+
+    - 연산자 클래스가 달라지므로 파티션별 ANN 인덱스를 삭제 후 타입 변경, 인덱스 재생성
+    - 이미 목표 타입이면 아무 작업도 하지 않는다.
+    반환: 변경 전 타입(변경이 없으면 None)
     """
-    sql = "SELECT id, source, content, 1 - (embedding <=> %s::vector) AS score FROM documents ORDER BY embedding <-> %s::vector LIMIT %s;"
-    params = (query_vec, query_vec, top_k)
+    target = storage_type(storage)
+    dim = settings.EMBEDDING_DIM
     with get_pg_connection() as conn:
         with conn.cursor() as cur:
-            cur.execute(sql, params)
-            rows = cur.fetchall()
+            current = current_storage(cur)
+            if current is None or current == target:
+                return None
+            partitions = [name for name, _ in list_partitions(cur)]
+            for name in partitions:
+                cur.execute(f"DROP INDEX IF EXISTS idx_{name}_embedding;")
+                cur.execute(f"DROP INDEX IF EXISTS idx_{name}_embedding_bq;")
+            cur.execute(
+                f"ALTER TABLE documents ALTER COLUMN embedding TYPE {target}({dim}) "
+                f"USING embedding::{target}({dim});"
+            )
+            for name in partitions:
+                # 행이 있는 파티션만 행 수에 맞는 lists로 재생성
+                ensure_ann_index(cur, name, target)
+            # 적재 중 청크 행도 같은 타입이어야 게시(documents로 이동) 시 변환이 없다.
+            cur.execute(
+                f"ALTER TABLE IF EXISTS etl_pending_documents ALTER COLUMN embedding TYPE {target}({dim}) "
+                f"USING embedding::{target}({dim});"
+            )
+        conn.commit()
+    return current
+
+
+def _migrate_legacy_rows(cur) -> None:
+    """documents_legacy의 행을 source(YYYYMMDD) 기준 event_date로 파티션에 이관"""
+    cur.execute(
+        "SELECT DISTINCT source FROM documents_legacy WHERE source ~ '^[0-9]{8}$';"
+    )
+    for row in cur.fetchall():
+        ensure_partition_for(cur, row["source"])
+    cur.execute(
+        "INSERT INTO documents (source, content, event_date, created_at, embedding) "
+        "SELECT source, content, to_date(source, 'YYYYMMDD'), created_at, embedding "
+        "FROM documents_legacy WHERE source ~ '^[0-9]{8}$';"
+    )
+    for name, _ in list_partitions(cur):
+        ensure_ann_index(cur, name)
+    # 일자로 해석할 수 없는 행이 남아 있으면 수동 확인을 위해 legacy 테이블을 보존
+    cur.execute("SELECT COUNT(*) AS n FROM documents_legacy WHERE source !~ '^[0-9]{8}$' OR source IS NULL;")
+    if cur.fetchone()["n"] == 0:
+        cur.execute("DROP TABLE documents_legacy;")
+
+
+def list_partitions(cur) -> list[tuple[str, date]]:
+    """documents의 일자 파티션 목록 [(파티션명, 일자)] (일자 오름차순)"""
+    cur.execute(
+        "SELECT c.relname AS name FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = 'documents';"
+    )
+    out: list[tuple[str, date]] = []
+    for row in cur.fetchall():
+        name = row["name"]
+        suffix = name.rsplit("_", 1)[-1]
+        if len(suffix) == 8 and suffix.isdigit():
+            out.append((name, to_date(suffix)))
+    out.sort(key=lambda x: x[1])
+    return out
+
+
+def drop_old_partitions(retention_days: Optional[int] = None) -> list[str]:
+    """보존 기간(기본 ETL_DAYS)보다 오래된 일자 파티션을 DETACH 후 DROP
+
+    대량 DELETE/VACUUM 없이 파티션 단위로 O(1) 삭제한다.
+    """
+    days = settings.ETL_DAYS if retention_days is None else retention_days
+    cutoff = datetime.now().date() - timedelta(days=days - 1)
+    dropped: list[str] = []
+    with get_pg_connection() as conn:
+        with conn.cursor() as cur:
+            for name, day in list_partitions(cur):
+                if day >= cutoff:
+                    continue
+                cur.execute(f"ALTER TABLE documents DETACH PARTITION {name};")
+                cur.execute(f"DROP TABLE {name};")
+                dropped.append(name)
+            # 교체 전에 중단된 뒤 재실행되지 않은 스테이징 적재 섀도 테이블(db.staging)
+            cur.execute(
+                "SELECT c.relname AS name FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+                "WHERE c.relkind = 'r' AND c.relname LIKE 'documents\\_%\\_stage' AND n.nspname = current_schema();"
+            )
+            for row in cur.fetchall():
+                suffix = row["name"][len("documents_"):-len("_stage")]
+                if len(suffix) == 8 and suffix.isdigit() and to_date(suffix) < cutoff:
+                    cur.execute(f"DROP TABLE {row['name']};")
+            if dropped:
+                # 삭제된 일자의 체크포인트가 남아 있으면 재적재 시 건너뛰므로 함께 정리
+                cur.execute("DELETE FROM etl_checkpoint WHERE event_date < %s;", (cutoff,))
+                cur.execute("DELETE FROM etl_pending_documents WHERE event_date < %s;", (cutoff,))
+                # 검색 결과가 달라지므로 API 결과 캐시 무효화
+                bump_generation(cur)
+        conn.commit()
+    return dropped
+
+
+def _date_filter_sql(date_from: Optional[DateLike], date_to: Optional[DateLike]) -> tuple[str, list]:
+    """event_date 범위 조건(파티션 프루닝용) WHERE 절과 파라미터 생성"""
+    clauses: list[str] = []
+    params: list = []
+    if date_from is not None:
+        clauses.append("event_date >= %s")
+        params.append(to_date(date_from))
+    if date_to is not None:
+        clauses.append("event_date <= %s")
+        params.append(to_date(date_to))
+    where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+    return where, params
+
+
+def _search_filter_sql(
+    date_from: Optional[DateLike], date_to: Optional[DateLike], hosts: Optional[list[str]] = None
+) -> tuple[str, list]:
+    """일자 범위 + 호스트 조건 WHERE 절과 파라미터 생성"""
+    where, params = _date_filter_sql(date_from, date_to)
+    if hosts:
+        where = (where + " AND " if where else "WHERE ") + "host = ANY(%s)"
+        params.append(list(hosts))
+    return where, params
+
+
+def build_search_sql(
+    query_vec,
+    top_k: int,
+    where: str = "",
+    where_params: Optional[list] = None,
+    binary_quant: Optional[bool] = None,
+    exact: bool = False,
+) -> tuple[str, tuple]:
+    """유사도 검색 SQL과 바인딩 파라미터 생성
+
+    - 기본: 코사인 거리(`<=>`)로 정렬하여 ivfflat 코사인 인덱스를 사용
+    - 이진 양자화: 해밍 거리(`<~>`) 1차 후보(top_k * VECTORDB_RESCORE_FACTOR) 추출 후
+      float32(vector) 정밀도로 코사인 거리 재정렬
+    - exact: 조건에 맞는 행을 먼저 추린 뒤 전수 거리 계산(호스트 조건처럼 선택도가 높은 필터용).
+      ANN 인덱스는 필터를 나중에 적용하므로 조건에 맞는 행이 적으면 top_k보다 적게 반환될 수 있다.
+    """
+    cast = vector_cast()
+    wparams = tuple(where_params or ())
+    if exact:
+        sql = (
+            f"WITH candidates AS MATERIALIZED (SELECT id, source, content, embedding FROM documents {where}) "
+            f"SELECT id, source, content, 1 - (embedding <=> %s{cast}) AS score FROM candidates "
+            f"ORDER BY embedding <=> %s{cast} LIMIT %s;"
+        )
+        return sql, (*wparams, query_vec, query_vec, top_k)
+    use_bq = settings.VECTORDB_BINARY_QUANT if binary_quant is None else binary_quant
+    if not use_bq:
+        sql = (
+            f"SELECT id, source, content, 1 - (embedding <=> %s{cast}) AS score FROM documents "
+            f"{where} ORDER BY embedding <=> %s{cast} LIMIT %s;"
+        )
+        return sql, (query_vec, *wparams, query_vec, top_k)
+    dim = settings.EMBEDDING_DIM
+    candidates = max(top_k, top_k * settings.VECTORDB_RESCORE_FACTOR)
+    sql = (
+        "SELECT id, source, content, 1 - (embedding::vector <=> %s::vector) AS score FROM ("
+        f"SELECT id, source, content, embedding FROM documents {where} "
+        f"ORDER BY binary_quantize(embedding)::bit({dim}) <~> binary_quantize(%s{cast}) LIMIT %s"
+        ") AS candidates ORDER BY embedding::vector <=> %s::vector LIMIT %s;"
+    )
+    return sql, (query_vec, *wparams, query_vec, candidates, query_vec, top_k)
+
+
+def search_similar(
+    query_vec,
+    top_k=5,
+    date_from: Optional[DateLike] = None,
+    date_to: Optional[DateLike] = None,
+    hosts: Optional[list[str]] = None,
+):
+    """질의 벡터에 대한 유사 문서 검색
+
+    매칭 점수(score)는 1 - cosine_distance 로 계산하여 1에 가까울수록 유사함을 의미한다.
+    - 정렬/점수 계산 모두 `<=>`(cosine distance) 사용 (ivfflat 코사인 인덱스 사용 가능)
+    - VECTORDB_BINARY_QUANT=true면 해밍 거리 1차 검색 후 full precision 재정렬
+    - date_from/date_to(포함) 지정 시 event_date 조건으로 해당 일자 파티션만 스캔한다.
+    - hosts 지정 시 (host, event_date) 인덱스로 해당 호스트 행만 추려 전수 거리 계산한다.
+    """
+    where, filter_params = _search_filter_sql(date_from, date_to, hosts)
+    sql, params = build_search_sql(query_vec, top_k, where, filter_params, exact=bool(hosts))
+    with track_inflight("db"):
+        with span("db.connect"):
+            conn = get_pg_connection()
+        try:
+            with conn, span("db.search", top_k=top_k), conn.cursor() as cur:
+                cur.execute(sql, params)
+                rows = cur.fetchall()
+        finally:
+            # psycopg2의 with 블록은 트랜잭션만 종료하므로 연결은 명시적으로 닫는다.
+            conn.close()
     return rows
+
+
+def search_similar_batch(queries: list[dict]) -> list[list[dict]]:
+    """여러 질의 벡터를 한 번의 SQL 왕복으로 검색
+
+    queries: [{"vec": 벡터 리터럴, "top_k": int, "date_from": 일자|None, "date_to": 일자|None, "hosts": [호스트]|None}, ...]
+    반환: 입력 순서와 동일한 질의별 결과 행 리스트
+
+    질의마다 단건 검색(search_similar)과 같은 SQL(build_search_sql)을 만들어 UNION ALL로 묶는다.
+    일자/호스트 조건이 질의별 정적 WHERE 절이므로 각 질의는 해당 일자 파티션만 스캔하고 ANN 인덱스를 사용한다.
+    """
+    if not queries:
+        return []
+    parts: list[str] = []
+    params: list = []
+    for i, q in enumerate(queries):
+        hosts = list(q.get("hosts") or ())
+        where, filter_params = _search_filter_sql(q.get("date_from") or None, q.get("date_to") or None, hosts)
+        sql, qparams = build_search_sql(q["vec"], int(q.get("top_k") or 5), where, filter_params, exact=bool(hosts))
+        parts.append(f"SELECT %s AS ord, r.id, r.source, r.content, r.score FROM ({sql.rstrip(';')}) r")
+        params += [i, *qparams]
+    sql = " UNION ALL ".join(parts) + " ORDER BY ord, score DESC;"
+    results: list[list[dict]] = [[] for _ in queries]
+    with track_inflight("db"):
+        with span("db.connect"):
+            conn = get_pg_connection()
+        try:
+            with conn, span("db.search_batch", queries=len(queries)), conn.cursor() as cur:
+                cur.execute(sql, params)
+                for row in cur.fetchall():
+                    results[row["ord"]].append(row)
+        finally:
+            conn.close()
+    return results
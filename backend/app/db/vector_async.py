@@ -0,0 +1,122 @@
+"""
+pgvector 비동기 검색(asyncpg 연결 풀)
+- 비동기 /qa 경로 전용. 이벤트 루프에서 DB 응답을 기다리는 동안 스레드를 점유하지 않으므로
+  API 프로세스 1개가 수백 개의 검색 요청을 동시에 대기시킬 수 있다.
+- 풀 크기: VECTORDB_ASYNC_POOL_MIN ~ VECTORDB_ASYNC_POOL_MAX. 풀이 차면 연결 반납을 비동기로 기다린다.
+- SQL은 동기 경로(db.vector.build_search_sql)와 동일하며, 플레이스홀더만 %s → $n으로 바꾼다.
+  vector/halfvec 타입은 텍스트 리터럴('[v1,v2,...]')로 주고받도록 연결마다 코덱을 등록한다.
+- asyncpg가 설치되어 있지 않으면 동기 검색(psycopg2)을 스레드로 넘겨 실행한다.
+- 풀은 생성한 이벤트 루프에 묶이므로 루프(uvicorn 워커)마다 하나씩 만든다.
+"""
+
+import asyncio
+import re
+from typing import Optional
+
+from ..metrics import track_inflight
+from ..settings import settings
+from ..tracing import span
+from .vector import DateLike, _search_filter_sql, build_search_sql
+
+
+_PLACEHOLDER = re.compile(r"%s")
+
+_pools: dict[int, object] = {}
+_pool_locks: dict[int, asyncio.Lock] = {}
+_driver_missing_logged = False
+
+
+def to_asyncpg_sql(sql: str) -> str:
+    """psycopg2 형식(%s) 플레이스홀더를 asyncpg 형식($1, $2, ...)으로 변환"""
+    counter = iter(range(1, sql.count("%s") + 1))
+    return _PLACEHOLDER.sub(lambda _: f"${next(counter)}", sql)
+
+
+async def _init_connection(conn) -> None:
+    """pgvector 타입을 텍스트 형식으로 주고받도록 코덱 등록(halfvec은 pgvector 0.7+에만 존재)"""
+    for type_name in ("vector", "halfvec"):
+        try:
+            await conn.set_type_codec(type_name, schema="public", encoder=str, decoder=str, format="text")
+        except ValueError:
+            continue
+
+
+async def get_async_pool():
+    """현재 이벤트 루프용 asyncpg 풀(지연 생성). asyncpg 미설치 시 ImportError"""
+    import asyncpg
+
+    loop = asyncio.get_running_loop()
+    key = id(loop)
+    pool = _pools.get(key)
+    if pool is not None:
+        return pool
+    lock = _pool_locks.setdefault(key, asyncio.Lock())
+    async with lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = await asyncpg.create_pool(
+                host=settings.VECTORDB_HOST,
+                port=settings.VECTORDB_PORT,
+                database=settings.VECTORDB_DB,
+                user=settings.VECTORDB_USER,
+                password=settings.VECTORDB_PASSWORD,
+                # asyncpg도 libpq sslmode 이름(disable/prefer/require/...)을 그대로 받는다.
+                ssl=settings.VECTORDB_SSLMODE or None,
+                min_size=settings.VECTORDB_ASYNC_POOL_MIN,
+                max_size=settings.VECTORDB_ASYNC_POOL_MAX,
+                init=_init_connection,
+            )
+            _pools[key] = pool
+    return pool
+
+
+async def close_async_pool() -> None:
+    """현재 이벤트 루프의 풀 종료(앱 shutdown 시)"""
+    key = id(asyncio.get_running_loop())
+    pool = _pools.pop(key, None)
+    _pool_locks.pop(key, None)
+    if pool is not None:
+        await pool.close()
+
+
+def _driver_available() -> bool:
+    global _driver_missing_logged
+    try:
+        import asyncpg  # noqa: F401
+    except ImportError:
+        if not _driver_missing_logged:
+            _driver_missing_logged = True
+            print("[VECTORDB] asyncpg is not installed, async /qa runs psycopg2 search in a thread")
+        return False
+    return True
+
+
+async def search_similar_async(
+    query_vec: str,
+    top_k: int = 5,
+    date_from: Optional[DateLike] = None,
+    date_to: Optional[DateLike] = None,
+    hosts: Optional[list[str]] = None,
+) -> list[dict]:
+    """search_similar와 같은 결과(id/source/content/score)를 비동기로 조회"""
+    if not _driver_available():
+        from .vector import search_similar
+
+        return await asyncio.to_thread(search_similar, query_vec, top_k, date_from, date_to, hosts)
+    where, filter_params = _search_filter_sql(date_from, date_to, hosts)
+    sql, params = build_search_sql(query_vec, top_k, where, filter_params, exact=bool(hosts))
+    pool = await get_async_pool()
+    with track_inflight("db"), span("db.search", top_k=top_k, driver="asyncpg"):
+        rows = await pool.fetch(to_asyncpg_sql(sql), *params)
+    return [dict(r) for r in rows]
+
+
+async def get_generation_async() -> int:
+    """현재 적재 세대 번호(기록이 없으면 0)"""
+    if not _driver_available():
+        from .vector import get_generation
+
+        return await asyncio.to_thread(get_generation)
+    pool = await get_async_pool()
+    value = await pool.fetchval("SELECT generation FROM etl_generation WHERE id = 1;")
+    return int(value) if value is not None else 0
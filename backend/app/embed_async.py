@@ -0,0 +1,93 @@
+"""
+비동기 요청 경로용 임베딩 실행기
+- 모델 encode(CPU 연산)는 이벤트 루프가 아닌 전용 스레드 풀(EMBEDDING_EXECUTOR_WORKERS개)에서 실행한다.
+  FastAPI 기본 스레드 풀(동기 핸들러/DB 호출 공용)과 분리되어, DB 대기 요청이 많아도 임베딩 슬롯을 빼앗기지 않는다.
+- 동시에 들어온 질문은 EMBEDDING_ASYNC_MAX_WAIT_MS 동안 최대 EMBEDDING_ASYNC_MAX_BATCH개까지 모아 embed_texts 1회로 처리한다
+  (질문 1개씩 encode하는 것보다 배치 1회가 훨씬 빠르다).
+- EMBEDDING_SERVICE_ADDR가 지정되어 있으면 embed_texts가 공유 임베딩 서비스에 위임하므로 실행기 스레드는 소켓 대기만 한다.
+- 배치 상태는 이벤트 루프별로 둔다(uvicorn 워커 1개 = 루프 1개).
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from .settings import settings
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_embed_executor() -> ThreadPoolExecutor:
+    """임베딩 전용 스레드 풀(모델 1개를 공유하므로 워커 수는 1~2개 권장)"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=max(1, settings.EMBEDDING_EXECUTOR_WORKERS), thread_name_prefix="monchat-embed"
+                )
+    return _executor
+
+
+def shutdown_embed_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+class _Batcher:
+    """이벤트 루프 1개에 묶인 임베딩 요청 모음"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self.pending: list[tuple[str, asyncio.Future]] = []
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+
+    def submit(self, text: str) -> asyncio.Future:
+        fut = self.loop.create_future()
+        self.pending.append((text, fut))
+        if len(self.pending) >= max(1, settings.EMBEDDING_ASYNC_MAX_BATCH):
+            self.flush()
+        elif self.flush_handle is None:
+            self.flush_handle = self.loop.call_later(settings.EMBEDDING_ASYNC_MAX_WAIT_MS / 1000.0, self.flush)
+        return fut
+
+    def flush(self) -> None:
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        # 이미 취소된(연결 종료) 요청은 임베딩하지 않는다.
+        batch = [(t, f) for t, f in self.pending if not f.cancelled()]
+        self.pending = []
+        if batch:
+            self.loop.create_task(self._run(batch))
+
+    async def _run(self, batch: list[tuple[str, asyncio.Future]]) -> None:
+        from .embeddings import embed_texts
+
+        try:
+            vecs = await self.loop.run_in_executor(get_embed_executor(), embed_texts, [t for t, _ in batch])
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        for (_, fut), vec in zip(batch, vecs):
+            if not fut.done():
+                fut.set_result(vec)
+
+
+_batchers: dict[int, _Batcher] = {}
+
+
+async def embed_text_async(text: str) -> list[float]:
+    """단일 문장 임베딩(이벤트 루프를 막지 않음, 동시 요청은 배치로 묶임)"""
+    loop = asyncio.get_running_loop()
+    batcher = _batchers.get(id(loop))
+    if batcher is None or batcher.loop is not loop:
+        batcher = _batchers[id(loop)] = _Batcher(loop)
+    return await batcher.submit(text)
@@ -0,0 +1,164 @@
+"""
+ETL 대량 임베딩(멀티 프로세스 + 길이 버킷)
+- 인코더 프로세스 풀(EMBEDDING_BULK_WORKERS개)을 띄워 CPU 코어를 나눠 쓴다.
+  워커마다 torch 스레드 수를 (코어 수 / 워커 수)로 제한하여 프로세스 간 과다 구독을 막는다.
+- 텍스트를 길이 순으로 정렬한 뒤 EMBEDDING_BULK_CHUNK개 단위 청크로 나눠 배분한다.
+  같은 청크(=배치들)에 길이가 비슷한 문장만 모이므로 짧은 이벤트 행이 긴 요약 문서 길이로 패딩되지 않는다.
+- 모델 max_seq_length는 EMBEDDING_MAX_SEQ_LENGTH로 제한한다(embeddings.get_embedding_model에서 적용).
+- 결과는 입력 순서대로 반환하고, 워커별 처리량(texts/sec)을 [EMBED] 로그로 출력한다.
+- 풀은 프로세스 내에서 재사용한다(일자별 호출마다 모델을 다시 로딩하지 않음).
+  ETL 실행은 bulk_pool_session()으로 풀을 참조하며, 마지막 참조가 끝날 때만 종료한다.
+  (스케줄러가 소스별 ETL을 동시에 돌려도 먼저 끝난 실행이 다른 실행의 임베딩 작업을 취소하지 않음)
+"""
+
+import atexit
+import multiprocessing as mp
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import numpy as np
+
+from .settings import settings
+from .tracing import span
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+# 풀 생성/종료와 참조 수(bulk_pool_session) 보호
+_pool_lock = threading.Lock()
+_pool_users = 0
+
+
+def _init_worker(threads: int) -> None:
+    """워커 프로세스 초기화: torch 스레드 제한 + 모델 1회 로딩"""
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["MKL_NUM_THREADS"] = str(threads)
+    import torch
+
+    torch.set_num_threads(threads)
+    from .embeddings import get_embedding_model
+
+    get_embedding_model()
+
+
+def _encode_chunk(chunk_id: int, texts: list[str]) -> tuple[int, np.ndarray, int, float]:
+    """(청크 번호, float32 벡터 행렬, 워커 pid, 인코딩 소요 초)"""
+    from .embeddings import get_embedding_model
+
+    model = get_embedding_model()
+    t0 = time.perf_counter()
+    vectors = model.encode(
+        texts,
+        batch_size=settings.EMBEDDING_BATCH_SIZE,
+        normalize_embeddings=True,
+        show_progress_bar=False,
+        convert_to_numpy=True,
+    )
+    return chunk_id, np.asarray(vectors, dtype=np.float32), os.getpid(), time.perf_counter() - t0
+
+
+def resolve_workers(workers: Optional[int] = None) -> int:
+    """워커 수(0 이하 설정이면 코어 수 / EMBEDDING_BULK_THREADS)"""
+    n = settings.EMBEDDING_BULK_WORKERS if workers is None else workers
+    if n <= 0:
+        n = max(1, (os.cpu_count() or 1) // max(1, settings.EMBEDDING_BULK_THREADS))
+    return n
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    with _pool_lock:
+        if _pool is not None and _pool_workers != workers:
+            if _pool_users > 1:
+                # 다른 실행이 쓰는 중인 풀은 닫지 않고 기존 워커 수로 처리
+                print(f"[EMBED] bulk pool in use with workers={_pool_workers}, requested {workers}")
+                return _pool
+            _shutdown_locked()
+        if _pool is None:
+            _start_locked(workers)
+        return _pool
+
+
+def _start_locked(workers: int) -> None:
+    global _pool, _pool_workers
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    # fork 후 torch/토크나이저 스레드 상태가 꼬이지 않도록 spawn 사용
+    _pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=mp.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(threads,),
+    )
+    _pool_workers = workers
+    print(f"[EMBED] bulk pool started | workers={workers} threads/worker={threads}")
+
+
+def _shutdown_locked() -> None:
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+        _pool_workers = 0
+
+
+@contextmanager
+def bulk_pool_session() -> Iterator[None]:
+    """풀 참조 구간(ETL 실행 단위). 마지막 참조가 끝날 때 워커(모델 사본)를 종료한다."""
+    global _pool_users
+    with _pool_lock:
+        _pool_users += 1
+    try:
+        yield
+    finally:
+        with _pool_lock:
+            _pool_users -= 1
+            if _pool_users == 0:
+                _shutdown_locked()
+
+
+def shutdown_bulk_pool() -> None:
+    """참조 수와 관계없이 풀 종료(프로세스 종료 시)"""
+    with _pool_lock:
+        _shutdown_locked()
+
+
+atexit.register(shutdown_bulk_pool)
+
+
+def length_buckets(texts: list[str], chunk_size: int) -> list[list[int]]:
+    """길이 내림차순으로 정렬한 인덱스를 chunk_size개씩 나눈 청크 목록(긴 청크를 먼저 배분)"""
+    order = sorted(range(len(texts)), key=lambda i: -len(texts[i]))
+    return [order[i:i + chunk_size] for i in range(0, len(order), chunk_size)]
+
+
+def embed_texts_bulk(texts: list[str], workers: Optional[int] = None) -> list[list[float]]:
+    """멀티 프로세스 대량 임베딩(입력 순서 유지)"""
+    if not texts:
+        return []
+    workers = resolve_workers(workers)
+    chunks = length_buckets(texts, max(1, settings.EMBEDDING_BULK_CHUNK))
+    out: Optional[np.ndarray] = None
+    per_worker: dict[int, list[float]] = {}
+    t0 = time.perf_counter()
+    with span("embedding.bulk", count=len(texts), workers=workers):
+        pool = _get_pool(workers)
+        futures = [pool.submit(_encode_chunk, cid, [texts[i] for i in idx]) for cid, idx in enumerate(chunks)]
+        for fut in as_completed(futures):
+            cid, vectors, pid, seconds = fut.result()
+            if out is None:
+                out = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+            out[chunks[cid]] = vectors
+            stats = per_worker.setdefault(pid, [0, 0.0])
+            stats[0] += len(vectors)
+            stats[1] += seconds
+    elapsed = time.perf_counter() - t0
+    for pid, (count, busy) in sorted(per_worker.items()):
+        print(f"[EMBED] worker pid={pid} texts={count} busy={busy:.1f}s rate={count / max(busy, 1e-9):.1f} texts/s")
+    print(
+        f"[EMBED] bulk | texts={len(texts)} chunks={len(chunks)} workers={workers} "
+        f"elapsed={elapsed:.1f}s rate={len(texts) / max(elapsed, 1e-9):.1f} texts/s"
+    )
+    return out.tolist()
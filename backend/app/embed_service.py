@@ -0,0 +1,290 @@
+"""
+공유 임베딩 서비스 프로세스
+- uvicorn 멀티 워커 배포 시 워커마다 bge-m3를 로딩하지 않도록, 모델을 소유하는 전용 프로세스를 띄운다.
+- 워커는 유닉스 소켓(또는 host:port)으로 요청하고, 서비스는 여러 워커의 요청을 모아 한 번에 encode 한다.
+- 프로토콜: multiprocessing.connection의 인증(HMAC 챌린지) + 바이트 메시지만 사용한다(pickle 미사용).
+  메시지 = 4바이트 헤더 길이 + JSON 헤더 + 본문
+  요청 {"id", "texts"} → 응답 {"id", "shape", "error"} + float32 행렬 바이트(행 우선)
+- 루프백이 아닌 host:port로 대기하려면 기본값이 아닌 EMBEDDING_SERVICE_AUTHKEY가 필요하다.
+
+실행:
+    python -m backend.app.embed_service            # EMBEDDING_SERVICE_ADDR에서 대기
+    EMBEDDING_SERVICE_ADDR=/tmp/monchat-embed.sock uvicorn backend.app.main:app --workers 4
+"""
+
+import ipaddress
+import json
+import os
+import queue
+import struct
+import threading
+import time
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Optional, Union
+
+import numpy as np
+
+from .settings import settings
+
+
+Address = Union[str, tuple[str, int]]
+
+_DEFAULT_AUTHKEY = "monchat"
+# 메시지 최대 크기(초과 시 연결 종료): 요청 문장/응답 벡터 모두 이 안에 들어와야 한다.
+_MAX_MESSAGE = 64 * 1024 * 1024
+_HEADER = struct.Struct("!I")
+
+
+def parse_address(addr: str) -> tuple[Address, str]:
+    """'host:port' → (host, port)/AF_INET, 그 외는 유닉스 소켓 경로/AF_UNIX"""
+    text = addr.strip()
+    if ":" in text and not text.startswith("/") and not os.path.isabs(text):
+        host, port = text.rsplit(":", 1)
+        return (host or "127.0.0.1", int(port)), "AF_INET"
+    return text, "AF_UNIX"
+
+
+def encode_message(header: dict, payload: bytes = b"") -> bytes:
+    head = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    return _HEADER.pack(len(head)) + head + payload
+
+
+def decode_message(data: bytes) -> tuple[dict, bytes]:
+    """(헤더, 본문). 형식이 맞지 않으면 ValueError"""
+    if len(data) < _HEADER.size:
+        raise ValueError("message too short")
+    (size,) = _HEADER.unpack_from(data)
+    end = _HEADER.size + size
+    if end > len(data):
+        raise ValueError("truncated message header")
+    header = json.loads(data[_HEADER.size:end].decode("utf-8"))
+    if not isinstance(header, dict):
+        raise ValueError("message header must be an object")
+    return header, data[end:]
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def check_listen_address(address: Address, family: str, authkey: str) -> None:
+    """루프백 밖으로 노출되는 TCP 대기에 공개된 기본 인증키/빈 키를 쓰지 않도록 차단"""
+    if family != "AF_INET":
+        return
+    host = address[0]
+    if not _is_loopback(host) and authkey in ("", _DEFAULT_AUTHKEY):
+        raise SystemExit(
+            f"refusing to listen on {host}:{address[1]} with the default EMBEDDING_SERVICE_AUTHKEY; "
+            "set a secret key or bind to 127.0.0.1"
+        )
+
+
+class EmbeddingServiceTimeout(RuntimeError):
+    """서비스 응답 대기 시간 초과(재시도하지 않음)"""
+
+
+class _Request:
+    __slots__ = ("texts", "reply", "req_id")
+
+    def __init__(self, texts: list[str], reply: "_Replier", req_id: int) -> None:
+        self.texts = texts
+        self.reply = reply
+        self.req_id = req_id
+
+
+class _Replier:
+    """연결별 응답 전송(여러 배치 스레드가 같은 연결에 쓰지 않도록 잠금)"""
+
+    def __init__(self, conn: Connection) -> None:
+        self.conn = conn
+        self.lock = threading.Lock()
+
+    def send(self, req_id, vectors: Optional[np.ndarray] = None, error: Optional[str] = None) -> None:
+        if vectors is not None:
+            vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+            msg = encode_message({"id": req_id, "shape": list(vectors.shape), "error": None}, vectors.tobytes())
+        else:
+            msg = encode_message({"id": req_id, "shape": None, "error": error})
+        with self.lock:
+            try:
+                self.conn.send_bytes(msg)
+            except (OSError, EOFError):
+                pass
+
+
+class EmbeddingService:
+    """요청 큐를 배치로 묶어 encode하는 서버"""
+
+    def __init__(self, address: Optional[str] = None) -> None:
+        self.address, self.family = parse_address(address or settings.EMBEDDING_SERVICE_ADDR)
+        self.requests: "queue.Queue[_Request]" = queue.Queue()
+        self.max_batch = max(1, settings.EMBEDDING_SERVICE_MAX_BATCH)
+        self.max_wait = settings.EMBEDDING_SERVICE_MAX_WAIT_MS / 1000.0
+        self._stop = threading.Event()
+
+    def _collect_batch(self) -> list[_Request]:
+        """첫 요청을 기다린 뒤 max_wait 동안 max_batch 문장까지 추가 요청을 모음"""
+        first = self.requests.get()
+        batch = [first]
+        size = len(first.texts)
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                req = self.requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(req)
+            size += len(req.texts)
+        return batch
+
+    def _batch_loop(self) -> None:
+        from .embeddings import encode_local
+
+        while not self._stop.is_set():
+            batch = self._collect_batch()
+            texts = [t for req in batch for t in req.texts]
+            try:
+                vectors = np.asarray(encode_local(texts), dtype=np.float32)
+            except Exception as e:
+                for req in batch:
+                    req.reply.send(req.req_id, error=f"{type(e).__name__}: {e}")
+                continue
+            offset = 0
+            for req in batch:
+                n = len(req.texts)
+                req.reply.send(req.req_id, vectors[offset:offset + n])
+                offset += n
+
+    def _serve_connection(self, conn: Connection) -> None:
+        replier = _Replier(conn)
+        try:
+            while True:
+                # 바이트 메시지만 받는다(pickle 역직렬화 없음). 최대 크기 초과 시 OSError로 연결 종료
+                header, _ = decode_message(conn.recv_bytes(_MAX_MESSAGE))
+                texts = header.get("texts")
+                if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                    replier.send(header.get("id"), error="ValueError: texts must be a list of strings")
+                    continue
+                self.requests.put(_Request(texts, replier, header.get("id")))
+        except (EOFError, OSError, ValueError, UnicodeDecodeError) as e:
+            if not isinstance(e, EOFError):
+                print(f"[EMBED-SVC] connection closed: {type(e).__name__}: {e}")
+        finally:
+            conn.close()
+
+    def serve_forever(self) -> None:
+        from .embeddings import get_embedding_model, mark_service_process
+
+        check_listen_address(self.address, self.family, settings.EMBEDDING_SERVICE_AUTHKEY)
+        mark_service_process()
+        if self.family == "AF_UNIX" and os.path.exists(self.address):
+            os.unlink(self.address)
+        # 모델을 먼저 로딩하여 첫 요청의 콜드 스타트 제거
+        t0 = time.perf_counter()
+        get_embedding_model()
+        print(f"[EMBED-SVC] model loaded in {time.perf_counter() - t0:.1f}s")
+        threading.Thread(target=self._batch_loop, name="embed-batcher", daemon=True).start()
+        authkey = settings.EMBEDDING_SERVICE_AUTHKEY.encode("utf-8")
+        with Listener(self.address, family=self.family, authkey=authkey) as listener:
+            if self.family == "AF_UNIX":
+                os.chmod(self.address, 0o660)
+            print(f"[EMBED-SVC] listening on {self.address} (max_batch={self.max_batch}, max_wait={self.max_wait * 1000:.0f}ms)")
+            while not self._stop.is_set():
+                try:
+                    conn = listener.accept()
+                except (OSError, EOFError) as e:
+                    print(f"[EMBED-SVC] accept failed: {e}")
+                    continue
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+
+
+class EmbeddingServiceClient:
+    """API 워커용 클라이언트: 스레드별 영구 연결, 연결 끊김 시 1회 재연결"""
+
+    def __init__(self, address: Optional[str] = None) -> None:
+        self.address, self.family = parse_address(address or settings.EMBEDDING_SERVICE_ADDR)
+        self.authkey = settings.EMBEDDING_SERVICE_AUTHKEY.encode("utf-8")
+        self.timeout = settings.EMBEDDING_SERVICE_TIMEOUT
+        self._local = threading.local()
+        self._seq = 0
+        self._seq_lock = threading.Lock()
+
+    def _conn(self) -> Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = Client(self.address, family=self.family, authkey=self.authkey)
+            self._local.conn = conn
+        return conn
+
+    def _reset(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+    def _next_id(self) -> int:
+        with self._seq_lock:
+            self._seq += 1
+            return self._seq
+
+    def _roundtrip(self, texts: list[str]):
+        conn = self._conn()
+        req_id = self._next_id()
+        conn.send_bytes(encode_message({"id": req_id, "texts": list(texts)}))
+        if not conn.poll(self.timeout):
+            self._reset()
+            raise EmbeddingServiceTimeout(f"embedding service timeout after {self.timeout}s")
+        try:
+            header, payload = decode_message(conn.recv_bytes(_MAX_MESSAGE))
+        except (ValueError, UnicodeDecodeError) as e:
+            self._reset()
+            raise OSError(f"malformed embedding service response: {e}") from e
+        if header.get("id") != req_id:
+            self._reset()
+            raise OSError("embedding service response out of order")
+        if header.get("error"):
+            raise RuntimeError(f"embedding service error: {header['error']}")
+        return np.frombuffer(payload, dtype=np.float32).reshape(header["shape"])
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        try:
+            vectors = self._roundtrip(texts)
+        except (OSError, EOFError):
+            # 서비스 재시작 등으로 끊긴 연결은 1회 재연결 후 재시도
+            self._reset()
+            vectors = self._roundtrip(texts)
+        return vectors.tolist()
+
+
+_client: Optional[EmbeddingServiceClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> EmbeddingServiceClient:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = EmbeddingServiceClient()
+    return _client
+
+
+def main() -> None:
+    if not settings.EMBEDDING_SERVICE_ADDR:
+        raise SystemExit("EMBEDDING_SERVICE_ADDR is not set (e.g. /tmp/monchat-embed.sock)")
+    EmbeddingService().serve_forever()
+
+
+if __name__ == "__main__":
+    main()
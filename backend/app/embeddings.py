@@ -2,6 +2,8 @@
 문장 임베딩 유틸리티
 - sentence-transformers 모델을 로드하여 텍스트를 벡터로 변환한다.
 - 모델은 LRU 캐시로 1회만 로딩하여 성능을 최적화한다.
+- torch/sentence-transformers는 모델 로딩 시점에만 임포트한다.
+  (임베딩 서비스 위임·VECTORDB 비활성 실행에서는 로딩하지 않음)
 """
 
 import os
@@ -11,10 +13,11 @@ os.environ.setdefault("TRANSFORMERS_NO_FLAX", "1")
 os.environ.setdefault("TRANSFORMERS_NO_TORCHVISION", "1")
 os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
 
-from sentence_transformers import SentenceTransformer
-import torch
+import time
 from functools import lru_cache
 from .settings import settings
+from .metrics import MODEL_LOADED, MODEL_LOAD_SECONDS
+from .tracing import span
 
 
 @lru_cache(maxsize=1)
@@ -23,6 +26,9 @@ def get_embedding_model():
 
     첫 호출 시 모델을 다운로드/로딩하고 이후에는 캐시된 인스턴스를 재사용한다.
     """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
     device_arg = None
     if settings.EMBEDDING_DEVICE.lower() == "cuda":
         device_arg = "cuda" if torch.cuda.is_available() else "cpu"
@@ -82,22 +88,65 @@ def get_embedding_model():
         # sentence-transformers는 use_auth_token 인자를 지원
         loader_kwargs["use_auth_token"] = settings.HF_TOKEN
 
-    return SentenceTransformer(
+    t0 = time.perf_counter()
+    model = SentenceTransformer(
         model_source,
         **loader_kwargs,
     )
+    # 행/요약 문서 길이에 맞춰 최대 토큰 길이 제한(긴 이상치 문서가 배치 전체 패딩을 키우지 않도록)
+    if settings.EMBEDDING_MAX_SEQ_LENGTH > 0:
+        cap = settings.EMBEDDING_MAX_SEQ_LENGTH
+        model.max_seq_length = min(model.max_seq_length or cap, cap)
+    MODEL_LOAD_SECONDS.set(time.perf_counter() - t0)
+    MODEL_LOADED.set(1)
+    return model
 
 
 def embed_texts(texts: list[str]) -> list[list[float]]:
-    """여러 문장을 임베딩하여 벡터 리스트 반환"""
-    model = get_embedding_model()
-    embeddings = model.encode(
-        texts,
-        batch_size=settings.EMBEDDING_BATCH_SIZE,
-        normalize_embeddings=True,
-        show_progress_bar=False,
-        convert_to_tensor=False,
-    )
+    """여러 문장을 임베딩하여 벡터 리스트 반환
+
+    EMBEDDING_SERVICE_ADDR가 지정되어 있으면 공유 임베딩 서비스 프로세스에 위임하여
+    API 워커마다 모델을 중복 로딩하지 않는다(backend.app.embed_service).
+    """
+    if not texts:
+        return []
+    if settings.EMBEDDING_SERVICE_ADDR and not _is_service_process():
+        from .embed_service import get_client
+
+        try:
+            with span("embedding.service", count=len(texts)):
+                return get_client().embed(texts)
+        except (OSError, EOFError) as e:
+            if not settings.EMBEDDING_SERVICE_FALLBACK_LOCAL:
+                raise RuntimeError(f"embedding service unavailable: {e}") from e
+    return encode_local(texts)
+
+
+_SERVICE_PROCESS = False
+
+
+def _is_service_process() -> bool:
+    return _SERVICE_PROCESS
+
+
+def mark_service_process() -> None:
+    """현재 프로세스를 임베딩 서비스 프로세스로 표시(서비스 내부에서는 항상 로컬 모델 사용)"""
+    global _SERVICE_PROCESS
+    _SERVICE_PROCESS = True
+
+
+def encode_local(texts: list[str]) -> list[list[float]]:
+    """현재 프로세스에 로딩된 모델로 임베딩"""
+    with span("embedding.load_model"):
+        model = get_embedding_model()
+    with span("embedding.encode", count=len(texts)):
+        embeddings = model.encode(
+            texts,
+            batch_size=settings.EMBEDDING_BATCH_SIZE,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+            convert_to_tensor=False,
+        )
     # SentenceTransformers가 리스트/넘파이/텐서를 상황에 따라 반환하므로 안전 변환
     if hasattr(embeddings, "tolist"):
         return embeddings.tolist()
@@ -2,12 +2,16 @@
 사내 LLM(Ollama 기반) 동기 클라이언트
 - Chat API: POST {LLM_BASE_URL}{LLM_CHAT_PATH}
 - 요청/응답 스키마 단순 래핑 및 에러 처리
+- LLM_BACKENDS 지정 시 백엔드 풀(llm_pool)로 라우팅, base_url을 직접 주면 해당 서버만 사용
 """
 
 from typing import Dict, Any, Optional
 import requests
 
+from .admission import cap_timeout
+from .llm_pool import get_llm_pool
 from .settings import settings
+from .tracing import span
 
 
 class LLMClient:
@@ -26,6 +30,8 @@ class LLMClient:
         self.default_model = default_model or settings.LLM_DEFAULT_MODEL
         self.timeout = timeout or settings.LLM_TIMEOUT
         self.stream = settings.LLM_STREAM if stream is None else stream
+        # 서버를 직접 지정하지 않았으면 멀티 호스트 풀 사용(LLM_BACKENDS 미지정 시 None)
+        self.pool = get_llm_pool() if base_url is None else None
 
     def chat(self, prompt: str, model: Optional[str] = None, stream: Optional[bool] = None) -> Dict[str, Any]:
         """Chat API 호출
@@ -45,11 +51,19 @@ class LLMClient:
             "messages": [{"role": "user", "content": prompt}],
             "stream": settings.LLM_STREAM if stream is None else stream,
         }
+        if settings.LLM_KEEP_ALIVE:
+            payload["keep_alive"] = settings.LLM_KEEP_ALIVE
+
+        if self.pool is not None:
+            with span("llm.chat", model=payload["model"], pool=len(self.pool.backends)):
+                return self.pool.post(self.chat_path, payload, self.timeout)
 
         url = f"{self.base_url}{self.chat_path}"
-        resp = requests.post(url, json=payload, timeout=self.timeout)
-        resp.raise_for_status()
-        return resp.json()
+        with span("llm.chat", model=payload["model"]):
+            # 클라이언트 기한(X-Request-Timeout)이 있으면 남은 시간 안에서만 기다린다.
+            resp = requests.post(url, json=payload, timeout=cap_timeout(self.timeout))
+            resp.raise_for_status()
+            return resp.json()
 
 
 def extract_response_text(response_json: Dict[str, Any]) -> str:
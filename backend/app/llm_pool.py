@@ -0,0 +1,357 @@
+"""
+LLM 백엔드 풀(멀티 호스트 라우팅)
+- LLM_BACKENDS에 Ollama 서버를 여러 개 지정하면 LLMClient가 요청마다 백엔드를 고른다.
+  형식: 'URL[=모델|모델...]'을 콤마로 구분. '=' 뒤 모델은 해당 호스트에 상주시킬 모델(모델 친화도)
+  예) http://pgaiap09:11434=qwen3:8b,http://pgaiap10:11434=gemma3:27b-it-q4_0
+- 백엔드 선택 순서(앞 단계에 후보가 있으면 그 안에서만 고른다)
+  1) 요청 모델의 친화 호스트  2) 모델이 이미 적재된 호스트(/api/ps)  3) 모델을 보유한 호스트(/api/tags)  4) 정상 호스트 전체
+  같은 단계 안에서는 진행 중 요청 수가 가장 적은 백엔드(least outstanding requests), 동률이면 순환
+- 헬스 체크: LLM_HEALTH_INTERVAL초마다 /api/tags, /api/ps 조회. 실패한 백엔드는 다음 성공 전까지 라우팅에서 제외
+  요청 중 연결 오류/타임아웃/5xx는 다른 백엔드로 1회 재시도하고, 모두 실패하면 마지막 업스트림 오류를 그대로 올린다
+  (NoBackendAvailable은 보낼 수 있는 정상 백엔드가 없을 때만).
+  연결 오류/타임아웃이 LLM_FAIL_THRESHOLD회 연속되면 헬스 체크 스레드가 곧바로 점검해 실패할 때만 제외한다.
+  5xx는 호스트가 응답한 것(모델/요청 문제)이므로 호스트 상태에 반영하지 않는다.
+- keep-alive: 채팅 요청에 keep_alive(LLM_KEEP_ALIVE)를 실어 모델을 상주시키고, 헬스 체크 때 친화 모델이
+  적재되어 있지 않으면 프롬프트 없는 /api/generate 요청으로 미리 적재(preload)하여 첫 요청의 콜드 로딩을 피한다.
+  다른 호스트 장애로 비친화 모델 요청을 받고 있는 동안(헬스 체크 3주기)에는 적재를 미뤄 모델 교체 반복을 막는다.
+- 풀 상태는 프로세스(워커)별이다.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from urllib.parse import urlparse
+
+import requests
+
+from .admission import cap_timeout
+from .metrics import LLM_BACKEND_OUTSTANDING, LLM_BACKEND_UP, LLM_ROUTED_TOTAL
+from .settings import settings
+
+
+def _model_key(name: str) -> str:
+    """태그 생략 모델명은 ':latest'로 취급(Ollama 규칙)"""
+    name = name.strip()
+    return name if ":" in name else f"{name}:latest"
+
+
+class Backend:
+    """LLM 백엔드 1개의 상태(풀 잠금 안에서만 변경)"""
+
+    def __init__(self, url: str, affinity: tuple[str, ...] = ()) -> None:
+        self.url = url.rstrip("/")
+        parsed = urlparse(self.url)
+        self.label = parsed.netloc or self.url
+        self.affinity = {_model_key(m) for m in affinity}
+        # 첫 헬스 체크 전에는 정상으로 가정
+        self.healthy = True
+        self.outstanding = 0
+        # 보유 모델(/api/tags), 적재 모델(/api/ps, None이면 미지원)
+        self.available: set[str] = set()
+        self.loaded: Optional[set[str]] = None
+        self.preloaded: set[str] = set()
+        # 요청 중 연속 연결 오류 수(성공 시 0)
+        self.failures = 0
+        # 친화 모델이 아닌 요청을 마지막으로 받은 시각(preload 보류 판단용)
+        self.foreign_at = 0.0
+        self.last_error = ""
+        self.checked_at = 0.0
+
+    def status(self) -> dict:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "affinity": sorted(self.affinity),
+            "loaded": sorted(self.loaded) if self.loaded is not None else None,
+            "last_error": self.last_error,
+        }
+
+
+def parse_backends(spec: str) -> list[Backend]:
+    """LLM_BACKENDS 문자열 → Backend 목록"""
+    backends = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        url, _, models = item.partition("=")
+        backends.append(Backend(url.strip(), tuple(m for m in models.split("|") if m.strip())))
+    return backends
+
+
+class NoBackendAvailable(RuntimeError):
+    pass
+
+
+class LLMBackendPool:
+    """라우팅 + 헬스 체크 + 모델 상주 관리"""
+
+    def __init__(
+        self,
+        backends: list[Backend],
+        health_interval: Optional[float] = None,
+        probe_timeout: Optional[float] = None,
+        keep_alive: Optional[str] = None,
+        preload: Optional[bool] = None,
+    ) -> None:
+        if not backends:
+            raise ValueError("LLM backend pool needs at least one backend")
+        self.backends = backends
+        self.health_interval = settings.LLM_HEALTH_INTERVAL if health_interval is None else health_interval
+        self.probe_timeout = settings.LLM_HEALTH_TIMEOUT if probe_timeout is None else probe_timeout
+        self.keep_alive = settings.LLM_KEEP_ALIVE if keep_alive is None else keep_alive
+        self.preload = settings.LLM_PRELOAD if preload is None else preload
+        self.fail_threshold = max(1, settings.LLM_FAIL_THRESHOLD)
+        self._lock = threading.Lock()
+        self._rr = 0
+        self._preloading: set[tuple[str, str]] = set()
+        self._stop = threading.Event()
+        # 헬스 체크 주기를 기다리지 않고 점검할 백엔드(요청 중 연속 실패)
+        self._suspects: set[Backend] = set()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        for b in backends:
+            LLM_BACKEND_UP.labels(backend=b.label).set(1)
+
+    # ---- 라우팅 ----
+    def choose(self, model: str, exclude: tuple[Backend, ...] = ()) -> tuple[Backend, str]:
+        """(백엔드, 선택 사유) 반환. 정상 백엔드가 없으면 NoBackendAvailable"""
+        key = _model_key(model)
+        with self._lock:
+            healthy = [b for b in self.backends if b.healthy and b not in exclude]
+            if not healthy:
+                raise NoBackendAvailable("no healthy LLM backend")
+            tiers = (
+                ("affinity", [b for b in healthy if key in b.affinity]),
+                ("resident", [b for b in healthy if b.loaded is not None and key in b.loaded]),
+                ("available", [b for b in healthy if key in b.available]),
+                ("any", healthy),
+            )
+            reason, candidates = next((name, c) for name, c in tiers if c)
+            least = min(b.outstanding for b in candidates)
+            ties = [b for b in candidates if b.outstanding == least]
+            self._rr += 1
+            backend = ties[self._rr % len(ties)]
+            backend.outstanding += 1
+            if backend.affinity and key not in backend.affinity:
+                backend.foreign_at = time.monotonic()
+        LLM_BACKEND_OUTSTANDING.labels(backend=backend.label).inc()
+        return backend, reason
+
+    def _release(self, backend: Backend) -> None:
+        with self._lock:
+            backend.outstanding -= 1
+        LLM_BACKEND_OUTSTANDING.labels(backend=backend.label).dec()
+
+    @contextmanager
+    def acquire(self, model: str, exclude: tuple[Backend, ...] = ()) -> Iterator[Backend]:
+        backend, reason = self.choose(model, exclude)
+        LLM_ROUTED_TOTAL.labels(backend=backend.label, reason=reason).inc()
+        try:
+            yield backend
+        finally:
+            self._release(backend)
+
+    def mark_down(self, backend: Backend, error: str) -> None:
+        with self._lock:
+            backend.healthy = False
+            backend.last_error = error
+        LLM_BACKEND_UP.labels(backend=backend.label).set(0)
+        print(f"[LLM_POOL] backend down | {backend.label} | {error}")
+
+    def _record_failure(self, backend: Backend, error: str) -> None:
+        """요청 중 연결 오류/타임아웃 기록. 임계치에 도달하면 헬스 체크 스레드에 즉시 점검 요청(실패 시 probe가 제외)"""
+        with self._lock:
+            backend.failures += 1
+            backend.last_error = error
+            failures = backend.failures
+            suspect = failures >= self.fail_threshold and backend.healthy and backend not in self._suspects
+            if suspect:
+                self._suspects.add(backend)
+        if suspect:
+            print(f"[LLM_POOL] {failures} consecutive failures | {backend.label} | {error} | probe scheduled")
+            self._wake.set()
+
+    def _record_success(self, backend: Backend) -> None:
+        if backend.failures:
+            with self._lock:
+                backend.failures = 0
+
+    def post(self, path: str, payload: dict, timeout: float) -> dict:
+        """모델에 맞는 백엔드로 POST(연결 오류/타임아웃/5xx 시 다른 백엔드로 1회 재시도)
+
+        재시도할 백엔드가 없으면 마지막 업스트림 오류(HTTPError/ConnectionError/Timeout)를 그대로 올린다.
+        5xx는 이번 요청에서만 해당 백엔드를 제외하고, 연결 오류/타임아웃만 호스트 상태(연속 실패 수)에 반영한다.
+        """
+        model = payload.get("model") or settings.LLM_DEFAULT_MODEL
+        if self.keep_alive and "keep_alive" not in payload:
+            payload = {**payload, "keep_alive": self.keep_alive}
+        tried: tuple[Backend, ...] = ()
+        last_error: Optional[requests.RequestException] = None
+        while True:
+            try:
+                with self.acquire(model, exclude=tried) as backend:
+                    try:
+                        resp = requests.post(f"{backend.url}{path}", json=payload, timeout=cap_timeout(timeout))
+                        if resp.status_code < 500:
+                            self._record_success(backend)
+                            resp.raise_for_status()
+                            return resp.json()
+                        # 호스트는 응답했으므로 모델/요청 문제로 보고 상태에 반영하지 않는다.
+                        print(f"[LLM_POOL] backend error | {backend.label} | {model} | HTTP {resp.status_code}")
+                        resp.raise_for_status()
+                    except requests.HTTPError as e:
+                        if e.response is None or e.response.status_code < 500:
+                            raise
+                        last_error = e
+                    except (requests.ConnectionError, requests.Timeout) as e:
+                        self._record_failure(backend, type(e).__name__)
+                        last_error = e
+                    tried += (backend,)
+            except NoBackendAvailable:
+                # 재시도할 정상 백엔드가 없으면 이번 요청의 업스트림 오류를 알린다(처음부터 없으면 그대로).
+                if last_error is None:
+                    raise
+                raise last_error from None
+            if len(tried) >= 2 or len(tried) >= len(self.backends):
+                raise last_error
+
+    # ---- 헬스 체크 / 상주 관리 ----
+    def probe(self, backend: Backend) -> bool:
+        """/api/tags(보유 모델) + /api/ps(적재 모델) 조회 후 상태 갱신"""
+        try:
+            resp = requests.get(f"{backend.url}/api/tags", timeout=self.probe_timeout)
+            resp.raise_for_status()
+            available = {_model_key(m.get("name", "")) for m in resp.json().get("models", [])}
+            loaded: Optional[set[str]] = None
+            ps = requests.get(f"{backend.url}/api/ps", timeout=self.probe_timeout)
+            if ps.status_code == 200:
+                loaded = {_model_key(m.get("name", "")) for m in ps.json().get("models", [])}
+        except (requests.RequestException, ValueError) as e:
+            if backend.healthy:
+                self.mark_down(backend, f"probe: {type(e).__name__}")
+            with self._lock:
+                backend.last_error = f"probe: {type(e).__name__}"
+                backend.checked_at = time.monotonic()
+            return False
+        with self._lock:
+            recovered = not backend.healthy
+            backend.healthy = True
+            backend.available = available
+            backend.loaded = loaded
+            backend.last_error = ""
+            backend.checked_at = time.monotonic()
+            backend.failures = 0
+            if recovered:
+                # 재기동된 호스트는 모델이 내려가 있으므로 /api/ps 미지원이어도 다시 적재
+                backend.preloaded.clear()
+        LLM_BACKEND_UP.labels(backend=backend.label).set(1)
+        if recovered:
+            print(f"[LLM_POOL] backend up | {backend.label}")
+        if self.preload:
+            self._preload_missing(backend)
+        return True
+
+    def _preload_missing(self, backend: Backend) -> None:
+        if time.monotonic() - backend.foreign_at < 3 * self.health_interval:
+            return
+        for model in backend.affinity:
+            if backend.available and model not in backend.available:
+                continue
+            if backend.loaded is not None:
+                if model in backend.loaded:
+                    continue
+            elif model in backend.preloaded:
+                continue
+            key = (backend.url, model)
+            with self._lock:
+                if key in self._preloading:
+                    continue
+                self._preloading.add(key)
+            threading.Thread(
+                target=self._preload, args=(backend, model), name="monchat-llm-preload", daemon=True
+            ).start()
+
+    def _preload(self, backend: Backend, model: str) -> None:
+        """프롬프트 없는 /api/generate = 모델 적재만 수행(Ollama)"""
+        t0 = time.perf_counter()
+        try:
+            payload = {"model": model}
+            if self.keep_alive:
+                payload["keep_alive"] = self.keep_alive
+            resp = requests.post(f"{backend.url}/api/generate", json=payload, timeout=settings.LLM_TIMEOUT)
+            resp.raise_for_status()
+            with self._lock:
+                backend.preloaded.add(model)
+            print(f"[LLM_POOL] preloaded | {backend.label} | {model} | {time.perf_counter() - t0:.1f}s")
+        except requests.RequestException as e:
+            print(f"[LLM_POOL] preload failed | {backend.label} | {model} | {type(e).__name__}")
+        finally:
+            with self._lock:
+                self._preloading.discard((backend.url, model))
+
+    def probe_all(self) -> None:
+        with self._lock:
+            self._suspects.clear()
+        for backend in self.backends:
+            self.probe(backend)
+
+    def _probe_suspects(self) -> None:
+        with self._lock:
+            suspects, self._suspects = self._suspects, set()
+        for backend in suspects:
+            self.probe(backend)
+
+    def _run(self) -> None:
+        while True:
+            self.probe_all()
+            deadline = time.monotonic() + self.health_interval
+            while (remaining := deadline - time.monotonic()) > 0:
+                # 요청 중 연속 실패로 점검 요청이 오면 주기를 기다리지 않고 해당 백엔드만 점검
+                self._wake.wait(remaining)
+                if self._stop.is_set():
+                    return
+                if self._wake.is_set():
+                    self._wake.clear()
+                    self._probe_suspects()
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="monchat-llm-health", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def status(self) -> list[dict]:
+        with self._lock:
+            return [b.status() for b in self.backends]
+
+
+_pool: Optional[LLMBackendPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_llm_pool() -> Optional[LLMBackendPool]:
+    """LLM_BACKENDS가 지정된 경우 풀 싱글톤(헬스 체크 스레드 시작 포함), 아니면 None"""
+    global _pool
+    if not settings.LLM_BACKENDS.strip():
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                pool = LLMBackendPool(parse_backends(settings.LLM_BACKENDS))
+                pool.start()
+                _pool = pool
+    return _pool
+
+
+def shutdown_llm_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.stop()
+        _pool = None
@@ -1,18 +1,31 @@
 """
 FastAPI 애플리케이션 엔트리 포인트
 - CORS 설정으로 Streamlit 프론트엔드에서의 접근을 허용한다.
-- 헬스체크/QA 라우터를 등록한다.
+- 헬스체크/QA/LLM/메트릭 라우터를 등록한다.
+- 요청 단위 트레이싱 미들웨어와 옵트인 샘플링 프로파일러를 구성한다.
+- LLM_BACKENDS 지정 시 기동과 함께 LLM 백엔드 풀 헬스 체크/모델 적재를 시작한다.
+- /qa, /llm/chat에는 수용 제어(동시 처리 수/대기열 제한, 초과 시 429/503 + Retry-After)를 적용한다.
 """
 
-from fastapi import FastAPI
+import time
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from .admission import AdmissionMiddleware
 from .settings import settings
-from .routers import health, qa
+from .tracing import start_trace, log_if_slow
+from .profiler import PeriodicProfileDumper
+from .routers import health, qa, metrics, series
 from .routers import llm as llm_router
 
 # 애플리케이션 인스턴스 생성
 app = FastAPI(title=settings.APP_NAME)
 
+# 수용 제어: 가장 안쪽 미들웨어로 두어 거절 응답에도 CORS/트레이스 헤더가 붙도록 한다.
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware)
+
 # CORS 설정: 프론트엔드 오리진에서의 호출 허용
 app.add_middleware(
     CORSMiddleware,
@@ -22,10 +35,74 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 큰 JSON(시계열 등) 응답 압축
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # 라우터 등록
 app.include_router(health.router, prefix="/health", tags=["health"]) 
 app.include_router(qa.router, prefix="/qa", tags=["qa"])
 app.include_router(llm_router.router, prefix="/llm", tags=["llm"])
+app.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
+app.include_router(series.router, prefix="/series", tags=["series"])
+
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """요청마다 트레이스를 시작하고, 느린 요청은 구간 분해와 함께 slow 로그에 기록"""
+    if not settings.TRACE_ENABLED:
+        return await call_next(request)
+    trace_id = request.headers.get("x-trace-id")
+    with start_trace(f"{request.method} {request.url.path}", trace_id=trace_id) as trace:
+        t0 = time.perf_counter()
+        response = await call_next(request)
+        total_ms = (time.perf_counter() - t0) * 1000.0
+    response.headers["X-Trace-Id"] = trace.trace_id
+    timing = trace.server_timing()
+    response.headers["Server-Timing"] = f"{timing}, total;dur={total_ms:.1f}" if timing else f"total;dur={total_ms:.1f}"
+    log_if_slow(trace, total_ms, status=response.status_code)
+    return response
+
+
+_profile_dumper = PeriodicProfileDumper() if settings.PROFILE_ENABLED else None
+
+
+@app.on_event("startup")
+def _start_profiler():
+    if _profile_dumper is not None:
+        _profile_dumper.start()
+
+
+@app.on_event("startup")
+def _start_llm_pool():
+    # 기동 시점에 헬스 체크/친화 모델 적재를 시작하여 첫 요청의 콜드 로딩을 피한다.
+    if settings.LLM_ENABLED and settings.LLM_BACKENDS:
+        from .llm_pool import get_llm_pool
+
+        get_llm_pool()
+
+
+@app.on_event("shutdown")
+def _stop_profiler():
+    if _profile_dumper is not None:
+        _profile_dumper.stop()
+
+
+@app.on_event("shutdown")
+def _stop_llm_pool():
+    from .llm_pool import shutdown_llm_pool
+
+    shutdown_llm_pool()
+
+
+@app.on_event("shutdown")
+async def _close_async_qa():
+    # 비동기 /qa 경로의 asyncpg 풀/임베딩 실행기 정리(사용하지 않았으면 아무 것도 하지 않음)
+    from .db.vector_async import close_async_pool
+    from .embed_async import shutdown_embed_executor
+
+    await close_async_pool()
+    shutdown_embed_executor()
+
 
 @app.get("/")
 def root():
@@ -0,0 +1,193 @@
+"""
+Prometheus 메트릭 정의
+- API: 단계별 지연시간 히스토그램, 폴백/캐시/에러/수용 제어 카운터, 처리 중·대기 요청·모델 로딩 게이지
+- ETL: 배치 실행 단위 메트릭(별도 레지스트리) → textfile collector 또는 Pushgateway로 내보냄
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    push_to_gateway,
+    write_to_textfile,
+)
+
+from .settings import settings
+
+
+# 임베딩(CPU)·DB·LLM 구간을 모두 담을 수 있도록 ms~분 단위 버킷 사용
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+# ----------------------------------------------------------------------------
+# API 메트릭 (기본 레지스트리 → /metrics)
+# ----------------------------------------------------------------------------
+STAGE_SECONDS = Histogram(
+    "monchat_stage_seconds",
+    "요청 처리 단계별 소요 시간(초)",
+    ["endpoint", "stage"],
+    buckets=_LATENCY_BUCKETS,
+)
+LLM_UPSTREAM_SECONDS = Histogram(
+    "monchat_llm_upstream_seconds",
+    "LLM 업스트림 호출 소요 시간(초)",
+    ["model"],
+    buckets=_LATENCY_BUCKETS,
+)
+FALLBACK_TOTAL = Counter(
+    "monchat_fallback_total",
+    "벡터 검색 실패로 키워드 검색에 폴백한 횟수",
+    ["endpoint", "reason"],
+)
+CACHE_TOTAL = Counter(
+    "monchat_cache_requests_total",
+    "캐시 조회 결과(hit/miss)",
+    ["cache", "result"],
+)
+ERRORS_TOTAL = Counter(
+    "monchat_errors_total",
+    "엔드포인트별 오류 횟수",
+    ["endpoint", "kind"],
+)
+INFLIGHT = Gauge(
+    "monchat_inflight",
+    "처리 중인 작업 수(resource=http:<endpoint> | db | llm)",
+    ["resource"],
+)
+ADMISSION_TOTAL = Counter(
+    "monchat_admission_total",
+    "수용 제어 결과(admitted | bypass | rejected_full | rejected_timeout)",
+    ["gate", "result"],
+)
+ADMISSION_WAITING = Gauge(
+    "monchat_admission_waiting",
+    "수용 대기열에서 기다리는 요청 수",
+    ["gate"],
+)
+LLM_CONTEXT_TOKENS = Counter(
+    "monchat_llm_context_tokens_total",
+    "/llm/chat context 추정 토큰 수(raw=원본 행, sent=압축 후 실제 전송)",
+    ["stage"],
+)
+LLM_BACKEND_UP = Gauge(
+    "monchat_llm_backend_up",
+    "LLM 백엔드 헬스 상태(1=정상, 0=제외)",
+    ["backend"],
+)
+LLM_BACKEND_OUTSTANDING = Gauge(
+    "monchat_llm_backend_outstanding",
+    "LLM 백엔드별 진행 중 요청 수",
+    ["backend"],
+)
+LLM_ROUTED_TOTAL = Counter(
+    "monchat_llm_routed_total",
+    "LLM 요청 라우팅 결과(reason=affinity | resident | available | any)",
+    ["backend", "reason"],
+)
+MODEL_LOADED = Gauge(
+    "monchat_embedding_model_loaded",
+    "임베딩 모델 로딩 상태(0=미로딩, 1=로딩 완료)",
+)
+MODEL_LOAD_SECONDS = Gauge(
+    "monchat_embedding_model_load_seconds",
+    "임베딩 모델 최초 로딩 소요 시간(초)",
+)
+
+
+@contextmanager
+def observe_stage(endpoint: str, stage: str) -> Iterator[None]:
+    """with 블록의 소요 시간을 STAGE_SECONDS에 기록"""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(endpoint=endpoint, stage=stage).observe(time.perf_counter() - t0)
+
+
+@contextmanager
+def track_inflight(resource: str) -> Iterator[None]:
+    """with 블록 동안 INFLIGHT 게이지를 1 증가"""
+    gauge = INFLIGHT.labels(resource=resource)
+    gauge.inc()
+    try:
+        yield
+    finally:
+        gauge.dec()
+
+
+# ----------------------------------------------------------------------------
+# ETL 메트릭 (배치 프로세스 전용 레지스트리)
+# ----------------------------------------------------------------------------
+ETL_REGISTRY = CollectorRegistry()
+ETL_ROWS = Gauge(
+    "monchat_etl_rows",
+    "최근 ETL 실행의 소스별 처리 행 수(phase=collected|embedded|loaded)",
+    ["source", "phase"],
+    registry=ETL_REGISTRY,
+)
+ETL_STAGE_SECONDS = Gauge(
+    "monchat_etl_stage_seconds",
+    "최근 ETL 실행의 단계별 누적 소요 시간(초)",
+    ["stage"],
+    registry=ETL_REGISTRY,
+)
+ETL_LAST_SUCCESS = Gauge(
+    "monchat_etl_last_success_timestamp_seconds",
+    "마지막 ETL 성공 종료 시각(unix time)",
+    registry=ETL_REGISTRY,
+)
+ETL_LAST_RUN_SUCCESS = Gauge(
+    "monchat_etl_last_run_success",
+    "최근 ETL 실행 결과(1=성공, 0=실패)",
+    registry=ETL_REGISTRY,
+)
+ETL_LAST_RUN_SECONDS = Gauge(
+    "monchat_etl_last_run_duration_seconds",
+    "최근 ETL 실행 소요 시간(초, 실패한 실행 포함)",
+    registry=ETL_REGISTRY,
+)
+
+
+class EtlRunMetrics:
+    """ETL 1회 실행 동안의 행 수/단계 시간을 누적하고 종료 시 내보낸다."""
+
+    def __init__(self) -> None:
+        self.rows: dict[tuple[str, str], int] = {}
+        self.stages: dict[str, float] = {}
+        self.started = time.perf_counter()
+
+    def add_rows(self, source: str, phase: str, count: int) -> None:
+        key = (source, phase)
+        self.rows[key] = self.rows.get(key, 0) + count
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - t0)
+
+    def export(self, success: bool = True) -> None:
+        """레지스트리에 반영 후 ETL_METRICS_TEXTFILE / ETL_METRICS_PUSHGATEWAY로 내보냄(실패한 실행은 success=False)"""
+        for (source, phase), count in self.rows.items():
+            ETL_ROWS.labels(source=source, phase=phase).set(count)
+        for name, seconds in self.stages.items():
+            ETL_STAGE_SECONDS.labels(stage=name).set(seconds)
+        ETL_LAST_RUN_SUCCESS.set(1 if success else 0)
+        ETL_LAST_RUN_SECONDS.set(time.perf_counter() - self.started)
+        if success:
+            ETL_LAST_SUCCESS.set_to_current_time()
+        if settings.ETL_METRICS_TEXTFILE:
+            write_to_textfile(settings.ETL_METRICS_TEXTFILE, ETL_REGISTRY)
+        if settings.ETL_METRICS_PUSHGATEWAY:
+            try:
+                push_to_gateway(settings.ETL_METRICS_PUSHGATEWAY, job="monchat_etl", registry=ETL_REGISTRY)
+            except Exception as e:
+                # 메트릭 전송 실패가 ETL 결과에 영향을 주지 않도록 함
+                print(f"[ETL] metrics push failed: {e}")
@@ -0,0 +1,123 @@
+"""
+옵트인 샘플링 프로파일러
+- 백그라운드 스레드가 PROFILE_INTERVAL_MS마다 모든 스레드의 호출 스택을 샘플링한다(sys._current_frames).
+- 결과는 flamegraph.pl / speedscope / inferno가 바로 읽는 folded(collapsed) 포맷으로 저장:
+    thread;module:func:line;module:func:line <count>
+- 디버거 부착 없이 운영 중 API 프로세스 또는 단일 ETL 실행의 핫스팟을 찾기 위한 용도
+"""
+
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional
+
+from .settings import settings
+
+
+class SamplingProfiler:
+    """스택 샘플링 프로파일러(순수 파이썬, 추가 의존성 없음)"""
+
+    def __init__(self, interval_ms: Optional[float] = None, max_depth: int = 128) -> None:
+        self.interval = (interval_ms or settings.PROFILE_INTERVAL_MS) / 1000.0
+        self.max_depth = max_depth
+        self.samples: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _collapse(self, frame, thread_name: str) -> str:
+        parts: list[str] = []
+        depth = 0
+        while frame is not None and depth < self.max_depth:
+            code = frame.f_code
+            module = frame.f_globals.get("__name__", "?")
+            parts.append(f"{module}:{code.co_name}:{frame.f_lineno}")
+            frame = frame.f_back
+            depth += 1
+        parts.append(thread_name)
+        return ";".join(reversed(parts))
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            frames = sys._current_frames()
+            batch = [
+                self._collapse(frame, names.get(ident, str(ident)))
+                for ident, frame in frames.items()
+                if ident != own
+            ]
+            with self._lock:
+                self.samples.update(batch)
+
+    def start(self) -> "SamplingProfiler":
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="monchat-profiler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def dump(self, path: Path, reset: bool = False) -> Path:
+        """folded 포맷으로 파일 저장"""
+        with self._lock:
+            items = list(self.samples.items())
+            if reset:
+                self.samples.clear()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as f:
+            for stack, count in sorted(items, key=lambda x: -x[1]):
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+def profile_path(kind: str) -> Path:
+    """PROFILE_DIR/<kind>_<YYYYmmdd_HHMMSS>.folded"""
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return Path(settings.PROFILE_DIR) / f"{kind}_{stamp}.folded"
+
+
+@contextmanager
+def maybe_profile(kind: str) -> Iterator[Optional[SamplingProfiler]]:
+    """PROFILE_ENABLED=true일 때만 블록 실행 동안 프로파일링 후 파일로 저장"""
+    if not settings.PROFILE_ENABLED:
+        yield None
+        return
+    profiler = SamplingProfiler().start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        out = profiler.dump(profile_path(kind))
+        print(f"[PROFILE] {kind} profile written to {out}")
+
+
+class PeriodicProfileDumper:
+    """API 프로세스용: 프로파일러를 상시 실행하고 PROFILE_DUMP_SECONDS마다 구간 프로파일을 저장"""
+
+    def __init__(self) -> None:
+        self.profiler = SamplingProfiler()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(settings.PROFILE_DUMP_SECONDS):
+            self.profiler.dump(profile_path("api"), reset=True)
+
+    def start(self) -> None:
+        self.profiler.start()
+        self._thread = threading.Thread(target=self._run, name="monchat-profile-dumper", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.profiler.stop()
+        self.profiler.dump(profile_path("api"), reset=True)
@@ -0,0 +1,161 @@
+"""
+/qa 검색 결과 캐시
+- 키: (정규화 검색 문장, top_k, date_from, date_to, hosts). 질문 분석 후 실제 검색 조건(시간 표현을 뺀 문장, 해석된 일자, 호스트)으로 만들어
+  /qa와 /qa/batch가 같은 키 규칙을 쓴다(routers.qa._scope_key).
+- 값: 검색 결과(answers)와 저장 당시의 ETL 적재 세대 번호
+- run_etl이 적재 커밋과 함께 etl_generation을 증가시키므로, 세대가 바뀐 항목은 조회 시 무효로 본다.
+- 세대 번호는 QA_CACHE_GENERATION_TTL초 동안 프로세스 메모리에 보관하여
+  캐시 적중 시 DB 왕복 없이(마이크로초 단위) 응답한다.
+- 비동기 /qa 경로는 generation_async()로 세대를 확인한다(TTL 만료 시 동시 요청 중 하나만 DB 조회).
+"""
+
+import asyncio
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from .metrics import CACHE_TOTAL
+from .settings import settings
+
+
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    """공백 정리 + 대소문자 통일"""
+    return _SPACES.sub(" ", question).strip().casefold()
+
+
+def _normalize_date(value: Optional[str]) -> Optional[str]:
+    """YYYYMMDD / YYYY-MM-DD 표기 차이를 같은 키로 취급"""
+    if not value:
+        return None
+    digits = value.strip().replace("-", "")[:8]
+    return digits if digits.isdigit() and len(digits) == 8 else value.strip()
+
+
+def make_key(
+    question: str, top_k: int, date_from: Optional[str], date_to: Optional[str], hosts: tuple = ()
+) -> tuple:
+    return (
+        normalize_question(question),
+        int(top_k),
+        _normalize_date(date_from),
+        _normalize_date(date_to),
+        tuple(sorted(hosts)),
+    )
+
+
+class GenerationCache:
+    """적재 세대 번호로 무효화되는 LRU 캐시(스레드 안전)"""
+
+    def __init__(
+        self,
+        fetch_generation: Callable[[], int],
+        max_entries: int = 1024,
+        generation_ttl: float = 2.0,
+        name: str = "qa",
+    ) -> None:
+        self._fetch_generation = fetch_generation
+        self.max_entries = max_entries
+        self.generation_ttl = generation_ttl
+        self.name = name
+        self._entries: "OrderedDict[tuple, tuple[int, object]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation: Optional[int] = None
+        self._checked_at = 0.0
+        self._refresh_task: Optional[asyncio.Future] = None
+
+    def generation(self) -> Optional[int]:
+        """현재 적재 세대 번호(TTL 동안 재사용). 조회 실패 시 None(캐시 우회)"""
+        now = time.monotonic()
+        if self._generation is not None and now - self._checked_at < self.generation_ttl:
+            return self._generation
+        try:
+            gen = int(self._fetch_generation())
+        except Exception:
+            return None
+        return self._set_generation(gen, now)
+
+    async def generation_async(self, fetch_async: Callable) -> Optional[int]:
+        """generation()의 비동기 버전(fetch_async: 세대 번호를 반환하는 코루틴 함수)"""
+        now = time.monotonic()
+        if self._generation is not None and now - self._checked_at < self.generation_ttl:
+            return self._generation
+        task = self._refresh_task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = self._refresh_task = asyncio.ensure_future(fetch_async())
+        try:
+            # shield: 요청 하나가 취소되어도 같은 조회를 기다리는 다른 요청에는 영향 없음
+            gen = int(await asyncio.shield(task))
+        except Exception:
+            return None
+        return self._set_generation(gen, now)
+
+    def _set_generation(self, gen: int, now: float) -> int:
+        with self._lock:
+            if gen != self._generation:
+                # 세대가 바뀌면 이전 세대 항목은 모두 무효이므로 한 번에 비운다.
+                self._entries.clear()
+            self._generation = gen
+            self._checked_at = now
+        return gen
+
+    def get(self, key: tuple, generation: Optional[int]):
+        if generation is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == generation:
+                self._entries.move_to_end(key)
+                CACHE_TOTAL.labels(cache=self.name, result="hit").inc()
+                return entry[1]
+        CACHE_TOTAL.labels(cache=self.name, result="miss").inc()
+        return None
+
+    def peek(self, key: tuple) -> bool:
+        """마지막으로 확인한 세대의 항목이 있는지(세대 재조회/메트릭/LRU 갱신 없음, 수용 제어 우회 판정용)"""
+        entry = self._entries.get(key)
+        return entry is not None and self._generation is not None and entry[0] == self._generation
+
+    def put(self, key: tuple, generation: Optional[int], value) -> None:
+        """검색 전에 읽은 세대 번호로 저장(검색 도중 적재가 끝나도 다음 세대에서 자동 무효화)"""
+        if generation is None:
+            return
+        with self._lock:
+            self._entries[key] = (generation, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generation = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_qa_cache: Optional[GenerationCache] = None
+_qa_cache_lock = threading.Lock()
+
+
+def get_qa_cache() -> Optional[GenerationCache]:
+    """/qa 결과 캐시 싱글톤(QA_CACHE_ENABLED=false 또는 VectorDB 비활성 시 None)"""
+    global _qa_cache
+    if not (settings.QA_CACHE_ENABLED and settings.VECTORDB_ENABLED):
+        return None
+    if _qa_cache is None:
+        with _qa_cache_lock:
+            if _qa_cache is None:
+                from .db.vector import get_generation
+
+                _qa_cache = GenerationCache(
+                    get_generation,
+                    max_entries=settings.QA_CACHE_MAX_ENTRIES,
+                    generation_ttl=settings.QA_CACHE_GENERATION_TTL,
+                )
+    return _qa_cache
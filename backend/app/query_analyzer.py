@@ -0,0 +1,272 @@
+"""
+질문 분석(규칙 기반): 시간 범위/호스트 제약 추출
+- 운영자 질문에 거의 항상 들어 있는 시간 범위("어제", "오늘 오전", "지난 3시간")와 호스트명/IP를
+  검색 제약으로 바꿔 해당 일자 파티션/호스트 행만 검색하도록 한다.
+- 시간 표현(한국어/영어) → 검색 일자 범위(date_from/date_to, 포함)
+  오늘/today, 어제/yesterday, 그제·그저께/day before yesterday, N일 전/N days ago,
+  최근·지난 N일/last N days, 지난 N시간·N분/last N hours·minutes(걸치는 일자 전체),
+  이번 주/지난주/this week/last week, 이번 달/지난달/this month/last month,
+  날짜 표기(2025-09-10, 20250910, 9월 10일, 9/10). 9/10처럼 분수와 헷갈리는 표기는 시간대 한정어가 있거나
+  보존 기간(ETL_DAYS) 안의 날짜일 때만 인정한다.
+  문서는 일자 단위로 적재되므로 오전/오후/새벽 등 시간대 한정어는 일자만 반영한다.
+- 호스트: ETL이 적재한 호스트 목록(etl_hosts, pgvector 사용 시)에 있는 호스트명/IP 토큰
+- 임베딩에는 시간 표현을 뺀 질문(search_text)을 쓴다(문서에는 상대 시간 표현이 없으므로 잡음).
+- 정규식 몇 개와 집합 조회뿐이라 질문당 수십 마이크로초 수준이다.
+"""
+
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Callable, Optional
+
+from .settings import settings
+
+
+_DAYPART = r"(?:\s*(?:오전|오후|새벽|아침|낮|저녁|밤|morning|afternoon|evening|night))?"
+_LAST = r"(?:최근|지난|past|last)"
+_NUM = r"(\d{1,3})"
+# 호스트명/IP 후보 토큰(한글 조사가 붙어도 영숫자 부분만 추출)
+_TOKEN = re.compile(r"[A-Za-z0-9][A-Za-z0-9_.\-]*")
+
+
+def _month_range(year: int, month: int, today: date) -> tuple[date, date]:
+    first = date(year, month, 1)
+    nxt = date(year + (month == 12), month % 12 + 1, 1)
+    return first, min(nxt - timedelta(days=1), today)
+
+
+def _safe_date(year: int, month: int, day: int) -> Optional[date]:
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _recent_date(month: int, day: int, today: date) -> Optional[date]:
+    """연도 없는 월/일: 올해 날짜가 미래면 작년으로 본다."""
+    d = _safe_date(today.year, month, day)
+    if d is not None and d > today:
+        d = _safe_date(today.year - 1, month, day)
+    return d
+
+
+def _slash_date(m: re.Match, now: datetime) -> Optional[tuple[date, date]]:
+    """m/d 표기: 분수("3/4 이상", "1/2 full")와 구분하기 위해 시간대 한정어(오전/밤 등)가 붙었거나
+    보존 기간(ETL_DAYS) 안의 날짜일 때만 일자로 본다."""
+    d = _recent_date(int(m[1]), int(m[2]), now.date())
+    if d is None:
+        return None
+    has_daypart = bool(m.group(0)[m.end(2) - m.start():].strip())
+    if has_daypart or (now.date() - d).days < settings.ETL_DAYS:
+        return d, d
+    return None
+
+
+def _days_back(n: int, today: date) -> tuple[date, date]:
+    return today - timedelta(days=max(1, n) - 1), today
+
+
+def _since(now: datetime, delta: timedelta) -> tuple[date, date]:
+    return (now - delta).date(), now.date()
+
+
+# (패턴, 처리기(매치, 현재 시각) → (시작일, 종료일) | None). 앞 패턴이 소비한 구간은 뒤 패턴이 다시 보지 않는다.
+_RULES: list[tuple[re.Pattern, Callable[[re.Match, datetime], Optional[tuple[date, date]]]]] = [
+    (
+        re.compile(r"(?<!\d)(\d{4})[-./](\d{1,2})[-./](\d{1,2})(?!\d)" + _DAYPART),
+        lambda m, now: (lambda d: (d, d) if d else None)(_safe_date(int(m[1]), int(m[2]), int(m[3]))),
+    ),
+    (
+        re.compile(r"(?<![\d.])(20\d{2})(\d{2})(\d{2})(?![\d.])" + _DAYPART),
+        lambda m, now: (lambda d: (d, d) if d else None)(_safe_date(int(m[1]), int(m[2]), int(m[3]))),
+    ),
+    (
+        re.compile(r"(\d{1,2})\s*월\s*(\d{1,2})\s*일" + _DAYPART),
+        lambda m, now: (lambda d: (d, d) if d else None)(_recent_date(int(m[1]), int(m[2]), now.date())),
+    ),
+    (
+        re.compile(r"(?<![\d./])(\d{1,2})/(\d{1,2})(?![\d/])" + _DAYPART),
+        lambda m, now: _slash_date(m, now),
+    ),
+    (
+        re.compile(_LAST + r"\s*" + _NUM + r"\s*(?:일(?:간|동안)?|days?\b)", re.IGNORECASE),
+        lambda m, now: _days_back(int(m[1]), now.date()),
+    ),
+    (
+        re.compile(_NUM + r"\s*(?:일\s*전|days?\s+ago\b)" + _DAYPART, re.IGNORECASE),
+        lambda m, now: (now.date() - timedelta(days=int(m[1])),) * 2,
+    ),
+    (
+        re.compile(_LAST + r"\s*(?:" + _NUM + r"\s*)?(?:시간(?:\s*동안)?|hours?\b|hrs?\b)", re.IGNORECASE),
+        lambda m, now: _since(now, timedelta(hours=int(m[1] or 1))),
+    ),
+    (
+        re.compile(_NUM + r"\s*(?:시간\s*전|hours?\s+ago\b)", re.IGNORECASE),
+        lambda m, now: _since(now, timedelta(hours=int(m[1]))),
+    ),
+    (
+        re.compile(_LAST + r"\s*" + _NUM + r"\s*(?:분(?:\s*동안)?|minutes?\b|mins?\b)", re.IGNORECASE),
+        lambda m, now: _since(now, timedelta(minutes=int(m[1]))),
+    ),
+    (
+        re.compile(r"(?:그저께|그제|\bday\s+before\s+yesterday\b)" + _DAYPART, re.IGNORECASE),
+        lambda m, now: (now.date() - timedelta(days=2),) * 2,
+    ),
+    (
+        re.compile(r"(?:어저께|어제|\byesterday\b)" + _DAYPART, re.IGNORECASE),
+        lambda m, now: (now.date() - timedelta(days=1),) * 2,
+    ),
+    (
+        re.compile(
+            r"(?:오늘|금일)" + _DAYPART + r"|\b(?:today|tonight|this\s+(?:morning|afternoon|evening))\b",
+            re.IGNORECASE,
+        ),
+        lambda m, now: (now.date(),) * 2,
+    ),
+    (
+        re.compile(r"(?:이번\s*주|금주|\bthis\s+week\b)", re.IGNORECASE),
+        lambda m, now: (now.date() - timedelta(days=now.weekday()), now.date()),
+    ),
+    (
+        re.compile(r"(?:지난\s*주|저번\s*주|\blast\s+week\b)", re.IGNORECASE),
+        lambda m, now: (
+            now.date() - timedelta(days=now.weekday() + 7),
+            now.date() - timedelta(days=now.weekday() + 1),
+        ),
+    ),
+    (
+        re.compile(r"(?:이번\s*달|이달|\bthis\s+month\b)", re.IGNORECASE),
+        lambda m, now: _month_range(now.year, now.month, now.date()),
+    ),
+    (
+        re.compile(r"(?:지난\s*달|저번\s*달|\blast\s+month\b)", re.IGNORECASE),
+        lambda m, now: _month_range(
+            now.year - (now.month == 1), (now.month - 2) % 12 + 1, now.date()
+        ),
+    ),
+]
+
+
+@dataclass
+class QueryConstraints:
+    """질문에서 추출한 검색 제약"""
+
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    hosts: tuple[str, ...] = ()
+    # 제약으로 해석한 원문 표현(시간 표현 / 호스트·IP 토큰)
+    time_matched: tuple[str, ...] = ()
+    host_matched: tuple[str, ...] = ()
+    # 시간 표현을 뺀 질문(임베딩용)
+    search_text: str = ""
+
+    def applied(self) -> dict:
+        """응답에 싣는 적용 제약(값이 있는 항목만)"""
+        out: dict = {}
+        if self.date_from is not None:
+            out["date_from"] = self.date_from.strftime("%Y%m%d")
+        if self.date_to is not None:
+            out["date_to"] = self.date_to.strftime("%Y%m%d")
+        if self.hosts:
+            out["hosts"] = list(self.hosts)
+        matched = (self.time_matched if self.date_from or self.date_to else ()) + self.host_matched
+        if matched:
+            out["matched"] = list(matched)
+        return out
+
+
+class HostRegistry:
+    """적재된 호스트명/IP 목록(TTL 동안 메모리 값 사용). 조회 실패 시 이전 목록 유지"""
+
+    def __init__(self, fetch: Callable[[], list[tuple[str, Optional[str]]]], ttl: float = 300.0) -> None:
+        self._fetch = fetch
+        self.ttl = ttl
+        self._by_name: dict[str, str] = {}
+        self._by_ip: dict[str, str] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= self.ttl
+
+    def refresh(self) -> None:
+        with self._lock:
+            if not self.stale():
+                return
+            try:
+                rows = self._fetch()
+            except Exception as e:
+                print(f"[QA] host registry refresh failed: {type(e).__name__}")
+                rows = None
+            # 실패해도 TTL 동안은 다시 조회하지 않는다(DB 장애 시 요청마다 재시도 방지).
+            self._loaded_at = time.monotonic()
+            if rows is None:
+                return
+            self._by_name = {host.casefold(): host for host, _ in rows if host}
+            self._by_ip = {ip: host for host, ip in rows if host and ip}
+
+    def lookup(self, token: str) -> Optional[str]:
+        return self._by_name.get(token.casefold()) or self._by_ip.get(token)
+
+
+_registry: Optional[HostRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_host_registry() -> Optional[HostRegistry]:
+    """pgvector 사용 시 호스트 목록 싱글톤(그 외에는 호스트 목록이 없으므로 None)"""
+    global _registry
+    if not settings.VECTORDB_ENABLED:
+        return None
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                from .db.vector import list_known_hosts
+
+                _registry = HostRegistry(list_known_hosts, ttl=settings.QA_ANALYZE_HOSTS_TTL)
+    return _registry
+
+
+def analyze_query(
+    question: str,
+    now: Optional[datetime] = None,
+    registry: Optional[HostRegistry] = None,
+) -> QueryConstraints:
+    """질문 → 검색 제약(일자 범위, 호스트). 여러 시간 표현이 있으면 모두 포함하는 범위로 합친다.
+
+    registry가 오래되었으면 여기서 갱신하지 않는다(호출 측이 refresh, 비동기 경로는 스레드로).
+    """
+    now = now or datetime.now()
+    text = question
+    time_matched: list[str] = []
+    ranges: list[tuple[date, date]] = []
+    for pattern, handler in _RULES:
+        for m in list(pattern.finditer(text)):
+            span = handler(m, now)
+            if span is None:
+                continue
+            ranges.append(span)
+            time_matched.append(m.group(0).strip())
+            # 같은 표현을 다른 패턴이 다시 해석하지 않도록 공백으로 덮는다(위치 유지).
+            text = text[: m.start()] + " " * (m.end() - m.start()) + text[m.end():]
+
+    hosts: list[str] = []
+    host_matched: list[str] = []
+    if registry is not None:
+        for token in _TOKEN.findall(question):
+            host = registry.lookup(token.rstrip(".-"))
+            if host and host not in hosts:
+                hosts.append(host)
+                host_matched.append(token.rstrip(".-"))
+
+    search_text = " ".join(text.split()) or question.strip()
+    return QueryConstraints(
+        date_from=min(r[0] for r in ranges) if ranges else None,
+        date_to=max(r[1] for r in ranges) if ranges else None,
+        hosts=tuple(hosts),
+        time_matched=tuple(time_matched),
+        host_matched=tuple(host_matched),
+        search_text=search_text,
+    )
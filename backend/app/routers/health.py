@@ -1,10 +1,13 @@
 """
 헬스체크 라우터
 - 애플리케이션의 상태를 간단히 확인하기 위한 엔드포인트를 제공한다.
+- /health/llm: LLM 백엔드 풀 상태(LLM_BACKENDS 지정 시)
 """
 
 from fastapi import APIRouter
 
+from ..settings import settings
+
 router = APIRouter()
 
 @router.get("/ready")
@@ -16,3 +19,13 @@ def ready():
 def live():
     """생존 상태 확인(프로세스가 살아있는지)"""
     return {"status": "alive"}
+
+@router.get("/llm")
+def llm_backends():
+    """LLM 백엔드별 헬스/진행 중 요청 수/적재 모델"""
+    from ..llm_pool import get_llm_pool
+
+    pool = get_llm_pool() if settings.LLM_ENABLED else None
+    if pool is None:
+        return {"pool": False, "backends": []}
+    return {"pool": True, "backends": pool.status()}
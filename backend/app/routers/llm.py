@@ -1,14 +1,19 @@
 """
 LLM 라우터
 - 단일 턴 채팅 API 프록시: /llm/chat
+- context(/qa 검색 결과 행)를 함께 보내면 압축(context.compact_rows)하여 프롬프트 앞에 붙인다.
 """
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, Union
+import time
 
+from ..context import build_prompt, compact_rows, estimate_tokens
 from ..llm import LLMClient, extract_response_text
+from ..llm_pool import NoBackendAvailable
 from ..settings import settings
+from ..metrics import ERRORS_TOTAL, LLM_CONTEXT_TOKENS, LLM_UPSTREAM_SECONDS, observe_stage, track_inflight
 
 
 router = APIRouter()
@@ -18,12 +23,39 @@ class ChatRequest(BaseModel):
     prompt: str = Field(..., description="사용자 입력 프롬프트")
     model: Optional[str] = Field(default=None, description="사용할 모델명(미지정 시 기본값)")
     stream: Optional[bool] = Field(default=None, description="스트리밍 여부")
+    context: Optional[list[Union[str, dict]]] = Field(
+        default=None, description="검색 결과 행(/qa answers 항목 또는 content 문자열), 검색 순위 순"
+    )
+    compact: Optional[bool] = Field(default=None, description="context 압축 여부(미지정 시 LLM_CONTEXT_COMPACT)")
+    context_tokens: Optional[int] = Field(
+        default=None, description="context 토큰 예산(미지정 시 LLM_CONTEXT_TOKEN_BUDGET, 0 이하: 무제한)"
+    )
 
 
 class ChatResponse(BaseModel):
     model: str
     text: str
     raw: dict
+    # context 압축 통계(rows_in/lines_out/tokens_before/tokens_after/dropped), context 미지정 시 None
+    context_stats: Optional[dict] = None
+
+
+def _render_context(req: ChatRequest) -> tuple[str, Optional[dict]]:
+    """요청 context를 프롬프트에 붙일 텍스트로 변환(압축 여부에 따라)"""
+    if not req.context:
+        return req.prompt, None
+    compact = settings.LLM_CONTEXT_COMPACT if req.compact is None else req.compact
+    with observe_stage("llm_chat", "context"):
+        if compact:
+            result = compact_rows(req.context, req.context_tokens)
+            context, stats = result.text, result.stats()
+        else:
+            context = "\n".join(str(r.get("content") or "") if isinstance(r, dict) else str(r) for r in req.context)
+            tokens = estimate_tokens(context)
+            stats = {"rows_in": len(req.context), "tokens_before": tokens, "tokens_after": tokens}
+    LLM_CONTEXT_TOKENS.labels(stage="raw").inc(stats["tokens_before"])
+    LLM_CONTEXT_TOKENS.labels(stage="sent").inc(stats["tokens_after"])
+    return build_prompt(req.prompt, context), stats
 
 
 @router.post("/chat", response_model=ChatResponse)
@@ -32,13 +64,27 @@ def chat(req: ChatRequest):
         raise HTTPException(status_code=400, detail="LLM is disabled by configuration")
 
     client = LLMClient()
+    model_used = (req.model or settings.LLM_DEFAULT_MODEL)
+    prompt, context_stats = _render_context(req)
+    t0 = time.perf_counter()
     try:
-        resp_json = client.chat(prompt=req.prompt, model=req.model, stream=req.stream)
+        with track_inflight("llm"), observe_stage("llm_chat", "upstream"):
+            resp_json = client.chat(prompt=prompt, model=req.model, stream=req.stream)
+    except TimeoutError as e:
+        # 클라이언트 기한(X-Request-Timeout)을 이미 넘긴 요청은 업스트림을 호출하지 않는다.
+        ERRORS_TOTAL.labels(endpoint="llm_chat", kind="DeadlineExceeded").inc()
+        raise HTTPException(status_code=504, detail=str(e))
+    except NoBackendAvailable as e:
+        # 보낼 수 있는 정상 백엔드가 없는 상태(헬스 체크 실패로 모두 제외). 업스트림 오류(5xx 등)는 아래 502
+        ERRORS_TOTAL.labels(endpoint="llm_chat", kind="NoBackendAvailable").inc()
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
+        ERRORS_TOTAL.labels(endpoint="llm_chat", kind=type(e).__name__).inc()
         raise HTTPException(status_code=502, detail=f"LLM upstream error: {str(e)}")
+    finally:
+        LLM_UPSTREAM_SECONDS.labels(model=model_used).observe(time.perf_counter() - t0)
 
     text = extract_response_text(resp_json)
-    model_used = (req.model or settings.LLM_DEFAULT_MODEL)
-    return ChatResponse(model=model_used, text=text, raw=resp_json)
+    return ChatResponse(model=model_used, text=text, raw=resp_json, context_stats=context_stats)
 
 
@@ -0,0 +1,16 @@
+"""
+Prometheus 메트릭 라우터
+- GET /metrics: 기본 레지스트리의 메트릭을 텍스트 노출 포맷으로 반환
+"""
+
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+
+router = APIRouter()
+
+
+@router.get("")
+def metrics():
+    """Prometheus 스크레이프 엔드포인트"""
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -1,28 +1,57 @@
 """
 Q&A 라우터
 - 사용자 질문을 받아 임베딩 → VectorDB 유사도 검색 → 결과 반환
-- VectorDB 비활성화 시, mock 데이터에서 키워드 기반 간이 검색 폴백
+- VectorDB 비활성화 + LOCAL_INDEX_ENABLED 시, ETL이 기록한 로컬 벡터 인덱스(memmap)에서 검색
+- 벡터 검색을 사용할 수 없으면 mock 데이터에서 키워드 기반 간이 검색 폴백
+- 벡터 검색 결과는 ETL 적재 세대 기반 캐시(qa_cache)에 보관하여 반복 질문은 임베딩/검색을 생략
+- /qa/async: 같은 처리를 이벤트 루프에서 수행(asyncpg 풀 + 임베딩 전용 실행기), QA_ASYNC=true면 /qa도 비동기 처리
+- 질문의 시간 표현/호스트명·IP를 검색 제약(일자 범위, 호스트)으로 적용하고 응답의 constraints로 알린다(QA_ANALYZE_QUERY)
+  분석된 일자 범위로 검색 결과가 없으면 일자 제약 없이 다시 검색한다(constraints.relaxed=["time"])
 """
 
+import asyncio
+
 from fastapi import APIRouter
-from pydantic import BaseModel
-from typing import List, Dict
+from pydantic import BaseModel, Field
+from typing import List, Dict, Optional
+import logging
 import re
 from pathlib import Path
 
 from ..settings import settings
+from ..metrics import FALLBACK_TOTAL, ERRORS_TOTAL, observe_stage, track_inflight
+from ..qa_cache import get_qa_cache, make_key
+from ..query_analyzer import HostRegistry, QueryConstraints, analyze_query, get_host_registry
+
+
+logger = logging.getLogger(__name__)
 
 
 router = APIRouter()
 
 
+QA_BATCH_MAX = 100
+
+
 class QARequest(BaseModel):
     """Q&A 요청 페이로드
     - question: 사용자 질문 텍스트
     - top_k: 검색 상위 개수
+    - date_from/date_to: 검색 대상 일자 범위(YYYYMMDD 또는 YYYY-MM-DD, 포함). 지정 시 해당 일자 파티션만 검색
+    - analyze: 질문의 시간 표현/호스트를 검색 제약으로 적용할지 여부(/qa, /qa/async). date_from/date_to가 있으면 일자는 그 값을 우선
     """
     question: str
     top_k: int = 5
+    date_from: Optional[str] = None
+    date_to: Optional[str] = None
+    analyze: bool = True
+
+
+class QABatchRequest(BaseModel):
+    """배치 Q&A 요청 페이로드
+    - questions: 질문별 question/top_k/date_from/date_to (최대 QA_BATCH_MAX개)
+    """
+    questions: List[QARequest] = Field(..., max_length=QA_BATCH_MAX)
 
 
 def _to_vector_literal(vec: List[float]) -> str:
@@ -41,10 +70,8 @@ def _keyword_score(text: str, tokens: List[str]) -> int:
     return score
 
 
-def _mock_search(question: str, top_k: int) -> List[Dict]:
-    """VectorDB 미사용 시 간이 키워드 검색
-    - mock_data 디렉토리의 최근 파일들에서 라인 단위 텍스트를 수집하여 매칭 개수로 정렬
-    """
+def _mock_candidates() -> List[str]:
+    """mock_data 디렉토리의 최근 파일들에서 라인 단위 텍스트 수집"""
     base = Path(settings.MOCK_DB_DIR)
     candidates: List[str] = []
     # 지원 파일 패턴들
@@ -68,7 +95,11 @@ def _mock_search(question: str, top_k: int) -> List[Dict]:
                             candidates.append(line)
             except Exception:
                 continue
+    return candidates
+
 
+def _rank_candidates(question: str, candidates: List[str], top_k: int) -> List[Dict]:
+    """질문 토큰 매칭 개수로 후보 라인 정렬"""
     # 간단한 토큰화: 공백/구두점 기준 분리 (한글 단어는 공백 단위)
     raw_tokens = re.split(r"\s+|[\,\.;:!\?\(\)\[\]\{\}\-_/]", question)
     tokens = [t for t in raw_tokens if len(t) >= 2]
@@ -87,43 +118,368 @@ def _mock_search(question: str, top_k: int) -> List[Dict]:
     return ranked[:top_k]
 
 
-@router.post("/")
+def _mock_search(question: str, top_k: int) -> List[Dict]:
+    """VectorDB 미사용 시 간이 키워드 검색
+    - mock_data 디렉토리의 최근 파일들에서 라인 단위 텍스트를 수집하여 매칭 개수로 정렬
+    """
+    return _rank_candidates(question, _mock_candidates(), top_k)
+
+
+def _to_answers(rows) -> List[Dict]:
+    """DB 검색 결과 행 → 응답 answers 변환"""
+    return [
+        {
+            "id": r.get("id"),
+            "source": r.get("source"),
+            "content": r.get("content"),
+            "score": float(r.get("score", 0.0)),
+        }
+        for r in rows
+    ]
+
+
+def _semantic_enabled() -> bool:
+    return settings.VECTORDB_ENABLED or settings.LOCAL_INDEX_ENABLED
+
+
+class _SearchScope:
+    """질문 분석 결과를 반영한 실제 검색 조건"""
+
+    def __init__(self, req: QARequest, question: str, constraints: Optional[QueryConstraints]) -> None:
+        self.constraints = constraints
+        self.text = question
+        self.date_from = req.date_from
+        self.date_to = req.date_to
+        self.hosts: tuple = ()
+        # 분석된 일자 범위를 적용했는지(검색 결과가 없으면 완화 대상), 완화했는지
+        self.analyzed_dates = False
+        self.relaxed = False
+        if constraints is None:
+            return
+        self.text = constraints.search_text
+        self.hosts = constraints.hosts
+        if req.date_from or req.date_to:
+            # 요청에 명시한 일자 범위를 우선(분석된 일자는 적용하지 않음)
+            constraints.date_from = constraints.date_to = None
+        else:
+            self.date_from = constraints.date_from.strftime("%Y%m%d") if constraints.date_from else None
+            self.date_to = constraints.date_to.strftime("%Y%m%d") if constraints.date_to else None
+            self.analyzed_dates = bool(self.date_from or self.date_to)
+
+    def relax_time(self) -> bool:
+        """분석된 일자 범위를 해제(잘못 해석된 시간 표현으로 결과가 비는 경우). 해제했으면 True"""
+        if not self.analyzed_dates or self.relaxed:
+            return False
+        self.date_from = self.date_to = None
+        self.constraints.date_from = self.constraints.date_to = None
+        self.relaxed = True
+        return True
+
+    def applied(self) -> Dict:
+        out = self.constraints.applied() if self.constraints is not None else {}
+        if self.relaxed:
+            out["relaxed"] = ["time"]
+        return out
+
+
+def _analyze(req: QARequest, question: str, registry: Optional[HostRegistry]) -> _SearchScope:
+    if not (settings.QA_ANALYZE_QUERY and req.analyze):
+        return _SearchScope(req, question, None)
+    return _SearchScope(req, question, analyze_query(question, registry=registry))
+
+
+def _host_registry() -> Optional[HostRegistry]:
+    """호스트 목록(만료 시 DB 재조회). 질문 분석을 쓰지 않으면 None"""
+    registry = get_host_registry() if settings.QA_ANALYZE_QUERY else None
+    if registry is not None and registry.stale():
+        registry.refresh()
+    return registry
+
+
+def _scope_key(scope: _SearchScope, top_k: int) -> tuple:
+    """결과 캐시 키: 실제 검색 조건(분석 후 검색 문장, 일자 범위, 호스트, top_k). /qa, /qa/async, /qa/batch 공용"""
+    return make_key(scope.text, top_k, scope.date_from, scope.date_to, scope.hosts)
+
+
+def qa_cache_key(req: QARequest) -> tuple:
+    """요청의 결과 캐시 키(수용 제어의 캐시 우회 판정용). 호스트 목록은 DB 재조회 없이 메모리 값만 사용"""
+    registry = get_host_registry() if settings.QA_ANALYZE_QUERY else None
+    return _scope_key(_analyze(req, req.question.strip(), registry), _clamp_top_k(req.top_k))
+
+
+def _with_constraints(body: Dict, scope: _SearchScope, applied: bool = True) -> Dict:
+    """분석기 사용 시 응답에 적용된 제약을 싣는다(키워드 폴백 검색은 제약을 적용하지 않으므로 빈 값)"""
+    if scope.constraints is not None:
+        body["constraints"] = scope.applied() if applied else {}
+    return body
+
+
+def _vector_search(
+    vec: List[float], top_k: int, date_from: Optional[str], date_to: Optional[str], hosts: tuple = ()
+):
+    """pgvector 또는 로컬 벡터 인덱스에서 유사도 top_k 검색(지연 임포트). 호스트 조건은 pgvector만 지원"""
+    if settings.VECTORDB_ENABLED:
+        from ..db.vector import search_similar
+
+        return search_similar(
+            _to_vector_literal(vec), top_k=top_k, date_from=date_from, date_to=date_to, hosts=list(hosts)
+        )
+    from ..db.local_index import get_local_index
+
+    return get_local_index().search(vec, top_k=top_k, date_from=date_from, date_to=date_to)
+
+
+def _vector_search_batch(queries: List[Dict]) -> List[List[Dict]]:
+    """질문별 {vec, top_k, date_from, date_to, hosts} 일괄 검색(pgvector는 SQL 1회). 호스트 조건은 pgvector만 지원"""
+    if settings.VECTORDB_ENABLED:
+        from ..db.vector import search_similar_batch
+
+        return search_similar_batch([{**q, "vec": _to_vector_literal(q["vec"])} for q in queries])
+    from ..db.local_index import get_local_index
+
+    index = get_local_index()
+    return [
+        index.search(q["vec"], top_k=q["top_k"], date_from=q["date_from"], date_to=q["date_to"])
+        for q in queries
+    ]
+
+
+async def _vector_search_async(
+    vec: List[float], top_k: int, date_from: Optional[str], date_to: Optional[str], hosts: tuple = ()
+):
+    """_vector_search의 비동기 버전(pgvector는 asyncpg, 로컬 인덱스 행렬곱은 스레드)"""
+    if settings.VECTORDB_ENABLED:
+        from ..db.vector_async import search_similar_async
+
+        return await search_similar_async(_to_vector_literal(vec), top_k, date_from, date_to, list(hosts))
+    from ..db.local_index import get_local_index
+
+    return await asyncio.to_thread(get_local_index().search, vec, top_k, date_from, date_to)
+
+
+def _clamp_top_k(top_k: Optional[int]) -> int:
+    return max(1, min(50, top_k or 5))
+
+
 def query_qa(req: QARequest):
     """질문 처리 엔드포인트
 
-    - VectorDB 사용 시: 질문 임베딩 → 코사인 유사도 top_k 검색
+    - VectorDB(또는 로컬 벡터 인덱스) 사용 시: 질문 임베딩 → 코사인 유사도 top_k 검색
     - 미사용 시: mock 데이터에서 키워드 기반 상위 top_k 라인 반환
     """
+    with track_inflight("http:qa"), observe_stage("qa", "total"):
+        return _query_qa(req)
+
+
+def _query_qa(req: QARequest):
     question = req.question.strip()
-    top_k = max(1, min(50, req.top_k or 5))
+    top_k = _clamp_top_k(req.top_k)
 
     if not question:
         return {"question": req.question, "answers": [], "top_k": top_k}
 
-    if settings.VECTORDB_ENABLED:
+    if _semantic_enabled():
+        with observe_stage("qa", "analyze"):
+            scope = _analyze(req, question, _host_registry())
+        # 결과 캐시는 적재 세대를 DB에서 읽으므로 pgvector 사용 시에만 동작(get_qa_cache가 None 반환)
+        cache = get_qa_cache()
+        key = _scope_key(scope, top_k)
+        generation = None
+        if cache is not None:
+            # 적재 세대가 같으면 이전 검색 결과를 그대로 반환(세대 번호는 TTL 동안 메모리 값 사용)
+            with observe_stage("qa", "cache"):
+                generation = cache.generation()
+                cached = cache.get(key, generation)
+            if cached is not None:
+                return _with_constraints({"question": req.question, "answers": cached, "top_k": top_k}, scope)
         try:
-            # 임베딩 → pgvector 검색
+            # 임베딩 → 벡터 검색
             # 지연 임포트로 무거운 의존성(임베딩/psycopg2)을 필요 시에만 로딩
             from ..embeddings import embed_text
-            from ..db.vector import search_similar
-
-            vec = embed_text(question)
-            vec_lit = _to_vector_literal(vec)
-            rows = search_similar(vec_lit, top_k=top_k)
-            answers = [
-                {
-                    "id": r.get("id"),
-                    "source": r.get("source"),
-                    "content": r.get("content"),
-                    "score": float(r.get("score", 0.0)),
-                }
-                for r in rows
-            ]
-        except Exception:
-            # 임베딩/DB 오류 발생 시 자동 폴백
-            answers = _mock_search(question, top_k)
+
+            with observe_stage("qa", "embed"):
+                vec = embed_text(scope.text)
+            with observe_stage("qa", "search"):
+                rows = _vector_search(vec, top_k, scope.date_from, scope.date_to, scope.hosts)
+                if not rows and scope.relax_time():
+                    rows = _vector_search(vec, top_k, scope.date_from, scope.date_to, scope.hosts)
+            answers = _to_answers(rows)
+            # 완화 결과는 캐시하지 않는다(캐시 적중 시 응답 constraints가 원래 제약으로 보이므로).
+            if cache is not None and not scope.relaxed:
+                cache.put(key, generation, answers)
+            return _with_constraints({"question": req.question, "answers": answers, "top_k": top_k}, scope)
+        except Exception as e:
+            # 임베딩/DB 오류 발생 시 자동 폴백 (폴백 사실은 메트릭/로그로 노출)
+            reason = type(e).__name__
+            FALLBACK_TOTAL.labels(endpoint="qa", reason=reason).inc()
+            ERRORS_TOTAL.labels(endpoint="qa", kind=reason).inc()
+            logger.warning("vector search failed, falling back to keyword search: %s", e)
+            with observe_stage("qa", "mock_search"):
+                answers = _mock_search(question, top_k)
+        return _with_constraints({"question": req.question, "answers": answers, "top_k": top_k}, scope, False)
     else:
         # 폴백: 키워드 기반 간이 검색
-        answers = _mock_search(question, top_k)
+        with observe_stage("qa", "mock_search"):
+            answers = _mock_search(question, top_k)
+
+    return {"question": req.question, "answers": answers, "top_k": top_k}
+
+
+@router.post("/async")
+async def query_qa_async(req: QARequest):
+    """질문 처리 엔드포인트(비동기)
+
+    - /qa와 같은 요청/응답. 대기 구간(세대 조회/임베딩/DB 검색)이 모두 await이므로 이벤트 루프와
+      FastAPI 스레드 풀을 막지 않는다. 임베딩은 전용 실행기에서 동시 질문을 배치로 묶어 처리한다.
+    """
+    with track_inflight("http:qa_async"), observe_stage("qa_async", "total"):
+        return await _query_qa_async(req)
+
+
+async def _query_qa_async(req: QARequest):
+    question = req.question.strip()
+    top_k = _clamp_top_k(req.top_k)
+
+    if not question:
+        return {"question": req.question, "answers": [], "top_k": top_k}
+
+    if _semantic_enabled():
+        with observe_stage("qa_async", "analyze"):
+            registry = get_host_registry() if settings.QA_ANALYZE_QUERY else None
+            if registry is not None and registry.stale():
+                await asyncio.to_thread(registry.refresh)
+            scope = _analyze(req, question, registry)
+        cache = get_qa_cache()
+        key = _scope_key(scope, top_k)
+        generation = None
+        if cache is not None:
+            from ..db.vector_async import get_generation_async
+
+            with observe_stage("qa_async", "cache"):
+                generation = await cache.generation_async(get_generation_async)
+                cached = cache.get(key, generation)
+            if cached is not None:
+                return _with_constraints({"question": req.question, "answers": cached, "top_k": top_k}, scope)
+        try:
+            from ..embed_async import embed_text_async
+
+            with observe_stage("qa_async", "embed"):
+                vec = await embed_text_async(scope.text)
+            with observe_stage("qa_async", "search"):
+                rows = await _vector_search_async(vec, top_k, scope.date_from, scope.date_to, scope.hosts)
+                if not rows and scope.relax_time():
+                    rows = await _vector_search_async(vec, top_k, scope.date_from, scope.date_to, scope.hosts)
+            answers = _to_answers(rows)
+            if cache is not None and not scope.relaxed:
+                cache.put(key, generation, answers)
+            return _with_constraints({"question": req.question, "answers": answers, "top_k": top_k}, scope)
+        except Exception as e:
+            reason = type(e).__name__
+            FALLBACK_TOTAL.labels(endpoint="qa_async", reason=reason).inc()
+            ERRORS_TOTAL.labels(endpoint="qa_async", kind=reason).inc()
+            logger.warning("async vector search failed, falling back to keyword search: %s", e)
+            with observe_stage("qa_async", "mock_search"):
+                answers = await asyncio.to_thread(_mock_search, question, top_k)
+        return _with_constraints({"question": req.question, "answers": answers, "top_k": top_k}, scope, False)
+    else:
+        with observe_stage("qa_async", "mock_search"):
+            answers = await asyncio.to_thread(_mock_search, question, top_k)
 
     return {"question": req.question, "answers": answers, "top_k": top_k}
+
+
+# QA_ASYNC=true면 /qa 자체를 비동기 핸들러로 처리
+router.add_api_route("/", query_qa_async if settings.QA_ASYNC else query_qa, methods=["POST"])
+
+
+@router.post("/batch")
+def query_qa_batch(req: QABatchRequest):
+    """배치 질문 처리 엔드포인트
+
+    - 질문마다 /qa와 같은 분석(시간 표현/호스트 제약)을 적용하고, 분석된 일자 범위로 결과가 없는 질문은 일자 제약 없이 다시 검색한다.
+    - 결과 캐시에 있는 질문은 제외하고, 나머지를 embed_texts 1회 호출로 임베딩한 뒤 SQL 1회(질문별 검색의 UNION ALL)로 검색한다.
+    - 결과는 입력 순서대로 반환하며 각 항목은 /qa 단건 응답과 동일한 형태다(constraints 포함).
+    - 벡터 검색 실패/비활성화 시 mock 후보를 1회만 읽어 질문별 키워드 검색으로 폴백한다.
+    """
+    with track_inflight("http:qa_batch"), observe_stage("qa_batch", "total"):
+        return _query_qa_batch(req)
+
+
+def _query_qa_batch(req: QABatchRequest):
+    items = [(q, q.question.strip(), _clamp_top_k(q.top_k)) for q in req.questions]
+    answers: List[List[Dict]] = [[] for _ in items]
+    pending = [i for i, (_, question, _) in enumerate(items) if question]
+    # 질문별 검색 조건(/qa와 같은 분석 규칙)
+    scopes: Dict[int, _SearchScope] = {}
+    if _semantic_enabled() and pending:
+        with observe_stage("qa_batch", "analyze"):
+            registry = _host_registry()
+            for i in pending:
+                q, question, _ = items[i]
+                scopes[i] = _analyze(q, question, registry)
+
+    cache = get_qa_cache() if _semantic_enabled() else None
+    generation = None
+    keys: Dict[int, tuple] = {}
+    if cache is not None and pending:
+        with observe_stage("qa_batch", "cache"):
+            generation = cache.generation()
+            misses = []
+            for i in pending:
+                keys[i] = _scope_key(scopes[i], items[i][2])
+                cached = cache.get(keys[i], generation)
+                if cached is not None:
+                    answers[i] = cached
+                else:
+                    misses.append(i)
+            pending = misses
+
+    searched = False
+    if _semantic_enabled() and pending:
+        try:
+            from ..embeddings import embed_texts
+
+            with observe_stage("qa_batch", "embed"):
+                vecs = dict(zip(pending, embed_texts([scopes[i].text for i in pending])))
+
+            def query(i: int) -> Dict:
+                scope = scopes[i]
+                return {
+                    "vec": vecs[i],
+                    "top_k": items[i][2],
+                    "date_from": scope.date_from,
+                    "date_to": scope.date_to,
+                    "hosts": scope.hosts,
+                }
+
+            with observe_stage("qa_batch", "search"):
+                rows_per_query = dict(zip(pending, _vector_search_batch([query(i) for i in pending])))
+                # 분석된 일자 범위로 결과가 없는 질문만 일자 제약 없이 한 번 더(SQL 1회)
+                relaxed = [i for i in pending if not rows_per_query[i] and scopes[i].relax_time()]
+                if relaxed:
+                    rows_per_query.update(zip(relaxed, _vector_search_batch([query(i) for i in relaxed])))
+            for i in pending:
+                answers[i] = _to_answers(rows_per_query[i])
+                if cache is not None and not scopes[i].relaxed:
+                    cache.put(keys[i], generation, answers[i])
+            searched = True
+        except Exception as e:
+            reason = type(e).__name__
+            FALLBACK_TOTAL.labels(endpoint="qa_batch", reason=reason).inc()
+            ERRORS_TOTAL.labels(endpoint="qa_batch", kind=reason).inc()
+            logger.warning("batch vector search failed, falling back to keyword search: %s", e)
+
+    if not searched and pending:
+        with observe_stage("qa_batch", "mock_search"):
+            candidates = _mock_candidates()
+            for i in pending:
+                answers[i] = _rank_candidates(items[i][1], candidates, items[i][2])
+
+    results = []
+    for i, (q, _, top_k) in enumerate(items):
+        body = {"question": q.question, "answers": answers[i], "top_k": top_k}
+        if i in scopes:
+            # 키워드 폴백으로 답한 질문은 제약을 적용하지 않았으므로 빈 값
+            body = _with_constraints(body, scopes[i], searched or i not in pending)
+        results.append(body)
+    return {"results": results}
@@ -0,0 +1,54 @@
+"""
+시계열 라우터
+- 장기간 성능 지표 차트용 서버측 다운샘플링: /series/history
+- 기간 내 호스트 목록: /series/hosts
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from .. import series as series_lib
+
+
+router = APIRouter()
+
+
+def _range(start: Optional[str], end: Optional[str]) -> tuple[datetime, datetime]:
+    try:
+        end_dt = series_lib.parse_ts(end) if end else datetime.now()
+        start_dt = series_lib.parse_ts(start) if start else end_dt - timedelta(days=7)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"invalid time range: {e}")
+    if start_dt > end_dt:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    return start_dt, end_dt
+
+
+@router.get("/hosts")
+def hosts(start: Optional[str] = None, end: Optional[str] = None):
+    """기간 내 history 데이터가 있는 호스트 목록"""
+    start_dt, end_dt = _range(start, end)
+    return {"hosts": series_lib.list_hosts(start_dt, end_dt)}
+
+
+@router.get("/history")
+def history(
+    metric: str = Query("CPU_Usage", description="CPU_Usage | Memory_Usage | Swap_Usage | Filesystem_Usage"),
+    hosts: str = Query("", description="콤마 구분 호스트 목록(미지정 시 전체)"),
+    start: Optional[str] = Query(None, description="시작 시각(YYYYMMDDHHmmss | YYYYMMDD | ISO8601, 기본 end-7일)"),
+    end: Optional[str] = Query(None, description="종료 시각(기본 현재)"),
+    width: int = Query(800, ge=10, le=10000, description="차트 폭(px) = 호스트당 최대 점 수"),
+    method: str = Query("lttb", description="lttb | minmax"),
+):
+    """호스트별 지표 시계열을 화면 폭에 맞게 다운샘플링하여 반환
+
+    응답의 series[host]는 {"t": [epoch 초...], "v": [값...]} 형태의 컬럼 배열이다.
+    """
+    start_dt, end_dt = _range(start, end)
+    host_list = [h.strip() for h in hosts.split(",") if h.strip()]
+    try:
+        return series_lib.downsample(metric, host_list, start_dt, end_dt, width, method)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,178 @@
+"""
+성능 지표 시계열 다운샘플링
+- history_YYYYMMDD.csv(1분 단위)를 호스트/지표별 시계열로 읽어 화면 폭(px)에 맞게 줄인다.
+- 알고리즘
+  - lttb: Largest-Triangle-Three-Buckets (모양 보존, 출력 점 수 = width)
+  - minmax: 버킷별 최소/최대값 유지 (스파이크 보존, 출력 점 수 ≈ width)
+- 일자 파일 파싱 결과와 다운샘플 결과 모두 캐시한다(파일 mtime이 바뀌면 자동 무효화).
+- pandas는 첫 조회 시점에 임포트한다(API 기동 시간 절감).
+"""
+
+from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+from .settings import settings
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+METRICS = ("CPU_Usage", "Memory_Usage", "Swap_Usage", "Filesystem_Usage")
+METHODS = ("lttb", "minmax")
+
+
+def parse_ts(value: str) -> datetime:
+    """YYYYMMDDHHmmss / YYYYMMDD / ISO8601 문자열을 datetime으로 변환"""
+    text = value.strip()
+    if text.isdigit() and len(text) == 14:
+        return datetime.strptime(text, "%Y%m%d%H%M%S")
+    if text.isdigit() and len(text) == 8:
+        return datetime.strptime(text, "%Y%m%d")
+    return datetime.fromisoformat(text.replace("Z", ""))
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """LTTB 다운샘플링: 선택된 점의 인덱스 배열 반환"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    idx = np.empty(threshold, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    # 첫/끝 점을 제외한 구간을 threshold-2개 버킷으로 분할
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        # 다음 버킷의 평균점(마지막 버킷은 끝점)
+        if i + 2 < len(edges):
+            ns, ne = edges[i + 1], max(edges[i + 2], edges[i + 1] + 1)
+            avg_x, avg_y = x[ns:ne].mean(), y[ns:ne].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+        bx, by = x[start:end], y[start:end]
+        area = np.abs((x[a] - avg_x) * (by - y[a]) - (x[a] - bx) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
+
+def minmax(y: np.ndarray, width: int) -> np.ndarray:
+    """버킷별 최소/최대 인덱스(시간 순) 반환. 출력 점 수 ≈ width"""
+    n = len(y)
+    buckets = max(1, width // 2)
+    if n <= width:
+        return np.arange(n)
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    out = []
+    for s, e in zip(edges[:-1], edges[1:]):
+        if e <= s:
+            continue
+        seg = y[s:e]
+        lo, hi = s + int(np.argmin(seg)), s + int(np.argmax(seg))
+        out.extend(sorted({lo, hi}))
+    return np.asarray(out, dtype=np.int64)
+
+
+def _day_files(start: datetime, end: datetime) -> list[Path]:
+    base = Path(settings.MOCK_DB_DIR)
+    files = []
+    day = start.date()
+    while day <= end.date():
+        p = base / f"history_{day.strftime('%Y%m%d')}.csv"
+        if p.exists():
+            files.append(p)
+        day += timedelta(days=1)
+    return files
+
+
+@lru_cache(maxsize=32)
+def _load_day(path: str, mtime: float) -> "pd.DataFrame":
+    """일자 파일 파싱(경로+mtime 키 캐시). ts는 datetime64, 지표는 float32"""
+    import pandas as pd
+
+    df = pd.read_csv(
+        path,
+        encoding="utf-8-sig",
+        usecols=["YYYYMMDDHHmmss", "Hostname", *METRICS],
+        dtype={"YYYYMMDDHHmmss": str, "Hostname": str},
+    )
+    df["ts"] = pd.to_datetime(df["YYYYMMDDHHmmss"], format="%Y%m%d%H%M%S", errors="coerce")
+    df = df.dropna(subset=["ts"]).drop(columns=["YYYYMMDDHHmmss"])
+    for m in METRICS:
+        df[m] = pd.to_numeric(df[m], errors="coerce").astype("float32")
+    return df
+
+
+def _load_range(start: datetime, end: datetime) -> "pd.DataFrame":
+    import pandas as pd
+
+    frames = [_load_day(str(p), p.stat().st_mtime) for p in _day_files(start, end)]
+    if not frames:
+        return pd.DataFrame(columns=["ts", "Hostname", *METRICS])
+    df = pd.concat(frames, ignore_index=True)
+    return df[(df["ts"] >= start) & (df["ts"] <= end)]
+
+
+def list_hosts(start: datetime, end: datetime) -> list[str]:
+    df = _load_range(start, end)
+    return sorted(df["Hostname"].dropna().unique().tolist())
+
+
+def _signature(start: datetime, end: datetime) -> tuple:
+    """데이터 변경 감지용 (파일, mtime) 튜플"""
+    return tuple((p.name, p.stat().st_mtime) for p in _day_files(start, end))
+
+
+@lru_cache(maxsize=256)
+def _downsample_cached(
+    metric: str, hosts: tuple, start: datetime, end: datetime, width: int, method: str, signature: tuple
+) -> dict:
+    df = _load_range(start, end)
+    if hosts:
+        df = df[df["Hostname"].isin(hosts)]
+    series: dict[str, dict] = {}
+    raw_points = 0
+    for host, g in df.groupby("Hostname", sort=True):
+        g = g.sort_values("ts").dropna(subset=[metric])
+        if g.empty:
+            continue
+        # epoch seconds(int)로 변환하여 전송 크기 축소
+        t = g["ts"].to_numpy().astype("datetime64[s]").astype(np.int64)
+        v = g[metric].to_numpy(dtype=np.float32)
+        raw_points += len(t)
+        keep = lttb(t.astype(np.float64), v.astype(np.float64), width) if method == "lttb" else minmax(v, width)
+        series[str(host)] = {
+            "t": t[keep].tolist(),
+            "v": np.round(v[keep], 2).tolist(),
+        }
+    return {
+        "metric": metric,
+        "method": method,
+        "width": width,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "raw_points": raw_points,
+        "points": sum(len(s["t"]) for s in series.values()),
+        "series": series,
+    }
+
+
+def downsample(
+    metric: str,
+    hosts: Optional[list[str]],
+    start: datetime,
+    end: datetime,
+    width: int,
+    method: str = "lttb",
+) -> dict:
+    """(지표, 호스트 집합, 기간, 해상도) 단위로 캐시된 다운샘플 결과 반환"""
+    if metric not in METRICS:
+        raise ValueError(f"unsupported metric: {metric} ({', '.join(METRICS)})")
+    if method not in METHODS:
+        raise ValueError(f"unsupported method: {method} ({', '.join(METHODS)})")
+    host_key = tuple(sorted(set(hosts or [])))
+    return _downsample_cached(metric, host_key, start, end, int(width), method, _signature(start, end))
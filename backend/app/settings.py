@@ -36,6 +36,45 @@ class Settings(BaseSettings):
     VECTORDB_PASSWORD: str = Field(default="monchat")
     VECTORDB_SSLMODE: str = Field(default="disable")
     EMBEDDING_DIM: int = Field(default=1024)
+    # documents 일자 파티션: 미리 생성해 둘 미래 파티션 일수
+    VECTORDB_PARTITION_AHEAD_DAYS: int = Field(default=3)
+    # 임베딩 저장 타입: vector(float32) | halfvec(float16, 크기 1/2)
+    VECTORDB_STORAGE: str = Field(default="vector")
+    # 이진 양자화(binary_quantize) 해밍 거리 1차 검색 + full precision 재정렬
+    VECTORDB_BINARY_QUANT: bool = Field(default=False)
+    # 재정렬 후보 배수(top_k * factor 개를 1차 추출)
+    VECTORDB_RESCORE_FACTOR: int = Field(default=4)
+    # 비동기 /qa 경로의 asyncpg 연결 풀 크기(워커당)
+    VECTORDB_ASYNC_POOL_MIN: int = Field(default=2)
+    VECTORDB_ASYNC_POOL_MAX: int = Field(default=20)
+    # true면 /qa를 비동기 핸들러(asyncpg + 임베딩 전용 실행기)로 처리. false여도 /qa/async로 사용 가능
+    QA_ASYNC: bool = Field(default=False)
+    # /qa 질문 분석: 시간 표현/호스트명·IP를 일자 범위·호스트 검색 제약으로 적용(요청의 analyze=false로 끌 수 있음)
+    QA_ANALYZE_QUERY: bool = Field(default=True)
+    # 질문 분석기의 호스트 목록(etl_hosts) 재조회 주기(초)
+    QA_ANALYZE_HOSTS_TTL: float = Field(default=300.0)
+    # /qa 결과 캐시: (정규화 질문, top_k, 일자 범위) 키, ETL 적재 세대가 바뀌면 무효화
+    QA_CACHE_ENABLED: bool = Field(default=True)
+    QA_CACHE_MAX_ENTRIES: int = Field(default=1024)
+    # 적재 세대 번호를 DB에서 다시 읽는 주기(초). 적재 직후 최대 이 시간만큼 이전 결과가 반환될 수 있다.
+    QA_CACHE_GENERATION_TTL: float = Field(default=2.0)
+    # 수용 제어: 게이트(qa=/qa,/qa/batch, llm=/llm/chat)별 워커당 동시 처리 수/대기열 길이, 최대 대기 시간(초)
+    # 기본 꺼짐(켜면 초과 요청에 429/503을 반환하므로 클라이언트 재시도 처리 확인 후 사용)
+    ADMISSION_ENABLED: bool = Field(default=False)
+    ADMISSION_QA_CONCURRENCY: int = Field(default=4)
+    ADMISSION_QA_QUEUE: int = Field(default=16)
+    ADMISSION_LLM_CONCURRENCY: int = Field(default=2)
+    ADMISSION_LLM_QUEUE: int = Field(default=8)
+    ADMISSION_QUEUE_TIMEOUT: float = Field(default=10.0)
+    # 비동기 /qa 경로(qa_async 게이트)는 DB 대기 중 스레드를 점유하지 않으므로 훨씬 큰 한도를 둔다.
+    ADMISSION_QA_ASYNC_CONCURRENCY: int = Field(default=256)
+    ADMISSION_QA_ASYNC_QUEUE: int = Field(default=512)
+    # 로컬 벡터 인덱스(VECTORDB 미사용 시): ETL이 float16 행렬 + 오프셋 메타 파일을 기록하고 API가 memmap 검색
+    LOCAL_INDEX_ENABLED: bool = Field(default=False)
+    LOCAL_INDEX_DIR: str = Field(default="local_index")
+    # hnswlib 설치 시 샤드별 HNSW 그래프 생성/사용(미설치면 전수 내적 검색)
+    LOCAL_INDEX_HNSW: bool = Field(default=False)
+    LOCAL_INDEX_HNSW_EF: int = Field(default=64)
 
     # Oracle (상품처리계)
     ORACLE_ENABLED: bool = Field(default=False)
@@ -70,8 +109,59 @@ class Settings(BaseSettings):
 
     # ETL 및 스케줄러 설정
     ETL_DAYS: int = Field(default=7)
+    # ETL 종료 후 ETL_DAYS보다 오래된 일자 파티션 삭제 여부
+    ETL_RETENTION_ENABLED: bool = Field(default=True)
+    # 호스트별 N분 윈도우 요약 문서로 묶어 적재(0이면 1분 단위 행을 그대로 적재, 기본값).
+    # 켜거나 값을 바꾸면 문서 형태가 바뀌므로 보존 기간 전체를 다시 임베딩/적재해야 한다.
+    ETL_CHUNK_MINUTES: int = Field(default=0)
+    # 요약 문서 1건에 담을 최대 이벤트 종류 수(초과분은 '+N more'로 축약)
+    ETL_CHUNK_MAX_EVENTS: int = Field(default=20)
+    # 청크 단위 체크포인트 적재: (일자, 소스) 문서를 N개씩 임베딩/커밋하여 중단 후 재실행 시 이어서 적재
+    # (청크는 대기 테이블에 쌓이고 마지막 청크 커밋에서 이전 행과 한 번에 교체되므로 검색에 중간 상태가 보이지 않음)
+    # (0이면 일자 단위 단일 트랜잭션 적재, 기본값. 켜면 적재 경로가 etl.checkpoint로 바뀜)
+    ETL_CHECKPOINT_CHUNK: int = Field(default=0)
+    # 스테이징 적재(pgvector): 일자별 섀도 테이블에 적재/인덱스 생성 후 파티션을 한 트랜잭션으로 교체
+    # (검색 측에 적재 중간 상태가 보이지 않음). 교체 잠금 대기 한도(초)와 재시도 횟수
+    ETL_STAGING_LOAD: bool = Field(default=False)
+    ETL_STAGING_LOCK_TIMEOUT: float = Field(default=5.0)
+    ETL_STAGING_SWAP_RETRIES: int = Field(default=3)
+    # 이상 징후 사전 계산(ETL 소스 anomaly, 기본 꺼짐: 켜면 anomaly 피드 문서가 검색 대상에 추가됨)
+    # 이동 기준선 윈도우(분), z-score/지표별 임계치
+    ANOMALY_ENABLED: bool = Field(default=False)
+    ANOMALY_DIR: str = Field(default="anomalies")
+    ANOMALY_WINDOW_MINUTES: int = Field(default=60)
+    ANOMALY_Z_THRESHOLD: float = Field(default=3.0)
+    ANOMALY_THRESHOLDS: str = Field(default="CPU_Usage:90,Memory_Usage:90,Swap_Usage:80,Filesystem_Usage:90")
+    # 이 시간(분) 미만으로 끝난 지표/상태 이상 구간은 기록하지 않음(짧은 스파이크 잡음 제거)
+    ANOMALY_MIN_MINUTES: int = Field(default=3)
+    # 이벤트 급증: (호스트, N분) 건수 >= max(최소 건수, 호스트 일평균 x 배수)
+    ANOMALY_BURST_MINUTES: int = Field(default=10)
+    ANOMALY_BURST_MIN_COUNT: int = Field(default=5)
+    ANOMALY_BURST_FACTOR: float = Field(default=3.0)
     SCHEDULER_ENABLED: bool = Field(default=False)
     SCHEDULER_CRON: str = Field(default="0 3 * * *")
+    # 소스별 잡 정의(';' 구분): '<소스,...>|<cron:크론식 | interval:초>[|수집일수]'
+    # 예) "was_log,db_log|interval:60|1;oracle|cron:*/15 * * * *|1;mock_db|cron:0 3 * * *"
+    # 비어 있으면 SCHEDULER_CRON으로 전체 소스 단일 잡 실행
+    ETL_JOBS: str = Field(default="")
+    # 잡 실행 스레드 수(느린 잡이 빠른 잡을 막지 않도록 잡 수 이상 권장)
+    SCHEDULER_WORKERS: int = Field(default=4)
+    # 예정 시각을 놓친 실행을 허용할 유예 시간(초). 초과 시 건너뛰고 장부에 missed로 기록
+    SCHEDULER_MISFIRE_GRACE_SECONDS: int = Field(default=300)
+    # VectorDB 유지보수 잡(보존 정리 → VACUUM ANALYZE → drift 기반 ANN 인덱스 재구성)
+    MAINTENANCE_ENABLED: bool = Field(default=True)
+    MAINTENANCE_CRON: str = Field(default="30 3 * * *")
+    # 레거시 테이블 보존 기간 밖 행 삭제 배치 크기
+    MAINTENANCE_DELETE_BATCH: int = Field(default=5000)
+    # 전/후 지연시간 측정용 프로브 질의 수(0이면 측정 안 함)
+    MAINTENANCE_PROBE_QUERIES: int = Field(default=5)
+    # 마지막 인덱스 빌드 대비 행 수 변화율이 이 값 이상이면 ANN 인덱스 재구성
+    VECTORDB_REINDEX_DRIFT: float = Field(default=0.2)
+    # 잡 실행 장부(JSONL). 비우면 기록하지 않음
+    ETL_RUN_LEDGER: str = Field(default="logs/etl_runs.jsonl")
+    # ETL 메트릭 내보내기: node_exporter textfile collector 경로 / Pushgateway 주소(미지정 시 비활성)
+    ETL_METRICS_TEXTFILE: str = Field(default="")
+    ETL_METRICS_PUSHGATEWAY: str = Field(default="")
 
     # 임베딩 모델 설정
     # BAAI/bge-m3는 1024차원 멀티링구얼 임베딩 모델
@@ -79,6 +169,28 @@ class Settings(BaseSettings):
     EMBEDDING_BATCH_SIZE: int = Field(default=16)
     # auto | cpu | cuda
     EMBEDDING_DEVICE: str = Field(default="auto")
+    # 모델 최대 토큰 길이 상한(0이면 모델 기본값, bge-m3는 8192). 요약 문서/이벤트 행은 이보다 훨씬 짧다.
+    EMBEDDING_MAX_SEQ_LENGTH: int = Field(default=512)
+    # ETL 대량 임베딩 프로세스 수(1: 단일 프로세스, 0: 코어 수 / EMBEDDING_BULK_THREADS)
+    EMBEDDING_BULK_WORKERS: int = Field(default=1)
+    EMBEDDING_BULK_THREADS: int = Field(default=4)
+    # 워커에 배분하는 길이 정렬 청크 크기(문장 수), 이보다 적은 일자 텍스트는 단일 프로세스로 처리
+    EMBEDDING_BULK_CHUNK: int = Field(default=256)
+    EMBEDDING_BULK_MIN_TEXTS: int = Field(default=2000)
+    # 비동기 /qa 경로의 임베딩 전용 스레드 수와 동시 질문 배치(최대 개수/대기 ms)
+    EMBEDDING_EXECUTOR_WORKERS: int = Field(default=1)
+    EMBEDDING_ASYNC_MAX_BATCH: int = Field(default=32)
+    EMBEDDING_ASYNC_MAX_WAIT_MS: float = Field(default=2.0)
+    # 공유 임베딩 서비스 주소(유닉스 소켓 경로 또는 host:port). 지정 시 API 워커는 모델을 로딩하지 않고 위임
+    EMBEDDING_SERVICE_ADDR: str = Field(default="")
+    # 서비스 연결 인증키(HMAC 챌린지). 루프백이 아닌 host:port로 대기하려면 기본값 대신 비밀 값을 지정해야 함
+    EMBEDDING_SERVICE_AUTHKEY: str = Field(default="monchat")
+    # 서비스 배치 수집: 최대 문장 수 / 최대 대기 시간(ms)
+    EMBEDDING_SERVICE_MAX_BATCH: int = Field(default=64)
+    EMBEDDING_SERVICE_MAX_WAIT_MS: int = Field(default=5)
+    EMBEDDING_SERVICE_TIMEOUT: int = Field(default=60)
+    # 서비스 연결 실패 시 워커 내 로컬 모델로 대체할지 여부
+    EMBEDDING_SERVICE_FALLBACK_LOCAL: bool = Field(default=False)
 
     # Hugging Face 설정
     # 개인 토큰(프라이빗 모델 접근 시 사용), 캐시/로컬 모델 디렉터리
@@ -97,6 +209,31 @@ class Settings(BaseSettings):
     LLM_DEFAULT_MODEL: str = Field(default="qwen3:8b")
     LLM_TIMEOUT: int = Field(default=120)
     LLM_STREAM: bool = Field(default=False)
+    # 멀티 호스트 LLM 풀(선택): 'URL[=모델|모델]' 콤마 구분. 지정 시 LLM_BASE_URL 대신 사용
+    LLM_BACKENDS: str = Field(default="")
+    LLM_HEALTH_INTERVAL: float = Field(default=10.0)
+    LLM_HEALTH_TIMEOUT: float = Field(default=2.0)
+    # 요청 중 연결 오류/타임아웃이 이 횟수만큼 연속되면 즉시 헬스 체크해 실패 시 라우팅에서 제외(5xx는 세지 않음)
+    LLM_FAIL_THRESHOLD: int = Field(default=3)
+    # Ollama keep_alive(모델 상주 시간, 예: 30m / -1=무기한, 빈 값이면 서버 기본값)
+    LLM_KEEP_ALIVE: str = Field(default="30m")
+    # 헬스 체크 시 친화 모델이 적재되어 있지 않으면 미리 적재
+    LLM_PRELOAD: bool = Field(default=True)
+    # /llm/chat context(검색 결과 행) 압축: 근사 중복 병합/잡음 필드 제거 후 토큰 예산 적용(0 이하: 무제한)
+    LLM_CONTEXT_COMPACT: bool = Field(default=True)
+    LLM_CONTEXT_TOKEN_BUDGET: int = Field(default=1500)
+
+    # 트레이싱/프로파일링
+    TRACE_ENABLED: bool = Field(default=True)
+    # 이 시간(ms) 이상 걸린 요청은 구간별 분해와 함께 slow 로그에 기록
+    TRACE_SLOW_MS: int = Field(default=1000)
+    # slow 로그 파일 경로(미지정 시 로거 monchat.slow로만 출력)
+    TRACE_SLOW_LOG_FILE: str = Field(default="")
+    # 샘플링 프로파일러(옵트인): folded 스택 파일을 PROFILE_DIR에 저장
+    PROFILE_ENABLED: bool = Field(default=False)
+    PROFILE_DIR: str = Field(default="profiles")
+    PROFILE_INTERVAL_MS: int = Field(default=10)
+    PROFILE_DUMP_SECONDS: int = Field(default=60)
 
     # Streamlit 설정
     STREAMLIT_PORT: int = Field(default=8443)
@@ -104,13 +241,29 @@ class Settings(BaseSettings):
     # NOTE: 불리언 환경변수 값 앞뒤 공백으로 인한 파싱 실패 방지
     @field_validator(
         "VECTORDB_ENABLED",
+        "VECTORDB_BINARY_QUANT",
+        "QA_CACHE_ENABLED",
+        "QA_ASYNC",
+        "QA_ANALYZE_QUERY",
+        "ADMISSION_ENABLED",
+        "LOCAL_INDEX_ENABLED",
+        "LOCAL_INDEX_HNSW",
         "ORACLE_ENABLED",
         "LOG_WAS_ENABLED",
         "LOG_DB_ENABLED",
         "SCHEDULER_ENABLED",
+        "MAINTENANCE_ENABLED",
+        "ETL_RETENTION_ENABLED",
+        "ETL_STAGING_LOAD",
+        "ANOMALY_ENABLED",
         "DEBUG",
         "LLM_ENABLED",
         "LLM_STREAM",
+        "LLM_CONTEXT_COMPACT",
+        "LLM_PRELOAD",
+        "TRACE_ENABLED",
+        "EMBEDDING_SERVICE_FALLBACK_LOCAL",
+        "PROFILE_ENABLED",
         mode="before",
     )
     @classmethod
@@ -0,0 +1,124 @@
+"""
+요청 단위 트레이싱 유틸리티
+- contextvars 기반으로 현재 요청(또는 ETL 실행)의 트레이스를 보관하고, span()으로 구간 시간을 기록한다.
+- 트레이스가 없는 컨텍스트에서 span()은 아무 것도 하지 않으므로 라이브러리 코드 어디서든 안전하게 사용 가능
+- 느린 요청은 구간별 시간 분해(breakdown)를 포함한 JSON 한 줄로 slow 로그에 남긴다.
+"""
+
+import contextvars
+import json
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from .settings import settings
+
+
+slow_logger = logging.getLogger("monchat.slow")
+_slow_handler_ready = False
+
+_current_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("monchat_trace", default=None)
+
+
+class Trace:
+    """단일 요청/배치 실행의 span 목록"""
+
+    def __init__(self, name: str, trace_id: Optional[str] = None, **attrs: Any) -> None:
+        self.name = name
+        self.trace_id = trace_id or uuid.uuid4().hex[:16]
+        self.attrs = dict(attrs)
+        self.start = time.perf_counter()
+        self.spans: list[dict] = []
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.start) * 1000.0
+
+    def breakdown(self) -> dict[str, float]:
+        """span 이름별 누적 시간(ms)"""
+        out: dict[str, float] = {}
+        for s in self.spans:
+            out[s["name"]] = round(out.get(s["name"], 0.0) + s["ms"], 3)
+        return out
+
+    def to_dict(self, total_ms: Optional[float] = None) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "total_ms": round(self.elapsed_ms() if total_ms is None else total_ms, 3),
+            "breakdown_ms": self.breakdown(),
+            "spans": self.spans,
+            **self.attrs,
+        }
+
+    def server_timing(self) -> str:
+        """HTTP Server-Timing 헤더 값(브라우저 개발자 도구에서 구간 확인용)"""
+        return ", ".join(f"{name};dur={ms:.1f}" for name, ms in self.breakdown().items())
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def start_trace(name: str, trace_id: Optional[str] = None, **attrs: Any) -> Iterator[Trace]:
+    """현재 컨텍스트에 새 트레이스를 시작하고 종료 시 원복"""
+    trace = Trace(name, trace_id=trace_id, **attrs)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[None]:
+    """현재 트레이스에 구간(span) 기록. 트레이스가 없거나 TRACE_ENABLED=false면 no-op"""
+    trace = _current_trace.get()
+    if trace is None or not settings.TRACE_ENABLED:
+        yield
+        return
+    t0 = time.perf_counter()
+    error: Optional[str] = None
+    try:
+        yield
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        rec = {
+            "name": name,
+            "offset_ms": round((t0 - trace.start) * 1000.0, 3),
+            "ms": round((time.perf_counter() - t0) * 1000.0, 3),
+        }
+        if attrs:
+            rec["attrs"] = attrs
+        if error:
+            rec["error"] = error
+        trace.spans.append(rec)
+
+
+def _ensure_slow_handler() -> None:
+    """TRACE_SLOW_LOG_FILE 지정 시 slow 로그 전용 파일 핸들러 1회 등록"""
+    global _slow_handler_ready
+    if _slow_handler_ready:
+        return
+    _slow_handler_ready = True
+    slow_logger.setLevel(logging.INFO)
+    if settings.TRACE_SLOW_LOG_FILE:
+        handler = logging.FileHandler(settings.TRACE_SLOW_LOG_FILE, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        slow_logger.addHandler(handler)
+
+
+def log_if_slow(trace: Trace, total_ms: Optional[float] = None, **extra: Any) -> bool:
+    """총 소요 시간이 TRACE_SLOW_MS 이상이면 구조화(JSON) slow 로그 기록"""
+    total = trace.elapsed_ms() if total_ms is None else total_ms
+    if total < settings.TRACE_SLOW_MS:
+        return False
+    _ensure_slow_handler()
+    record = trace.to_dict(total)
+    record.update(extra)
+    slow_logger.warning(json.dumps(record, ensure_ascii=False, default=str))
+    return True
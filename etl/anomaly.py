@@ -0,0 +1,419 @@
+"""
+이상 징후 사전 계산
+- history(1분 단위 지표)에서 호스트/지표별 이동 기준선(직전 ANOMALY_WINDOW_MINUTES분 평균/표준편차)과
+  z-score, 임계치 초과를 pandas/NumPy 연산으로 한 번에 계산한다(전일 데이터로 자정 직후 기준선 보강).
+- 연속된 이상 분(minute)은 1개 에피소드로 묶어 압축 레코드로 만든다.
+  - kind=threshold: ANOMALY_THRESHOLDS 초과 / kind=zscore: |z| >= ANOMALY_Z_THRESHOLD / kind=state: Ping 등 비정상 상태
+- event_history/WAS/DB 이벤트는 (호스트, ANOMALY_BURST_MINUTES분) 건수가 호스트 일평균 대비 급증한 구간을 burst로 기록한다.
+- 레코드는 ANOMALY_DIR/anomalies_YYYYMMDD.jsonl에, 요약 문서는 feed=anomaly 문서로 적재되어
+  "어제 이상했던 호스트는?" 같은 질문을 원본 행 대신 작은 사전 계산 집합으로 답한다.
+"""
+
+import json
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Union
+
+from backend.app.settings import settings
+from etl.sources import get_source
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+METRICS = ("CPU_Usage", "Memory_Usage", "Swap_Usage", "Filesystem_Usage")
+STATE_COLUMNS = ("Ping_Status",)
+EVENT_FEEDS = ("event_history", "was_event", "db_event")
+_OK_STATES = {"OK", "UP", "NORMAL", ""}
+_SEVERITY_ORDER = {"INFO": 0, "WARN": 1, "WARNING": 1, "ERROR": 2, "CRITICAL": 3, "FATAL": 3}
+# 거의 일정한 지표에서 작은 변동이 큰 z-score가 되지 않도록 하는 표준편차 하한(%p)
+_MIN_STD = 1.0
+
+
+def parse_thresholds(text: str) -> dict[str, float]:
+    """'CPU_Usage:90,Memory_Usage:90' → {지표: 임계치}"""
+    out = {}
+    for item in text.split(","):
+        name, sep, value = item.strip().partition(":")
+        if sep and name.strip():
+            out[name.strip()] = float(value)
+    return out
+
+
+def _read_feed(name: str, base_dir: Union[str, Path], date_str: str, numeric: tuple = ()) -> "pd.DataFrame":
+    """피드 일자 파일을 DataFrame으로 읽기(ts: datetime64, numeric 컬럼: float, 나머지: 문자열)"""
+    import pandas as pd
+
+    source = get_source(name)
+    path = source.path(base_dir, date_str)
+    if not path.exists():
+        return pd.DataFrame()
+    text_columns = {source.ts_column, *(c for c in source.columns if c not in numeric)}
+    df = pd.read_csv(
+        path,
+        encoding="utf-8-sig",
+        encoding_errors="ignore",
+        dtype={c: str for c in text_columns},
+        keep_default_na=False,
+        na_values={c: [""] for c in numeric},
+    )
+    for c in numeric:
+        # '81%'처럼 단위가 붙은 값이 있으면 C 파서가 문자열로 읽으므로 그때만 후처리
+        if c in df.columns and df[c].dtype == object:
+            df[c] = pd.to_numeric(df[c].str.rstrip("%"), errors="coerce")
+    df["ts"] = pd.to_datetime(df.get(source.ts_column), format="%Y%m%d%H%M%S", errors="coerce")
+    return df.dropna(subset=["ts"])
+
+
+def _load_history(base_dir: Union[str, Path], date_str: str) -> "pd.DataFrame":
+    """당일 + 전일(기준선 예열용) history. 지표는 float, 호스트/시각 순 정렬
+
+    _day 컬럼은 행을 읽은 일자 파일(ETL 적재 단위와 동일)이며, 같은 (호스트, 시각)이 두 파일에 있으면 당일 파일 행을 쓴다.
+    """
+    import pandas as pd
+
+    prev = (datetime.strptime(date_str, "%Y%m%d") - timedelta(days=1)).strftime("%Y%m%d")
+    frames = [
+        f.assign(_day=d)
+        for d in (prev, date_str)
+        if not (f := _read_feed("history", base_dir, d, numeric=METRICS)).empty
+    ]
+    if not frames:
+        return pd.DataFrame()
+    df = pd.concat(frames, ignore_index=True).drop_duplicates(["Hostname", "ts"], keep="last")
+    return df.sort_values(["Hostname", "ts"], kind="stable").reset_index(drop=True)
+
+
+def rolling_baseline(values, group_start, window: int, min_periods: int):
+    """행별 직전 window개(같은 그룹, 현재 행 제외) 값의 평균/표준편차(표본)
+
+    - values: 그룹/시각 순으로 정렬된 1차원 배열(NaN 허용), group_start: 행별 소속 그룹의 첫 행 인덱스
+    - 누적합 차분으로 계산하므로 그룹 수와 무관하게 O(n)이다. 유효 값이 min_periods 미만이면 NaN
+    """
+    import numpy as np
+
+    x = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(x)
+    filled = np.where(valid, x, 0.0)
+    c1 = np.concatenate(([0.0], np.cumsum(filled)))
+    c2 = np.concatenate(([0.0], np.cumsum(filled * filled)))
+    cn = np.concatenate(([0], np.cumsum(valid)))
+    idx = np.arange(len(x))
+    lo = np.maximum(idx - window, group_start)
+    n = (cn[idx] - cn[lo]).astype(np.float64)
+    s1 = c1[idx] - c1[lo]
+    s2 = c2[idx] - c2[lo]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = s1 / n
+        var = (s2 - s1 * mean) / (n - 1)
+    enough = n >= max(2, min_periods)
+    mean = np.where(enough, mean, np.nan)
+    std = np.where(enough, np.sqrt(np.maximum(var, 0.0)), np.nan)
+    return mean, std
+
+
+def _group_layout(hosts) -> tuple:
+    """정렬된 호스트 배열 → (행별 그룹 첫 행 인덱스, 그룹 시작 여부)"""
+    import numpy as np
+
+    h = np.asarray(hosts)
+    new_group = np.ones(len(h), dtype=bool)
+    new_group[1:] = h[1:] != h[:-1]
+    group_start = np.maximum.accumulate(np.where(new_group, np.arange(len(h)), 0))
+    return group_start, new_group
+
+
+def _episode_ids(flagged, new_group):
+    """호스트별 연속 이상 구간 번호(이상이 아닌 행은 0)"""
+    import numpy as np
+
+    prev = np.zeros(len(flagged), dtype=bool)
+    prev[1:] = flagged[:-1]
+    starts = flagged & (~prev | new_group)
+    return np.where(flagged, np.cumsum(starts), 0)
+
+
+def _episode_frame(df: "pd.DataFrame", flagged, new_group, min_minutes: int, **columns) -> "pd.DataFrame":
+    """이상 행만 모아 에피소드(ep)별로 묶을 프레임. min_minutes분 미만 에피소드 제외"""
+    ep = _episode_ids(flagged, new_group)
+    frame = df.loc[flagged, ["Hostname", "IP", "ts"] if "IP" in df.columns else ["Hostname", "ts"]]
+    frame = frame.assign(ep=ep[flagged], **{k: v[flagged] for k, v in columns.items()})
+    size = frame.groupby("ep")["ts"].transform("size")
+    return frame[size >= min_minutes]
+
+
+def _ts_text(series: "pd.Series") -> list[str]:
+    return series.dt.strftime("%Y%m%d%H%M%S").tolist()
+
+
+def history_anomalies(
+    df: "pd.DataFrame",
+    date_str: str,
+    window: int,
+    z_threshold: float,
+    thresholds: dict[str, float],
+    min_minutes: int = 1,
+) -> list[dict]:
+    """지표별 임계치/z-score 이상, 상태 컬럼 비정상 구간을 에피소드 레코드로 반환(min_minutes분 미만 구간 제외)
+
+    df는 _load_history 형식(호스트/시각 순 정렬, _day 컬럼)이어야 한다.
+    """
+    if df.empty:
+        return []
+    import numpy as np
+    import pandas as pd
+
+    in_day = (df["_day"] == date_str).to_numpy()
+    group_start, new_group = _group_layout(df["Hostname"])
+    min_periods = max(5, window // 4)
+    records: list[dict] = []
+
+    for metric in METRICS:
+        if metric not in df.columns:
+            continue
+        x = df[metric].to_numpy(dtype=np.float64)
+        mean, std = rolling_baseline(x, group_start, window, min_periods)
+        with np.errstate(invalid="ignore"):
+            z = (x - mean) / np.maximum(np.nan_to_num(std), _MIN_STD)
+            limit = thresholds.get(metric)
+            over = x >= limit if limit is not None else np.zeros(len(x), dtype=bool)
+            flagged = (over | (np.abs(z) >= z_threshold)) & in_day
+        if not flagged.any():
+            continue
+        frame = _episode_frame(df, flagged, new_group, min_minutes, value=x, z=z, baseline=mean, over=over)
+        if frame.empty:
+            continue
+        grouped = frame.groupby("ep", sort=True)
+        agg = grouped.agg(
+            start=("ts", "min"), end=("ts", "max"), high=("value", "max"), low=("value", "min"),
+            samples=("value", "size"), breach=("over", "any"),
+        )
+        # 에피소드 내 |z| 최대 행(호스트/IP/z/기준선). z가 없는(기준선 예열 전) 구간은 첫 행
+        peaks = frame.loc[frame["z"].abs().fillna(-1.0).groupby(frame["ep"]).idxmax()].set_index("ep")
+        agg = agg.join(peaks.drop(columns=["ts", "value", "over"]))
+        # 하락 이상(z<0, 임계치 미초과)은 최저값을 peak로 기록
+        drop = ~agg["breach"] & (agg["z"] < 0)
+        agg["peak"] = np.where(drop, agg["low"], agg["high"])
+        for row, start, end in zip(agg.to_dict("records"), _ts_text(agg["start"]), _ts_text(agg["end"])):
+            records.append(
+                {
+                    "day": date_str,
+                    "host": row["Hostname"],
+                    "ip": row.get("IP", ""),
+                    "metric": metric,
+                    "kind": "threshold" if row["breach"] else "zscore",
+                    "start": start,
+                    "end": end,
+                    "peak": _round(row["peak"]),
+                    "baseline": _round(row["baseline"]),
+                    "z": _round(row["z"]),
+                    "threshold": limit if row["breach"] else None,
+                    "samples": int(row["samples"]),
+                }
+            )
+
+    for column in STATE_COLUMNS:
+        if column not in df.columns:
+            continue
+        # 상태 값 종류는 몇 개뿐이므로 고유값 단위로 판정 후 코드로 펼친다
+        codes, uniques = pd.factorize(df[column].astype(str))
+        labels = np.array([u.strip() for u in uniques], dtype=object)
+        abnormal = np.array([u.upper() not in _OK_STATES for u in labels], dtype=bool)
+        flagged = abnormal[codes] & in_day
+        state = labels[codes]
+        if not flagged.any():
+            continue
+        frame = _episode_frame(df, flagged, new_group, min_minutes, state=state)
+        if frame.empty:
+            continue
+        agg = frame.groupby("ep", sort=True).agg(
+            Hostname=("Hostname", "first"), start=("ts", "min"), end=("ts", "max"), samples=("ts", "size"),
+            **({"IP": ("IP", "first")} if "IP" in frame.columns else {}),
+        )
+        # 구간 내 최빈 상태
+        counts = frame.groupby(["ep", "state"]).size()
+        agg["peak"] = counts.loc[counts.groupby(level=0).idxmax()].reset_index(level=1)["state"]
+        for row, start, end in zip(agg.to_dict("records"), _ts_text(agg["start"]), _ts_text(agg["end"])):
+            records.append(
+                {
+                    "day": date_str,
+                    "host": row["Hostname"],
+                    "ip": row.get("IP", ""),
+                    "metric": column,
+                    "kind": "state",
+                    "start": start,
+                    "end": end,
+                    "peak": row["peak"],
+                    "samples": int(row["samples"]),
+                }
+            )
+    return records
+
+
+def event_bursts(
+    df: "pd.DataFrame",
+    feed: str,
+    date_str: str,
+    bucket_minutes: int,
+    min_count: int,
+    factor: float,
+) -> list[dict]:
+    """(호스트, bucket_minutes분) 이벤트 건수가 max(min_count, 호스트 일평균 x factor) 이상인 구간"""
+    if df.empty or "Hostname" not in df.columns:
+        return []
+    buckets_per_day = max(1, (24 * 60) // bucket_minutes)
+    frame = df.assign(bucket=df["ts"].dt.floor(f"{bucket_minutes}min"))
+    counts = frame.groupby(["Hostname", "bucket"]).size().rename("events").reset_index()
+    counts["baseline"] = counts.groupby("Hostname")["events"].transform("sum") / buckets_per_day
+    limit = (counts["baseline"] * factor).clip(lower=min_count)
+    bursts = counts[counts["events"] >= limit]
+    if bursts.empty:
+        return []
+    # 급증 구간의 이벤트 행만 남겨 구간별 최다 메시지/최고 심각도 계산
+    hits = frame.merge(bursts[["Hostname", "bucket"]], on=["Hostname", "bucket"])
+    details = {key: group for key, group in hits.groupby(["Hostname", "bucket"])}
+    span_delta = timedelta(minutes=bucket_minutes) - timedelta(seconds=1)
+    records = []
+    for row in bursts.itertuples(index=False):
+        events = details[(row.Hostname, row.bucket)]
+        messages = events.get("Event_Message")
+        rec = {
+            "day": date_str,
+            "host": row.Hostname,
+            "ip": events["IP"].iloc[0] if "IP" in events.columns else "",
+            "metric": feed,
+            "kind": "burst",
+            "start": row.bucket.strftime("%Y%m%d%H%M%S"),
+            "end": (row.bucket + span_delta).strftime("%Y%m%d%H%M%S"),
+            "count": int(row.events),
+            "baseline": _round(row.baseline),
+            "top": messages.value_counts().index[0] if messages is not None else "",
+        }
+        if "Severity" in events.columns:
+            rec["severity"] = max(events["Severity"], key=lambda s: _SEVERITY_ORDER.get(s.upper(), -1))
+        records.append(rec)
+    return records
+
+
+def _round(value) -> Optional[float]:
+    try:
+        v = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if v != v else round(v, 1)
+
+
+def detect_day(base_dir: Union[str, Path], date_str: str) -> list[dict]:
+    """일자 1개의 이상 징후 레코드(지표 이상 + 이벤트 급증), 시작 시각/호스트 순"""
+    records = history_anomalies(
+        _load_history(base_dir, date_str),
+        date_str,
+        settings.ANOMALY_WINDOW_MINUTES,
+        settings.ANOMALY_Z_THRESHOLD,
+        parse_thresholds(settings.ANOMALY_THRESHOLDS),
+        settings.ANOMALY_MIN_MINUTES,
+    )
+    for feed in EVENT_FEEDS:
+        records += event_bursts(
+            _read_feed(feed, base_dir, date_str),
+            feed,
+            date_str,
+            settings.ANOMALY_BURST_MINUTES,
+            settings.ANOMALY_BURST_MIN_COUNT,
+            settings.ANOMALY_BURST_FACTOR,
+        )
+    records.sort(key=lambda r: (r["start"], r["host"], r["metric"]))
+    return records
+
+
+def host_ranking(records: list[dict]) -> list[dict]:
+    """호스트별 이상 건수/종류(건수 내림차순)"""
+    hosts: dict[str, dict] = {}
+    for r in records:
+        h = hosts.setdefault(r["host"], {"host": r["host"], "count": 0, "kinds": {}, "metrics": []})
+        h["count"] += 1
+        h["kinds"][r["kind"]] = h["kinds"].get(r["kind"], 0) + 1
+        if r["metric"] not in h["metrics"]:
+            h["metrics"].append(r["metric"])
+    return sorted(hosts.values(), key=lambda h: (-h["count"], h["host"]))
+
+
+def anomaly_documents(date_str: str, records: list[dict]) -> list[str]:
+    """적재용 요약 문서: 일자 개요 1건 + 레코드별 1건(시각 키가 없어 청킹 대상이 아님)"""
+    if not records:
+        return []
+    ranking = host_ranking(records)
+    overview = " ".join(
+        [
+            "type=anomaly_summary",
+            f"date={date_str}",
+            f"anomalies={len(records)}",
+            "hosts=" + "; ".join(
+                f"{h['host']}({', '.join(f'{k} x{c}' for k, c in h['kinds'].items())}: {','.join(h['metrics'])})"
+                for h in ranking
+            ),
+        ]
+    )
+    docs = [overview]
+    for r in records:
+        parts = [
+            "type=anomaly",
+            f"kind={r['kind']}",
+            f"date={date_str}",
+            f"window={r['start'][:12]}-{r['end'][8:12]}",
+            f"Hostname={r['host']}",
+        ]
+        if r.get("ip"):
+            parts.append(f"IP={r['ip']}")
+        if r["kind"] == "burst":
+            parts += [f"feed={r['metric']}", f"events={r['count']}", f"baseline={r['baseline']}"]
+            if r.get("severity"):
+                parts.append(f"severity={r['severity']}")
+            if r.get("top"):
+                parts.append(f"top=[{r['top']}]")
+        elif r["kind"] == "state":
+            parts += [f"{r['metric']}={r['peak']}", f"minutes={r['samples']}"]
+        else:
+            parts += [
+                f"metric={r['metric']}",
+                f"peak={r['peak']}",
+                f"baseline={r['baseline']}",
+                f"z={r['z']}",
+                f"minutes={r['samples']}",
+            ]
+            if r.get("threshold") is not None:
+                parts.append(f"threshold={r['threshold']:g}")
+        docs.append(" ".join(parts))
+    return docs
+
+
+def records_path(date_str: str, base_dir: Optional[Union[str, Path]] = None) -> Path:
+    return Path(base_dir or settings.ANOMALY_DIR) / f"anomalies_{date_str}.jsonl"
+
+
+def write_records(date_str: str, records: list[dict], base_dir: Optional[Union[str, Path]] = None) -> Path:
+    """일자 레코드 파일을 원자적으로 교체(JSONL)"""
+    path = records_path(date_str, base_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        for r in records:
+            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+    os.replace(tmp, path)
+    return path
+
+
+def load_records(date_str: str, base_dir: Optional[Union[str, Path]] = None) -> list[dict]:
+    path = records_path(date_str, base_dir)
+    if not path.exists():
+        return []
+    with path.open("r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def collect_anomalies(date_str: str) -> list[str]:
+    """ETL 수집기: 이상 징후 계산 → 레코드 파일 기록 → 요약 문서 반환"""
+    records = detect_day(settings.MOCK_DB_DIR, date_str)
+    write_records(date_str, records)
+    return anomaly_documents(date_str, records)
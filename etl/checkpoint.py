@@ -0,0 +1,267 @@
+"""
+ETL 청크 단위 체크포인트(중단된 적재 이어서 실행)
+- (일자, 소스) 문서 목록을 ETL_CHECKPOINT_CHUNK개씩 나누고, 청크마다 임베딩 → 대기 테이블(etl_pending_documents) 적재 +
+  체크포인트(pending) 기록을 한 트랜잭션으로 커밋한다.
+  OOM/DB 재기동 등으로 실행이 중단되어도 커밋된 청크는 남아 있으므로 재실행은 첫 미완료 청크부터 임베딩한다.
+- 마지막 청크 트랜잭션에서 documents의 교체 대상 행을 지우고 대기 행을 옮긴 뒤 체크포인트를 게시 상태로 바꾼다.
+  검색 측은 그 커밋 전까지 이전 행 전체, 이후에는 새 행 전체만 본다(재적재 도중 소스 행이 사라지거나 일부만 보이지 않음).
+- 청크 지문(fingerprint) = 임베딩 모델/차원/저장 타입 + 청크 문서 내용의 해시
+  앞에서부터 지문·행 범위·DB 행 수(documents.etl_chunk)가 모두 일치하는 게시 청크는 다시 임베딩하지 않고,
+  그 이후 청크만 새로 임베딩해 교체한다. 대기 청크도 같은 규칙(대기 테이블 행 수)으로 이어서 적재한다.
+- 내용이 바뀌지 않은 (일자, 소스)는 재실행해도 임베딩/적재하지 않는다.
+- ETL_CHECKPOINT_CHUNK=0이면 기존 단일 트랜잭션 적재(etl.pipeline).
+  ETL_STAGING_LOAD=true면 게시 대상이 섀도 테이블(db.staging)이므로 검색 측은 파티션 교체 전까지 이전 파티션만 본다.
+- 조회/초기화: python tools/etl_checkpoint.py list | reset
+"""
+
+import hashlib
+from typing import Callable, Optional
+
+from backend.app.db.vector import (
+    FEED_MATCH_SQL,
+    DateLike,
+    bump_generation,
+    ensure_ann_index,
+    ensure_partition_for,
+    get_pg_connection,
+    insert_documents,
+    partition_name,
+    storage_type,
+    upsert_hosts,
+    to_date,
+)
+from backend.app.metrics import EtlRunMetrics
+from backend.app.settings import settings
+from backend.app.tracing import span
+
+
+def chunk_bounds(n: int, size: int) -> list[tuple[int, int]]:
+    """문서 n개를 size개씩 나눈 [(시작, 끝)] (size <= 0이면 1청크)"""
+    if size <= 0:
+        return [(0, n)] if n else []
+    return [(start, min(start + size, n)) for start in range(0, n, size)]
+
+
+def chunk_fingerprint(texts: list[str]) -> str:
+    """청크 지문: 임베딩 설정이 바뀌면 같은 문서라도 다시 임베딩하도록 모델/차원/저장 타입을 포함"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{settings.EMBEDDING_MODEL}|{settings.EMBEDDING_DIM}|{storage_type()}\n".encode("utf-8"))
+    for text in texts:
+        h.update(text.encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+_PENDING_TABLE = "etl_pending_documents"
+_PENDING_COLUMNS = "source, feed, content, event_date, created_at, embedding, etl_chunk"
+
+
+def _row_counts(cur, table: str, day, feed: str) -> dict:
+    """etl_chunk별 행 수(체크포인트 없이 적재된 행은 None)"""
+    cur.execute(
+        f"SELECT etl_chunk, COUNT(*) AS n FROM {table} WHERE event_date = %s AND feed = %s GROUP BY etl_chunk;",
+        (day, feed),
+    )
+    return {row["etl_chunk"]: row["n"] for row in cur.fetchall()}
+
+
+def _has_unowned_rows(cur, table: str, day) -> bool:
+    """feed 컬럼 추가 전에 적재된(소스 미기록) 행이 남아 있는지(있으면 다음 게시에서 함께 교체)"""
+    cur.execute(f"SELECT EXISTS (SELECT 1 FROM {table} WHERE event_date = %s AND feed IS NULL) AS found;", (day,))
+    return bool(cur.fetchone()["found"])
+
+
+def _matching_prefix(
+    checkpoints: dict, counts: dict, bounds: list[tuple[int, int]], fingerprints: list[str], start: int = 0
+) -> int:
+    """start부터 지문·행 범위·행 수가 모두 일치하는 마지막 청크 다음 번호"""
+    k = start
+    while k < len(bounds):
+        cp = checkpoints.get(k)
+        s, e = bounds[k]
+        if cp is None or cp["fingerprint"] != fingerprints[k] or (cp["row_start"], cp["row_end"]) != (s, e):
+            break
+        if counts.get(k, 0) != e - s:
+            break
+        k += 1
+    return k
+
+
+def _publish(cur, table: str, day, feed: str, start: int, total: int) -> int:
+    """start 이후 청크 행을 대기 행으로 교체하고 체크포인트 게시. 새 적재 세대 번호 반환(같은 트랜잭션에서 커밋)"""
+    # 소스 미기록 이전 행(feed IS NULL)은 etl_chunk도 NULL이므로 같은 조건으로 교체된다.
+    cur.execute(
+        f"DELETE FROM {table} WHERE event_date = %s AND {FEED_MATCH_SQL} AND (etl_chunk IS NULL OR etl_chunk >= %s);",
+        (day, feed, start),
+    )
+    cur.execute(
+        f"INSERT INTO {table} ({_PENDING_COLUMNS}) SELECT {_PENDING_COLUMNS} FROM {_PENDING_TABLE} "
+        "WHERE event_date = %s AND feed = %s AND etl_chunk >= %s AND etl_chunk < %s;",
+        (day, feed, start, total),
+    )
+    cur.execute(f"DELETE FROM {_PENDING_TABLE} WHERE event_date = %s AND feed = %s;", (day, feed))
+    cur.execute(
+        "DELETE FROM etl_checkpoint WHERE event_date = %s AND feed = %s AND chunk_no >= %s;", (day, feed, total)
+    )
+    cur.execute(
+        "UPDATE etl_checkpoint SET pending = FALSE WHERE event_date = %s AND feed = %s AND pending;", (day, feed)
+    )
+    # 질문 분석기가 인식할 호스트 목록 갱신(청크마다 하지 않고 게시 시 1회)
+    upsert_hosts(cur, day, feed, table)
+    if table == "documents":
+        # 일자 첫 적재면 행 수에 맞는 ANN 인덱스를 새 행과 함께 커밋(섀도 테이블은 교체 전에 db.staging이 생성)
+        ensure_ann_index(cur, partition_name(day))
+    # 게시 커밋과 함께 세대를 올려 API 결과 캐시가 새 행을 반영하도록 한다.
+    return bump_generation(cur)
+
+
+def load_feed(
+    day: str,
+    feed: str,
+    texts: list[str],
+    embed: Callable[[list[str]], list[list[float]]],
+    metrics: Optional[EtlRunMetrics] = None,
+    chunk_size: Optional[int] = None,
+    table: str = "documents",
+) -> tuple[int, bool]:
+    """(일자, 소스) 문서를 청크 단위로 임베딩/적재하며 체크포인트 기록
+
+    - table: 게시 대상(기본 documents, 스테이징 적재 시 섀도 테이블. 게시 체크포인트는 이 테이블의 행 수로 검증)
+    - 반환: (이번 실행에서 임베딩/적재한 행 수, 게시 대상 테이블 변경 여부)
+    """
+    metrics = metrics or EtlRunMetrics()
+    size = settings.ETL_CHECKPOINT_CHUNK if chunk_size is None else chunk_size
+    d = to_date(day)
+    bounds = chunk_bounds(len(texts), size)
+    fingerprints = [chunk_fingerprint(texts[s:e]) for s, e in bounds]
+    total = len(bounds)
+    loaded = 0
+    conn = get_pg_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT chunk_no, row_start, row_end, fingerprint, pending FROM etl_checkpoint "
+                "WHERE event_date = %s AND feed = %s;",
+                (d, feed),
+            )
+            rows = cur.fetchall()
+            published = {r["chunk_no"]: r for r in rows if not r["pending"]}
+            pending = {r["chunk_no"]: r for r in rows if r["pending"]}
+            live_counts = _row_counts(cur, table, d, feed)
+            unowned = _has_unowned_rows(cur, table, d)
+            # 게시된 청크 중 그대로 둘 앞부분(k)과, 그 뒤로 이미 대기 테이블에 커밋된 청크(resume_at)
+            k = _matching_prefix(published, live_counts, bounds, fingerprints)
+            resume_at = _matching_prefix(pending, _row_counts(cur, _PENDING_TABLE, d, feed), bounds, fingerprints, k)
+        # 조회 트랜잭션은 임베딩 전에 끝낸다(임베딩 동안 idle in transaction 방지).
+        conn.commit()
+        skipped = bounds[resume_at - 1][1] if resume_at else 0
+        metrics.add_rows(feed, "resumed", skipped)
+        stale = unowned or len(rows) != total or any(c is None or c >= total for c in live_counts)
+        if k == total and not stale:
+            print(f"[ETL] {day} | {feed} | unchanged ({len(texts)} rows, {total} chunks), skip")
+            return 0, False
+        if k == total:
+            # 문서 수가 줄어 남은 청크/체크포인트 없는 행만 정리하는 경우(한 트랜잭션)
+            with conn.cursor() as cur:
+                generation = _publish(cur, table, d, feed, total, total)
+            conn.commit()
+            print(f"[ETL] {day} | {feed} | removed stale rows (generation {generation})")
+            return 0, True
+        if resume_at > k:
+            print(f"[ETL] {day} | {feed} | resume at chunk {resume_at + 1}/{total} (skip {skipped} rows)")
+        if resume_at == total:
+            # 모든 청크가 대기 테이블에 있고 게시만 남은 경우
+            with conn.cursor() as cur:
+                if table == "documents":
+                    ensure_partition_for(cur, d)
+                generation = _publish(cur, table, d, feed, k, total)
+            conn.commit()
+            print(f"[ETL] {day} | {feed} | published chunks {k + 1}-{total} (generation {generation})")
+            return 0, True
+        for no in range(resume_at, total):
+            start, end = bounds[no]
+            chunk = texts[start:end]
+            with metrics.stage("embed"):
+                vectors = embed(chunk)
+            metrics.add_rows(feed, "embedded", len(chunk))
+            with metrics.stage("load"), span("db.insert", rows=len(chunk), chunk=no), conn.cursor() as cur:
+                if no == resume_at:
+                    # 이어서 적재할 수 없는 대기 청크 정리(게시된 행은 마지막 청크 커밋까지 그대로 둔다)
+                    cur.execute(
+                        f"DELETE FROM {_PENDING_TABLE} WHERE event_date = %s AND feed = %s "
+                        "AND (etl_chunk < %s OR etl_chunk >= %s);",
+                        (d, feed, k, resume_at),
+                    )
+                    cur.execute(
+                        "DELETE FROM etl_checkpoint WHERE event_date = %s AND feed = %s AND pending AND chunk_no >= %s;",
+                        (d, feed, resume_at),
+                    )
+                insert_documents(cur, d, [feed] * len(chunk), chunk, vectors, chunk=no, table=_PENDING_TABLE)
+                cur.execute(
+                    "INSERT INTO etl_checkpoint "
+                    "(event_date, feed, chunk_no, chunks_total, row_start, row_end, fingerprint, pending) "
+                    "VALUES (%s, %s, %s, %s, %s, %s, %s, TRUE) "
+                    "ON CONFLICT (event_date, feed, chunk_no) DO UPDATE SET chunks_total = EXCLUDED.chunks_total, "
+                    "row_start = EXCLUDED.row_start, row_end = EXCLUDED.row_end, "
+                    "fingerprint = EXCLUDED.fingerprint, loaded_at = NOW(), pending = TRUE;",
+                    (d, feed, no, total, start, end, fingerprints[no]),
+                )
+                if no == total - 1:
+                    # 범위 밖 일자(백필 등)도 적재할 수 있도록 파티션 보장 후 이전 행 → 새 행 일괄 교체
+                    if table == "documents":
+                        ensure_partition_for(cur, d)
+                    generation = _publish(cur, table, d, feed, k, total)
+                conn.commit()
+            metrics.add_rows(feed, "loaded", len(chunk))
+            loaded += len(chunk)
+            print(f"[ETL] {day} | {feed} | chunk {no + 1}/{total} staged {len(chunk)} rows")
+        print(f"[ETL] {day} | {feed} | published chunks {k + 1}-{total} (generation {generation})")
+    finally:
+        conn.close()
+    return loaded, True
+
+
+def _filter_sql(day: Optional[DateLike], feed: Optional[str]) -> tuple[str, list]:
+    clauses: list[str] = []
+    params: list = []
+    if day is not None:
+        clauses.append("event_date = %s")
+        params.append(to_date(day))
+    if feed:
+        clauses.append("feed = %s")
+        params.append(feed)
+    return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def list_checkpoints(day: Optional[DateLike] = None, feed: Optional[str] = None) -> list[dict]:
+    """(일자, 소스)별 체크포인트 요약: 완료 청크 수/전체 청크 수, 완료 행 수, 게시 대기 여부, 마지막 커밋 시각"""
+    where, params = _filter_sql(day, feed)
+    conn = get_pg_connection()
+    try:
+        with conn, conn.cursor() as cur:
+            cur.execute(
+                "SELECT event_date, feed, COUNT(*) AS chunks_done, MAX(chunks_total) AS chunks_total, "
+                "SUM(row_end - row_start) AS rows_done, BOOL_OR(pending) AS pending, MAX(loaded_at) AS last_loaded_at "
+                f"FROM etl_checkpoint {where} GROUP BY event_date, feed ORDER BY event_date, feed;",
+                params,
+            )
+            rows = [dict(r) for r in cur.fetchall()]
+    finally:
+        conn.close()
+    for row in rows:
+        row["complete"] = row["chunks_done"] >= row["chunks_total"] and not row["pending"]
+    return rows
+
+
+def reset_checkpoints(day: Optional[DateLike] = None, feed: Optional[str] = None) -> int:
+    """체크포인트/게시 대기 행 삭제(다음 실행에서 해당 (일자, 소스)를 처음부터 다시 임베딩/적재). 삭제한 청크 수 반환"""
+    where, params = _filter_sql(day, feed)
+    conn = get_pg_connection()
+    try:
+        with conn, conn.cursor() as cur:
+            cur.execute(f"DELETE FROM etl_checkpoint {where};", params)
+            deleted = cur.rowcount
+            cur.execute(f"DELETE FROM {_PENDING_TABLE} {where};", params)
+    finally:
+        conn.close()
+    return deleted
@@ -0,0 +1,151 @@
+"""
+시간 윈도우 청킹
+- 1분 단위 행(history/event/WAS/DB 이벤트, 로그 라인)을 (호스트, N분 윈도우)로 묶어 요약 문서 1건으로 만든다.
+- 요약 문서에는 지표별 min/avg/max, 비정상 상태 횟수, 윈도우 내 발생 이벤트(중복은 횟수로 축약)를 담는다.
+- 시각/호스트를 해석할 수 없는 행은 원문 그대로 통과시킨다.
+"""
+
+import re
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional
+
+# 'key=value' 직렬화 행: 값에 공백이 있을 수 있으므로 다음 'key=' 앞에서 분리
+_KV_SPLIT = re.compile(r"\s+(?=[A-Za-z_][A-Za-z0-9_]*=)")
+# 로그 라인: 'YYYYMMDD HHMMSS host message'
+_LOG_LINE = re.compile(r"^﻿?(\d{8})\s+(\d{6})\s+(\S+)\s+(.*)$")
+_TS_KEYS = ("ts", "YYYYMMDDHHmmss", "YYYYMMDDHHMMSS")
+_HOST_KEYS = ("Hostname", "HOSTNAME", "host")
+_EVENT_TYPES = {"event_history", "WAS_Event", "DB_Event", "log"}
+# 정상 상태 값(이외 값은 비정상 횟수로 집계)
+_OK_STATES = {"OK", "UP", "NORMAL"}
+
+
+def parse_row(text: str) -> Optional[dict]:
+    """직렬화된 행/로그 라인을 dict로 파싱. 시각/호스트가 없으면 None"""
+    m = _LOG_LINE.match(text)
+    if m:
+        d, t, host, msg = m.groups()
+        try:
+            ts = datetime.strptime(d + t, "%Y%m%d%H%M%S")
+        except ValueError:
+            return None
+        return {"type": "log", "_ts": ts, "_host": host, "Event_Message": msg}
+    if "=" not in text:
+        return None
+    fields: dict = {}
+    for part in _KV_SPLIT.split(text.strip()):
+        key, sep, value = part.partition("=")
+        if sep:
+            fields[key.lstrip("﻿")] = value
+    raw_ts = next((fields[k] for k in _TS_KEYS if fields.get(k)), "")
+    host = next((fields[k] for k in _HOST_KEYS if fields.get(k)), "")
+    if not raw_ts or not host:
+        return None
+    try:
+        ts = datetime.strptime(str(raw_ts)[:14], "%Y%m%d%H%M%S")
+    except ValueError:
+        return None
+    fields["_ts"] = ts
+    fields["_host"] = host
+    return fields
+
+
+def _to_number(value: str) -> Optional[float]:
+    try:
+        return float(str(value).rstrip("%"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _window_start(ts: datetime, minutes: int) -> datetime:
+    """자정 기준 minutes분 단위로 내림한 윈도우 시작 시각"""
+    since_midnight = ts.hour * 60 + ts.minute
+    midnight = ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    return midnight + timedelta(minutes=since_midnight - since_midnight % minutes)
+
+
+def _format_num(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else f"{v:.1f}"
+
+
+def _summarize(host: str, start: datetime, minutes: int, rows: list[dict], max_events: int) -> str:
+    end = start + timedelta(minutes=minutes)
+    ip = next((r.get("IP") for r in rows if r.get("IP")), "")
+    metrics: "OrderedDict[str, list[float]]" = OrderedDict()
+    states: "OrderedDict[str, dict[str, int]]" = OrderedDict()
+    # 이벤트 라벨 → [최초 발생 HH:MM, 횟수]
+    events: "OrderedDict[str, list]" = OrderedDict()
+    n_metric_rows = 0
+    for r in rows:
+        rtype = r.get("type", "")
+        if rtype in _EVENT_TYPES or "Event_Message" in r:
+            label = " ".join(
+                x for x in (rtype if rtype != "log" else "", r.get("Severity", ""), r.get("Event_Message", "")) if x
+            )
+            if label in events:
+                events[label][1] += 1
+            else:
+                events[label] = [r["_ts"].strftime("%H:%M"), 1]
+            continue
+        n_metric_rows += 1
+        for k, v in r.items():
+            if k.startswith("_") or k in ("type", "IP") or k in _TS_KEYS or k in _HOST_KEYS:
+                continue
+            num = _to_number(v)
+            if num is not None:
+                metrics.setdefault(k, []).append(num)
+            elif v:
+                states.setdefault(k, {})
+                states[k][v] = states[k].get(v, 0) + 1
+
+    parts = [
+        "type=summary",
+        f"window={start.strftime('%Y%m%d%H%M')}-{end.strftime('%H%M')}",
+        f"Hostname={host}",
+    ]
+    if ip:
+        parts.append(f"IP={ip}")
+    if n_metric_rows:
+        parts.append(f"samples={n_metric_rows}")
+    for k, values in metrics.items():
+        avg = sum(values) / len(values)
+        parts.append(f"{k}(min/avg/max)={_format_num(min(values))}/{avg:.1f}/{_format_num(max(values))}")
+    for k, counts in states.items():
+        abnormal = {s: c for s, c in counts.items() if s.upper() not in _OK_STATES}
+        if abnormal:
+            parts.append(f"{k}=" + ",".join(f"{s}x{c}" for s, c in abnormal.items()))
+        else:
+            parts.append(f"{k}=OK")
+    if events:
+        shown = [
+            f"{first} {label} (x{count})" if count > 1 else f"{first} {label}"
+            for label, (first, count) in list(events.items())[:max_events]
+        ]
+        more = len(events) - len(shown)
+        parts.append("events=[" + "; ".join(shown) + (f"; +{more} more" if more > 0 else "") + "]")
+    return " ".join(parts)
+
+
+def chunk_rows(texts: list[str], minutes: int, max_events: int = 20) -> list[str]:
+    """(호스트, minutes분 윈도우) 단위로 묶은 요약 문서 리스트 반환
+
+    - minutes <= 0이면 입력을 그대로 반환
+    - 출력 순서: 통과 행(원문) → 윈도우 시작 시각/호스트 순 요약 문서
+    """
+    if minutes <= 0:
+        return texts
+    groups: dict[tuple[datetime, str], list[dict]] = {}
+    passthrough: list[str] = []
+    for text in texts:
+        row = parse_row(text)
+        if row is None:
+            passthrough.append(text)
+            continue
+        key = (_window_start(row["_ts"], minutes), row["_host"])
+        groups.setdefault(key, []).append(row)
+    docs = [
+        _summarize(host, start, minutes, rows, max_events)
+        for (start, host), rows in sorted(groups.items(), key=lambda kv: (kv[0][0], kv[0][1]))
+    ]
+    return passthrough + docs
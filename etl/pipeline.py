@@ -1,7 +1,12 @@
 """
 ETL 파이프라인
 - 최근 N일(기본 7일) 범위의 데이터 소스(Oracle, 로그)를 수집
+- 호스트/시간 윈도우 단위 요약 문서로 청킹(ETL_CHUNK_MINUTES)
+- 지표 이상/이벤트 급증을 사전 계산하여 anomaly 피드 요약 문서로 적재(ANOMALY_ENABLED)
 - 텍스트 정제/임베딩 후 pgvector DB에 적재
+  ETL_CHECKPOINT_CHUNK > 0이면 (일자, 소스)를 청크 단위로 커밋하며 체크포인트를 남겨 중단 후 재실행 시 이어서 적재(etl.checkpoint)
+  ETL_STAGING_LOAD=true면 일자별 섀도 테이블에 적재한 뒤 인덱스를 만들고 파티션을 원자적으로 교체(db.staging)
+- pgvector 미사용 + LOCAL_INDEX_ENABLED 시 로컬 벡터 인덱스(float16 행렬 + 오프셋 메타) 파일로 적재
 """
 
 import os
@@ -14,11 +19,39 @@ _ROOT_DIR = _THIS_DIR.parent
 if str(_ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(_ROOT_DIR))
 from datetime import datetime, timedelta
-import csv
+from typing import Callable, Optional
 from backend.app.settings import settings
 from backend.app.embeddings import embed_texts
-from backend.app.db.vector import ensure_schema, get_pg_connection
+from backend.app.embed_bulk import bulk_pool_session, embed_texts_bulk, resolve_workers
+from backend.app.db.vector import (
+    bump_generation,
+    delete_feed_rows,
+    drop_old_partitions,
+    ensure_ann_index,
+    ensure_partition_for,
+    ensure_schema,
+    get_pg_connection,
+    insert_documents,
+    partition_name,
+    upsert_hosts,
+)
+from backend.app.db.local_index import drop_old_shards, write_shard
+from backend.app.db.staging import build_stage_indexes, discard_stage, prepare_stage, stage_lock, swap_stage
 from backend.app.db.oracle import fetch_table_rows_by_date
+from backend.app.metrics import EtlRunMetrics
+from backend.app.tracing import start_trace, span
+from backend.app.profiler import maybe_profile
+from etl.anomaly import collect_anomalies
+from etl.checkpoint import load_feed
+from etl.chunking import chunk_rows
+from etl.sources import collect_csv_rows
+
+
+def embed_for_etl(texts: list[str]) -> list[list[float]]:
+    """ETL 임베딩: 텍스트가 많고 EMBEDDING_BULK_WORKERS가 2 이상(또는 자동)이면 멀티 프로세스 대량 모드"""
+    if resolve_workers() > 1 and len(texts) >= settings.EMBEDDING_BULK_MIN_TEXTS:
+        return embed_texts_bulk(texts)
+    return embed_texts(texts)
 
 
 def date_range(days: int):
@@ -53,131 +86,223 @@ def collect_logs(date_str: str, base_dir: str, prefix: str):
     return lines
 
 
-def run_etl():
+# ETL 소스 이름(스케줄 잡/메트릭/documents.feed 단위)
+ETL_SOURCES = ("mock_db", "oracle", "was_log", "db_log", "anomaly")
+
+
+def enabled_collectors() -> dict[str, Callable[[str], list[str]]]:
+    """설정상 활성화된 소스 이름 → 일자별 수집 함수"""
+    collectors: dict[str, Callable[[str], list[str]]] = {}
+    # Oracle/Mock DB 수집
+    if settings.MOCK_DB_ENABLED:
+        collectors["mock_db"] = lambda d: collect_csv_rows(settings.MOCK_DB_DIR, d)
+    elif settings.ORACLE_ENABLED:
+        collectors["oracle"] = collect_oracle_rows
+    # WAS 로그 수집(옵션)
+    if settings.LOG_WAS_ENABLED:
+        collectors["was_log"] = lambda d: collect_logs(d, settings.WAS_LOG_DIR, "middleware")
+    # DB 로그 수집(옵션)
+    if settings.LOG_DB_ENABLED:
+        collectors["db_log"] = lambda d: collect_logs(d, settings.DB_LOG_DIR, "db")
+    # 이상 징후 요약(history/이벤트 CSV 피드 기반이므로 Mock DB 모드에서만)
+    if settings.MOCK_DB_ENABLED and settings.ANOMALY_ENABLED:
+        collectors["anomaly"] = collect_anomalies
+    return collectors
+
+
+def run_etl(
+    sources: Optional[list[str]] = None,
+    days: Optional[int] = None,
+    schema: bool = True,
+    retention: Optional[bool] = None,
+):
     """ETL 실행: 스키마 보장 → 수집 → 임베딩 → 적재
 
-    - MOCK_DB_ENABLED일 경우 파일 기반(history_/event_history_) 텍스트를 로드한다.
+    - sources: 실행할 소스 이름 목록(ETL_SOURCES 중, 기본: 활성화된 전체 소스)
+    - days: 수집 일수(기본: ETL_DAYS). 자주 도는 소스 잡은 1(오늘)만 처리한다.
+    - schema: False면 ensure_schema를 건너뛴다(스케줄러가 기동 시 1회 수행).
+    - retention: 보존 기간 파티션 정리 여부(기본: 전체 소스 실행이고 ETL_RETENTION_ENABLED일 때)
+    - 적재는 (일자, 소스) 단위로 기존 행을 지우고 다시 넣으므로 같은 구간을 반복 실행해도 중복되지 않는다.
+    - ETL_CHECKPOINT_CHUNK > 0이면 청크 단위로 커밋하고, 중단 후 재실행 시 커밋된 청크(내용 동일)는 다시 임베딩하지 않는다.
+    - MOCK_DB_ENABLED일 경우 CSV 피드 레지스트리(etl.sources.CSV_SOURCES)의 일자 파일을 로드한다.
     - VECTORDB_ENABLED가 False이면 로컬 파일에 적재 결과를 저장한다(mock 출력).
+    - 실행 전체를 하나의 트레이스로 묶어 종료 시 구간별 소요 시간을 출력한다.
+    - PROFILE_ENABLED=true면 실행 동안 샘플링 프로파일을 PROFILE_DIR에 저장한다.
+    - 반환: 실행 메트릭(EtlRunMetrics, 소스별 행 수/단계별 소요 시간). 실패해도 그때까지의 메트릭을 실패로 내보낸 뒤 예외를 올린다.
     """
+    unknown = [s for s in sources or [] if s not in ETL_SOURCES]
+    if unknown:
+        raise ValueError(f"unknown ETL source: {', '.join(unknown)} ({', '.join(ETL_SOURCES)})")
+    if retention is None:
+        retention = sources is None and settings.ETL_RETENTION_ENABLED
+    # 대량 임베딩 워커(모델 사본)는 실행 동안만 유지(동시 실행 중인 ETL이 있으면 마지막 실행이 끝날 때 종료)
+    metrics = EtlRunMetrics()
+    with maybe_profile("etl"), start_trace("etl") as trace, bulk_pool_session():
+        try:
+            _run_etl(metrics, sources, days or settings.ETL_DAYS, schema, retention)
+        except Exception:
+            # 실패한 실행도 최근 실행 결과/소요 시간 게이지에 남긴다(내보내기 오류가 원래 예외를 가리지 않도록).
+            try:
+                metrics.export(success=False)
+            except Exception as e:
+                print(f"[ETL] metrics export failed: {e}")
+            raise
+        metrics.export(success=True)
+    breakdown = " ".join(f"{k}={v:.0f}ms" for k, v in trace.breakdown().items())
+    print(f"[ETL] done | total={trace.elapsed_ms():.0f}ms {breakdown}")
+    return metrics
+
+
+def _load_via_stage(d: str, collected: list[tuple[str, list[str]]], metrics: EtlRunMetrics) -> Optional[int]:
+    """섀도 테이블 준비 → 소스별 적재 → 인덱스 → 교체(stage_lock 안에서 호출). 새 세대 번호, 변경이 없으면 None"""
+    with metrics.stage("load"):
+        stage, reused = prepare_stage(d)
+    # 섀도 테이블에도 체크포인트를 남겨 교체 전 중단 시 이어서 적재(ETL_CHECKPOINT_CHUNK=0이면 (일자, 소스)당 1청크)
+    results = [load_feed(d, source, rows, embed_for_etl, metrics, table=stage) for source, rows in collected]
+    loaded = sum(n for n, _ in results)
+    # 이전 실행이 적재를 마치고 교체 전에 중단된 섀도 테이블은 변경이 없어도 교체한다.
+    if not reused and not any(changed for _, changed in results):
+        discard_stage(d)
+        return None
+    with metrics.stage("index"):
+        staged_rows = build_stage_indexes(d)
+    with metrics.stage("swap"):
+        generation = swap_stage(d, staged_rows)
+    print(f"[ETL] {d} | inserted {loaded} rows into {stage}")
+    return generation
+
+
+def _run_etl(metrics: EtlRunMetrics, sources: Optional[list[str]], days: int, schema: bool, retention: bool) -> None:
+    collectors = enabled_collectors()
+    if sources is not None:
+        for name in sources:
+            if name not in collectors:
+                print(f"[ETL] source {name} is disabled by settings, skip")
+        collectors = {k: v for k, v in collectors.items() if k in sources}
     print(
-        f"[ETL] start | ETL_DAYS={settings.ETL_DAYS} MOCK_DB_ENABLED={settings.MOCK_DB_ENABLED} "
+        f"[ETL] start | sources={','.join(collectors) or '-'} days={days} MOCK_DB_ENABLED={settings.MOCK_DB_ENABLED} "
         f"VECTORDB_ENABLED={settings.VECTORDB_ENABLED} MOCK_DB_DIR={settings.MOCK_DB_DIR}"
     )
-    def collect_mock_db_rows(date_str: str) -> list[str]:
-        base = Path(settings.MOCK_DB_DIR)
-        rows: list[str] = []
-        # history CSV (1분 단위)
-        hist_csv = base / f"history_{date_str}.csv"
-        if hist_csv.exists():
-            with hist_csv.open("r", encoding="utf-8", errors="ignore", newline="") as f:
-                reader = csv.DictReader(f)
-                for r in reader:
-                    parts = [
-                        "type=history",
-                        f"ts={r.get('YYYYMMDDHHmmss','')}",
-                        f"Hostname={r.get('Hostname','')}",
-                        f"IP={r.get('IP','')}",
-                        f"CPU_Usage={r.get('CPU_Usage','')}",
-                        f"Memory_Usage={r.get('Memory_Usage','')}",
-                        f"Swap_Usage={r.get('Swap_Usage','')}",
-                        f"Filesystem_Usage={r.get('Filesystem_Usage','')}",
-                        f"Ping_Status={r.get('Ping_Status','')}",
-                    ]
-                    rows.append(" ".join(parts))
-        # event_history CSV (1분 단위)
-        evt_csv = base / f"event_history_{date_str}.csv"
-        if evt_csv.exists():
-            with evt_csv.open("r", encoding="utf-8", errors="ignore", newline="") as f:
-                reader = csv.DictReader(f)
-                for r in reader:
-                    parts = [
-                        "type=event_history",
-                        f"ts={r.get('YYYYMMDDHHmmss','')}",
-                        f"Hostname={r.get('Hostname','')}",
-                        f"IP={r.get('IP','')}",
-                        f"Severity={r.get('Severity','')}",
-                        f"Event_Message={r.get('Event_Message','')}",
-                    ]
-                    rows.append(" ".join(parts))
-        # WAS 이벤트 CSV (1분 단위)
-        was_csv = base / f"was_event_{date_str}.csv"
-        if was_csv.exists():
-            with was_csv.open("r", encoding="utf-8", errors="ignore", newline="") as f:
-                reader = csv.DictReader(f)
-                for r in reader:
-                    parts = [
-                        "type=WAS_Event",
-                        f"ts={r.get('YYYYMMDDHHmmss','')}",
-                        f"Hostname={r.get('Hostname','')}",
-                        f"Event_Message={r.get('Event_Message','')}",
-                    ]
-                    rows.append(" ".join(parts))
-        # DB 이벤트 CSV (1분 단위)
-        db_csv = base / f"db_event_{date_str}.csv"
-        if db_csv.exists():
-            with db_csv.open("r", encoding="utf-8", errors="ignore", newline="") as f:
-                reader = csv.DictReader(f)
-                for r in reader:
-                    parts = [
-                        "type=DB_Event",
-                        f"ts={r.get('YYYYMMDDHHmmss','')}",
-                        f"Hostname={r.get('Hostname','')}",
-                        f"Event_Message={r.get('Event_Message','')}",
-                    ]
-                    rows.append(" ".join(parts))
-        return rows
-
-    if settings.VECTORDB_ENABLED:
+    if settings.VECTORDB_ENABLED and schema:
         print("[ETL] ensuring pgvector schema ...")
-        ensure_schema()
+        with metrics.stage("schema"):
+            ensure_schema()
 
-    for d in date_range(settings.ETL_DAYS):
-        texts = []
-        # Oracle/Mock DB 수집
-        if settings.MOCK_DB_ENABLED:
-            texts += collect_mock_db_rows(d)
-        else:
-            texts += collect_oracle_rows(d)
-        # WAS 로그 수집(옵션)
-        if settings.LOG_WAS_ENABLED:
-            texts += collect_logs(d, settings.WAS_LOG_DIR, "middleware")
-        # DB 로그 수집(옵션)
-        if settings.LOG_DB_ENABLED:
-            texts += collect_logs(d, settings.DB_LOG_DIR, "db")
+    for d in date_range(days):
+        # 소스별 수집 결과(메트릭 집계/feed 단위 재적재를 위해 소스 이름을 함께 보관)
+        collected: list[tuple[str, list[str]]] = []
+        with metrics.stage("collect"):
+            for name, collect in collectors.items():
+                collected.append((name, collect(d)))
+        n_collected = sum(len(rows) for _, rows in collected)
+        for source, rows in collected:
+            metrics.add_rows(source, "collected", len(rows))
+        if settings.ETL_CHUNK_MINUTES > 0:
+            # 1분 단위 행을 (호스트, N분 윈도우) 요약 문서로 묶어 벡터 수를 줄인다(소스별로 청킹)
+            with metrics.stage("chunk"):
+                collected = [
+                    (source, chunk_rows(rows, settings.ETL_CHUNK_MINUTES, settings.ETL_CHUNK_MAX_EVENTS))
+                    for source, rows in collected
+                ]
+            for source, rows in collected:
+                metrics.add_rows(source, "chunked", len(rows))
+        # 빈 소스는 기존 적재분을 유지하기 위해 재적재 대상에서 제외
+        collected = [(source, rows) for source, rows in collected if rows]
+        texts = [t for _, rows in collected for t in rows]
 
         if not texts:
             print(f"[ETL] {d} | no texts found, skip")
             continue
-        print(f"[ETL] {d} | collected {len(texts)} texts")
+        if settings.ETL_CHUNK_MINUTES > 0:
+            print(
+                f"[ETL] {d} | collected {n_collected} rows -> {len(texts)} documents "
+                f"({settings.ETL_CHUNK_MINUTES}m windows)"
+            )
+        else:
+            print(f"[ETL] {d} | collected {len(texts)} texts")
 
-        if settings.VECTORDB_ENABLED:
+        if settings.VECTORDB_ENABLED and settings.ETL_STAGING_LOAD:
+            # 섀도 테이블에 적재(청크 체크포인트 포함) → 인덱스/통계 준비 → 파티션 원자적 교체
+            # 같은 일자를 처리하는 다른 소스 잡과 섀도 테이블을 공유하지 않도록 교체까지 일자별 잠금 유지
+            with stage_lock(d):
+                generation = _load_via_stage(d, collected, metrics)
+            if generation is None:
+                print(f"[ETL] {d} | unchanged, staging table dropped")
+                continue
+            print(f"[ETL] {d} | loaded via staging swap (generation {generation})")
+        elif settings.VECTORDB_ENABLED and settings.ETL_CHECKPOINT_CHUNK > 0:
+            # 소스별 청크 단위 임베딩/커밋: 이미 커밋된 청크는 건너뛴다.
+            loaded = sum(load_feed(d, source, rows, embed_for_etl, metrics)[0] for source, rows in collected)
+            print(f"[ETL] {d} | inserted {loaded} rows ({len(texts) - loaded} unchanged/resumed)")
+        elif settings.VECTORDB_ENABLED:
             # 임베딩 변환
             print(f"[ETL] {d} | embedding {len(texts)} texts ...")
-            vectors = embed_texts(texts)
-            # pgvector는 벡터 문자열 형식('[v1, v2, ...]') 또는 리스트 바인딩을 허용한다.
-            # psycopg2 기본 커서에서는 명시적 캐스팅이 안전하다.
-            with get_pg_connection() as conn:
+            with metrics.stage("embed"):
+                vectors = embed_for_etl(texts)
+            for source, rows in collected:
+                metrics.add_rows(source, "embedded", len(rows))
+            with metrics.stage("load"), span("db.insert", rows=len(texts)), get_pg_connection() as conn:
                 with conn.cursor() as cur:
-                    for text, vec in zip(texts, vectors):
-                        # 벡터를 공백 구분 문자열로 변환하고 vector 캐스팅
-                        vec_str = "[" + ",".join(f"{float(x):.6f}" for x in vec) + "]"
-                        cur.execute(
-                            "INSERT INTO documents (source, content, embedding) VALUES (%s, %s, %s::vector)",
-                            (d, text, vec_str),
-                        )
+                    # 범위 밖 일자(백필 등)도 적재할 수 있도록 해당 일자 파티션 보장
+                    ensure_partition_for(cur, d)
+                    feeds = [source for source, rows in collected for _ in rows]
+                    # (일자, 소스) 단위 delete-then-insert: 같은 트랜잭션이라 검색 측에는 교체가 원자적으로 보인다.
+                    for source, _ in collected:
+                        delete_feed_rows(cur, d, source)
+                    insert_documents(cur, d, feeds, texts, vectors)
+                    for source, _ in collected:
+                        upsert_hosts(cur, d, source)
+                    # 일자 첫 적재면 행 수에 맞는 ANN 인덱스를 새 행과 함께 커밋
+                    ensure_ann_index(cur, partition_name(d))
+                    # 적재 세대 증가: 커밋과 함께 반영되어 API 결과 캐시가 다음 조회에서 무효화된다.
+                    generation = bump_generation(cur)
                 conn.commit()
-            print(f"[ETL] {d} | inserted {len(texts)} rows")
+            for source, rows in collected:
+                metrics.add_rows(source, "loaded", len(rows))
+            print(f"[ETL] {d} | inserted {len(texts)} rows (generation {generation})")
+        elif settings.LOCAL_INDEX_ENABLED:
+            print(f"[ETL] {d} | embedding {len(texts)} texts ...")
+            with metrics.stage("embed"):
+                vectors = embed_for_etl(texts)
+            for source, rows in collected:
+                metrics.add_rows(source, "embedded", len(rows))
+            with metrics.stage("load"):
+                # (일자, 소스) 샤드 단위로 교체: 검색 측은 헤더가 갱신된 샤드만 다시 매핑한다.
+                offset = 0
+                for source, rows in collected:
+                    write_shard(d, source, rows, vectors[offset:offset + len(rows)])
+                    offset += len(rows)
+            for source, rows in collected:
+                metrics.add_rows(source, "loaded", len(rows))
+            print(f"[ETL] {d} | wrote {len(texts)} vectors to {settings.LOCAL_INDEX_DIR}")
         else:
             # 로컬 파일로 적재 결과를 기록 (모의 실행)
             out_dir = Path(settings.MOCK_DB_DIR) / "output"
             out_dir.mkdir(parents=True, exist_ok=True)
-            out_file = out_dir / f"documents_{d}.jsonl"
-            with out_file.open("w", encoding="utf-8") as f:
-                for text in texts:
-                    # 벡터는 길어지므로 저장하지 않고 길이만 기록
-                    rec = {"source": d, "content": text, "embedding_dim": 0}
-                    f.write(str(rec) + "\n")
-            print(f"[ETL] {d} | wrote {len(texts)} rows to {out_file}")
+            with metrics.stage("load"):
+                # (일자, 소스)별 파일을 덮어써 DB 적재와 동일한 재적재 단위를 유지
+                for source, rows in collected:
+                    out_file = out_dir / f"documents_{d}_{source}.jsonl"
+                    with out_file.open("w", encoding="utf-8") as f:
+                        for text in rows:
+                            # 벡터는 길어지므로 저장하지 않고 길이만 기록
+                            rec = {"source": d, "feed": source, "content": text, "embedding_dim": 0}
+                            f.write(str(rec) + "\n")
+            for source, rows in collected:
+                metrics.add_rows(source, "loaded", len(rows))
+            print(f"[ETL] {d} | wrote {len(texts)} rows to {out_dir}")
+
+    if settings.VECTORDB_ENABLED and retention:
+        # 보존 기간이 지난 일자 파티션은 DELETE 대신 DETACH/DROP으로 제거
+        with metrics.stage("retention"):
+            dropped = drop_old_partitions(settings.ETL_DAYS)
+        if dropped:
+            print(f"[ETL] retention | dropped partitions: {', '.join(dropped)}")
+    elif settings.LOCAL_INDEX_ENABLED and retention:
+        with metrics.stage("retention"):
+            dropped = drop_old_shards(settings.ETL_DAYS)
+        if dropped:
+            print(f"[ETL] retention | dropped local index shards: {', '.join(dropped)}")
 
 if __name__ == "__main__":
     run_etl()
@@ -2,20 +2,181 @@
 APScheduler 기반 배치 스케줄러
 - 환경변수로 스케줄 활성화 여부 및 크론식을 제어한다.
 - 비활성화 시 단발 실행(run_etl)로 동작한다.
+- ETL_JOBS로 소스별 잡(크론/인터벌, 수집 일수)을 정의하면 각 잡이 독립 주기로 실행된다.
+  - 스레드 풀(SCHEDULER_WORKERS)에서 실행되어 느린 잡이 빠른 잡을 막지 않는다.
+  - 잡별 max_instances=1 + coalesce: 이전 실행이 끝나지 않았으면 겹쳐 실행하지 않고 밀린 실행은 1회로 합친다.
+  - misfire_grace_time 이내로 늦은 실행만 수행하고, 결과는 실행 장부(ETL_RUN_LEDGER, JSONL)에 기록한다.
+- MAINTENANCE_ENABLED면 MAINTENANCE_CRON에 VectorDB 유지보수 잡(보존 정리/VACUUM/인덱스 재구성)을 실행한다.
 """
 
+import json
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional
+
+from apscheduler.events import EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED
+from apscheduler.executors.pool import ThreadPoolExecutor
 from apscheduler.schedulers.blocking import BlockingScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from backend.app.settings import settings
-from .pipeline import run_etl
+from .pipeline import ETL_SOURCES, run_etl
+
+TIMEZONE = "Asia/Seoul"
+
+
+class RunLedger:
+    """잡 실행 장부(JSONL 추가 기록, 스레드 안전)"""
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+
+    def record(self, **entry) -> None:
+        if self.path is None:
+            return
+        entry = {"ts": datetime.now().isoformat(timespec="seconds"), **entry}
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+def parse_trigger(spec: str):
+    """'cron:<크론식>' 또는 'interval:<초>'를 APScheduler 트리거로 변환"""
+    kind, _, value = spec.strip().partition(":")
+    kind = kind.strip().lower()
+    if kind == "cron":
+        return CronTrigger.from_crontab(value.strip(), timezone=TIMEZONE)
+    if kind == "interval":
+        return IntervalTrigger(seconds=int(value), timezone=TIMEZONE)
+    raise ValueError(f"unsupported trigger: {spec!r} (cron:<expr> | interval:<seconds>)")
+
+
+def parse_jobs(text: str) -> list[dict]:
+    """ETL_JOBS 문자열 파싱
+
+    '<소스,...>|<트리거>[|수집일수]' 항목을 ';'로 구분한다.
+    반환: [{"id", "sources", "trigger", "days"}]
+    """
+    jobs = []
+    for item in text.split(";"):
+        item = item.strip()
+        if not item:
+            continue
+        parts = [p.strip() for p in item.split("|")]
+        if len(parts) not in (2, 3):
+            raise ValueError(f"invalid ETL_JOBS entry: {item!r}")
+        sources = [s.strip() for s in parts[0].split(",") if s.strip()]
+        unknown = [s for s in sources if s not in ETL_SOURCES]
+        if not sources or unknown:
+            raise ValueError(f"invalid sources in ETL_JOBS entry {item!r} ({', '.join(ETL_SOURCES)})")
+        jobs.append(
+            {
+                "id": "+".join(sources),
+                "sources": sources,
+                "trigger": parts[1],
+                "days": int(parts[2]) if len(parts) == 3 and parts[2] else None,
+            }
+        )
+    return jobs
+
+
+def _ledgered(ledger: RunLedger, job_id: str, func: Callable, **kwargs) -> Callable[[], None]:
+    """실행 시간/결과/행 수를 장부에 기록하는 잡 래퍼"""
+
+    def run() -> None:
+        t0 = time.perf_counter()
+        started = datetime.now().isoformat(timespec="seconds")
+        try:
+            result = func(**kwargs)
+        except Exception as e:
+            ledger.record(
+                job=job_id, status="error", started_at=started,
+                duration_s=round(time.perf_counter() - t0, 3), error=f"{type(e).__name__}: {e}",
+            )
+            raise
+        rows = {}
+        for (source, phase), count in getattr(result, "rows", {}).items():
+            if phase == "loaded":
+                rows[source] = count
+        ledger.record(
+            job=job_id, status="ok", started_at=started,
+            duration_s=round(time.perf_counter() - t0, 3), loaded=rows,
+        )
+
+    return run
+
+
+def _maintenance_job() -> dict:
+    from backend.app.db.maintenance import print_report, run_maintenance
+
+    report = run_maintenance()
+    print_report(report)
+    return report
+
+
+def build_scheduler(ledger: Optional[RunLedger] = None) -> BlockingScheduler:
+    """설정에 따라 잡이 등록된 스케줄러 생성(시작은 호출 측에서)"""
+    ledger = ledger or RunLedger(settings.ETL_RUN_LEDGER)
+    sched = BlockingScheduler(
+        timezone=TIMEZONE,
+        executors={"default": ThreadPoolExecutor(max_workers=settings.SCHEDULER_WORKERS)},
+        job_defaults={
+            "max_instances": 1,
+            "coalesce": True,
+            "misfire_grace_time": settings.SCHEDULER_MISFIRE_GRACE_SECONDS,
+        },
+    )
+
+    def on_skipped(event) -> None:
+        # MAX_INSTANCES는 제출 이벤트(scheduled_run_times), MISSED는 실행 이벤트(scheduled_run_time)
+        if event.code == EVENT_JOB_MAX_INSTANCES:
+            status, scheduled = "skipped_overlap", event.scheduled_run_times[-1]
+        else:
+            status, scheduled = "missed", event.scheduled_run_time
+        ledger.record(job=event.job_id, status=status, scheduled_at=scheduled)
+        print(f"[SCHED] {event.job_id} {status} (scheduled {scheduled})")
+
+    sched.add_listener(on_skipped, EVENT_JOB_MISSED | EVENT_JOB_MAX_INSTANCES)
+
+    if settings.VECTORDB_ENABLED and settings.MAINTENANCE_ENABLED:
+        sched.add_job(
+            _ledgered(ledger, "maintenance", _maintenance_job),
+            CronTrigger.from_crontab(settings.MAINTENANCE_CRON, timezone=TIMEZONE),
+            id="maintenance", name="maintenance",
+        )
+
+    jobs = parse_jobs(settings.ETL_JOBS)
+    if not jobs:
+        # 기존 동작: 전체 소스 단일 잡(스키마 보장/보존 정리 포함)
+        sched.add_job(
+            _ledgered(ledger, "etl", run_etl), CronTrigger.from_crontab(settings.SCHEDULER_CRON, timezone=TIMEZONE),
+            id="etl", name="etl",
+        )
+        return sched
+
+    for job in jobs:
+        # 스키마는 기동 시 1회만 보장하고, 보존 정리는 유지보수 잡에서 수행
+        func = _ledgered(
+            ledger, job["id"], run_etl, sources=job["sources"], days=job["days"], schema=False, retention=False
+        )
+        sched.add_job(func, parse_trigger(job["trigger"]), id=job["id"], name=job["id"])
+        print(f"[SCHED] job {job['id']} | trigger={job['trigger']} days={job['days'] or settings.ETL_DAYS}")
+    return sched
 
 
 def main():
     """스케줄러 엔트리포인트"""
-    sched = BlockingScheduler(timezone="Asia/Seoul")
     if settings.SCHEDULER_ENABLED:
-        sched.add_job(run_etl, CronTrigger.from_crontab(settings.SCHEDULER_CRON))
-        sched.start()
+        if settings.ETL_JOBS and settings.VECTORDB_ENABLED:
+            from backend.app.db.vector import ensure_schema
+
+            ensure_schema()
+        build_scheduler().start()
     else:
         # 스케줄 비활성화 시 단일 실행
         run_etl()
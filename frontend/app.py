@@ -7,9 +7,12 @@ Streamlit 프론트엔드
 import streamlit as st
 import requests
 import os
-import json
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from history_store import HistoryStore
 
 # API 서버 위치는 환경변수로 제어
 API_HOST = os.getenv("API_HOST", "127.0.0.1")
@@ -18,65 +21,50 @@ API_BASE = f"http://{API_HOST}:{API_PORT}"
 
 st.set_page_config(page_title="MonChat", layout="wide")
 
-# 채팅 이력 파일 경로 (사용자 홈 디렉토리)
+# 채팅 이력 저장 경로 (사용자 홈 디렉토리)
 HISTORY_DIR = Path.home() / ".monchat"
-HISTORY_FILE = HISTORY_DIR / "chat_history.jsonl"
+HISTORY_FILE = HISTORY_DIR / "chat_history.jsonl"  # 구 버전 jsonl 이력(최초 1회 SQLite로 이관)
+HISTORY_DB = HISTORY_DIR / "chat_history.sqlite"
+HISTORY_EXPORT = HISTORY_DIR / "chat_history_export.jsonl"
+TIMELINE_PAGE_SIZES = [20, 50, 100]
 
 
-def _ensure_history_dir():
-    """이력 저장 디렉토리 생성 보장"""
+@st.cache_resource
+def get_persistent_store() -> HistoryStore:
+    """영구 이력 저장소(프로세스당 1회 생성, 구 jsonl 이력 자동 이관)"""
+    store = HistoryStore(HISTORY_DB)
     try:
-        HISTORY_DIR.mkdir(parents=True, exist_ok=True)
+        store.migrate_from_jsonl(HISTORY_FILE)
     except Exception:
+        # 이관 실패는 앱 동작에 영향 주지 않도록 무시
         pass
+    return store
 
 
-def load_history() -> list:
-    """jsonl 형식 이력을 모두 로드"""
-    if not HISTORY_FILE.exists():
-        return []
-    records = []
-    try:
-        with HISTORY_FILE.open("r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    records.append(json.loads(line))
-                except Exception:
-                    # 손상된 라인은 건너뜀
-                    continue
-    except Exception:
-        return []
-    return records
+def get_history_store() -> HistoryStore:
+    """현재 사용할 이력 저장소: 영구 저장 ON이면 파일, OFF면 세션 한정(메모리)"""
+    if st.session_state.persist_history:
+        return get_persistent_store()
+    if "session_store" not in st.session_state:
+        st.session_state.session_store = HistoryStore(":memory:")
+    return st.session_state.session_store
 
 
 def append_history(record: dict) -> None:
-    """이력 레코드를 jsonl로 추가 저장"""
+    """이력 레코드 저장"""
     try:
-        _ensure_history_dir()
-        with HISTORY_FILE.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        get_history_store().append(record)
     except Exception:
         # 저장 실패는 앱 동작에 영향 주지 않도록 무시
         pass
 
-
-def clear_history_files() -> None:
-    try:
-        if HISTORY_FILE.exists():
-            HISTORY_FILE.unlink(missing_ok=True)
-    except Exception:
-        pass
-
 st.title("MonChat - 성능/오류 데이터 Q&A")
 
-# 세션 상태 초기화
-if "chat_history" not in st.session_state:
-    st.session_state.chat_history = load_history()
+# 세션 상태 초기화 (이력 본문은 세션에 적재하지 않고 저장소에서 페이지 단위로 조회)
 if "persist_history" not in st.session_state:
     st.session_state.persist_history = True
+if "timeline_page" not in st.session_state:
+    st.session_state.timeline_page = 1
 
 # 탭 구성: Q&A / 시각화 / 상태 / 이력 / LLM 대화
 tabs = st.tabs(["Q&A", "시각화", "상태", "이력", "LLM 대화"])
@@ -88,21 +76,32 @@ with st.sidebar:
         "이력 영구 저장", value=st.session_state.persist_history, help="홈 디렉토리(.monchat)에 저장"
     )
 
-    # 다운로드 버튼 (현재 메모리 상의 이력을 jsonl 텍스트로 변환)
-    if st.session_state.chat_history:
-        jsonl_text = "\n".join(
-            [json.dumps(r, ensure_ascii=False) for r in st.session_state.chat_history]
-        )
-        st.download_button(
-            label="이력 다운로드 (jsonl)",
-            data=jsonl_text,
-            file_name="chat_history.jsonl",
-            mime="application/json",
-        )
+    # 다운로드: 버튼을 누를 때만 저장소를 파일로 스트리밍 내보내기(매 rerun마다 문자열 재생성 방지)
+    store = get_history_store()
+    if store.count() > 0:
+        if st.button("이력 내보내기 준비 (jsonl)"):
+            export_path = HISTORY_EXPORT if st.session_state.persist_history else (
+                HISTORY_DIR / f"session_export_{id(store)}.jsonl"
+            )
+            st.session_state.history_export_path = str(store.export_jsonl(export_path))
+        export_path = st.session_state.get("history_export_path")
+        if export_path and Path(export_path).exists():
+            with open(export_path, "rb") as export_file:
+                st.download_button(
+                    label="이력 다운로드 (jsonl)",
+                    data=export_file,
+                    file_name="chat_history.jsonl",
+                    mime="application/json",
+                )
 
     if st.button("이력 초기화"):
-        st.session_state.chat_history = []
-        clear_history_files()
+        store.clear()
+        st.session_state.timeline_page = 1
+        st.session_state.pop("history_export_path", None)
+        try:
+            HISTORY_EXPORT.unlink(missing_ok=True)
+        except Exception:
+            pass
         st.success("이력을 초기화했습니다.")
 
 with tabs[0]:
@@ -112,13 +111,32 @@ with tabs[0]:
     if st.button("검색") and q:
         try:
             # 백엔드 /qa 엔드포인트 호출
-            res = requests.post(f"{API_BASE}/qa", json={"question": q, "top_k": top_k}, timeout=60)
+            # X-Request-Timeout: 서버가 이 기한을 넘길 요청은 대기열에서 빨리 거절(503)하도록 전달
+            res = requests.post(
+                f"{API_BASE}/qa",
+                json={"question": q, "top_k": top_k},
+                headers={"X-Request-Timeout": "60"},
+                timeout=60,
+            )
+            if res.status_code in (429, 503):
+                raise RuntimeError(f"요청이 많아 처리하지 못했습니다. {res.headers.get('Retry-After', '잠시')}초 후 다시 시도하세요.")
             res.raise_for_status()
             data = res.json()
             # 화면 출력 (점수/근거 포함 테이블)
             st.markdown("**질문**")
             st.write(data.get("question"))
             answers = data.get("answers", [])
+            # 질문에서 추출되어 검색에 적용된 제약(일자 범위/호스트)
+            constraints = data.get("constraints") or {}
+            if constraints:
+                scope = []
+                if constraints.get("date_from") or constraints.get("date_to"):
+                    scope.append(f"기간 {constraints.get('date_from', '')}~{constraints.get('date_to', '')}")
+                if constraints.get("hosts"):
+                    scope.append("호스트 " + ", ".join(constraints["hosts"]))
+                st.caption("검색 범위: " + " / ".join(scope) + f" (질문의 '{', '.join(constraints.get('matched', []))}' 해석)")
+            # LLM 탭에서 컨텍스트로 재사용
+            st.session_state["last_answers"] = answers
             if answers:
                 st.markdown("**결과 (상위 TopK)**")
                 for i, a in enumerate(answers, start=1):
@@ -138,17 +156,67 @@ with tabs[0]:
                 "answers": answers,
                 "top_k": top_k,
             }
-            st.session_state.chat_history.append(record)
-            if st.session_state.persist_history:
-                append_history(record)
+            append_history(record)
         except Exception as e:
             st.error(str(e))
 
     # (이전 이력 표시는 '이력' 탭으로 이동)
 
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_hosts(start: str, end: str) -> list:
+    res = requests.get(f"{API_BASE}/series/hosts", params={"start": start, "end": end}, timeout=30)
+    res.raise_for_status()
+    return res.json().get("hosts", [])
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_series(metric: str, hosts: tuple, start: str, end: str, width: int, method: str) -> dict:
+    """서버에서 화면 폭에 맞게 다운샘플된 시계열 조회"""
+    res = requests.get(
+        f"{API_BASE}/series/history",
+        params={"metric": metric, "hosts": ",".join(hosts), "start": start, "end": end, "width": width, "method": method},
+        timeout=60,
+    )
+    res.raise_for_status()
+    return res.json()
+
+
 with tabs[1]:
-    st.subheader("시각화 (예시 자리)")
-    st.info("백엔드에 지표 API 추가 후 연동 예정")
+    st.subheader("성능 지표 추이")
+    col_d1, col_d2, col_m = st.columns(3)
+    with col_d1:
+        d_from = st.date_input("시작일", value=datetime.now().date() - timedelta(days=6))
+    with col_d2:
+        d_to = st.date_input("종료일", value=datetime.now().date())
+    with col_m:
+        metric = st.selectbox("지표", ["CPU_Usage", "Memory_Usage", "Swap_Usage", "Filesystem_Usage"])
+    start_s, end_s = d_from.strftime("%Y%m%d") + "000000", d_to.strftime("%Y%m%d") + "235959"
+    try:
+        host_options = fetch_hosts(start_s, end_s)
+    except Exception as e:
+        host_options = []
+        st.error(str(e))
+    sel_hosts = st.multiselect("호스트", host_options, default=host_options[:5])
+    col_w, col_a = st.columns(2)
+    with col_w:
+        width = st.select_slider("해상도(점 수)", options=[200, 400, 800, 1600, 3200], value=800)
+    with col_a:
+        method = st.radio("다운샘플링", ["lttb", "minmax"], horizontal=True)
+    if sel_hosts:
+        try:
+            data = fetch_series(metric, tuple(sel_hosts), start_s, end_s, width, method)
+            frames = []
+            for host, s in data.get("series", {}).items():
+                idx = pd.to_datetime(s["t"], unit="s")
+                frames.append(pd.Series(s["v"], index=idx, name=host))
+            if frames:
+                chart_df = pd.concat(frames, axis=1).sort_index()
+                st.line_chart(chart_df)
+                st.caption(f"원본 {data.get('raw_points', 0):,}점 → 표시 {data.get('points', 0):,}점 ({method})")
+            else:
+                st.info("선택한 기간에 데이터가 없습니다.")
+        except Exception as e:
+            st.error(str(e))
 
 with tabs[2]:
     st.subheader("상태 체크")
@@ -197,26 +265,39 @@ with tabs[2]:
 with tabs[3]:
     st.subheader("TimeLine")
     st.caption("[TimeLine] 질문 :  / 답변 :  형식으로 표시합니다.")
-    if not st.session_state.chat_history:
+    store = get_history_store()
+    type_filter = st.radio("유형", ["전체", "Q&A", "LLM"], horizontal=True)
+    rec_type = {"전체": None, "Q&A": "qa", "LLM": "llm"}[type_filter]
+    total = store.count(rec_type)
+    if total == 0:
         st.info("표시할 이력이 없습니다. 질문을 입력해 보세요.")
     else:
-        # 최신 순으로 표시
-        for rec in reversed(st.session_state.chat_history):
-            ts = rec.get("ts", "")
-            qtext = rec.get("question", "")
-            answers = rec.get("answers", [])
-            if isinstance(answers, list):
-                # 답변 리스트를 '; '로 이어 붙여 간결히 표기
-                answer_text = "; ".join([str(a) for a in answers]) if answers else "(없음)"
-            else:
-                answer_text = str(answers) if answers else "(없음)"
-            st.markdown(f"- [{ts}] 질문 : {qtext} / 답변 : {answer_text}")
+        col_size, col_page = st.columns(2)
+        with col_size:
+            page_size = st.selectbox("페이지 크기", TIMELINE_PAGE_SIZES, index=0)
+        pages = max(1, (total + page_size - 1) // page_size)
+        with col_page:
+            page = st.number_input(
+                f"페이지 (총 {pages})", min_value=1, max_value=pages,
+                value=min(st.session_state.timeline_page, pages), step=1,
+            )
+        st.session_state.timeline_page = int(page)
+        # 최신 순으로 현재 페이지만 조회/렌더링
+        for rec in store.page((int(page) - 1) * page_size, page_size, rec_type):
+            st.markdown(f"- [{rec['ts']}] 질문 : {rec['question']} / 답변 : {rec['summary']}")
+        st.caption(f"{total}건 중 {(int(page) - 1) * page_size + 1}–{min(total, int(page) * page_size)}")
 
 with tabs[4]:
     st.subheader("LLM 대화 (사내 GPU 서버)")
     st.caption("사내 Ollama 기반 LLM API를 통해 텍스트 생성/요약/질의응답을 수행합니다.")
     prompt = st.text_area("프롬프트를 입력하세요", height=150, placeholder="요약/생성/질문 등 자유롭게 입력...")
     model = st.selectbox("모델 선택", ["qwen3:8b", "gemma3:27b-it-q4_0"], index=0)
+    last_answers = st.session_state.get("last_answers") or []
+    use_context = st.checkbox(
+        f"최근 Q&A 검색 결과를 컨텍스트로 포함 ({len(last_answers)}건, 중복 행 압축)",
+        value=False,
+        disabled=not last_answers,
+    )
     col_a, col_b = st.columns([1, 3])
     with col_a:
         run = st.button("생성")
@@ -224,7 +305,13 @@ with tabs[4]:
         try:
             res = requests.post(
                 f"{API_BASE}/llm/chat",
-                json={"prompt": prompt, "model": model, "stream": False},
+                json={
+                    "prompt": prompt,
+                    "model": model,
+                    "stream": False,
+                    "context": last_answers if use_context else None,
+                },
+                headers={"X-Request-Timeout": "120"},
                 timeout=120,
             )
             if res.status_code == 400:
@@ -233,12 +320,20 @@ with tabs[4]:
                 except Exception:
                     detail = "LLM 사용이 비활성화되었습니다. (LLM_ENABLED=false)"
                 st.error(detail)
+            elif res.status_code in (429, 503):
+                st.warning(f"LLM 요청이 많아 처리하지 못했습니다. {res.headers.get('Retry-After', '잠시')}초 후 다시 시도하세요.")
             else:
                 res.raise_for_status()
                 data = res.json()
                 text = data.get("text", "")
                 st.markdown("**응답**")
                 st.write(text or "(빈 응답)")
+                stats = data.get("context_stats")
+                if stats:
+                    st.caption(
+                        f"컨텍스트 {stats.get('rows_in', 0)}행 → {stats.get('lines_out', stats.get('rows_in', 0))}줄, "
+                        f"추정 토큰 {stats.get('tokens_before', 0)} → {stats.get('tokens_after', 0)}"
+                    )
 
                 # 이력 저장 (타임라인 호환을 위해 answers에 텍스트를 넣어둠)
                 record = {
@@ -250,8 +345,6 @@ with tabs[4]:
                     "raw": data,
                     "answers": [text] if text else [],
                 }
-                st.session_state.chat_history.append(record)
-                if st.session_state.persist_history:
-                    append_history(record)
+                append_history(record)
         except Exception as e:
             st.error(str(e))
@@ -0,0 +1,181 @@
+"""
+채팅 이력 저장소 (SQLite)
+- 이력을 ~/.monchat/chat_history.sqlite 에 저장하고 ts/type 인덱스로 페이지 단위 조회한다.
+- 타임라인 표시용 요약(summary)은 저장 시점에 1회만 계산한다(렌더링마다 str(answers) 변환 방지).
+- 기존 chat_history.jsonl이 있으면 최초 1회 가져온 뒤 .migrated로 이름을 바꾼다.
+- 내보내기는 커서를 순회하며 파일로 스트리밍한다(전체 이력을 메모리 문자열로 만들지 않음).
+"""
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+
+SUMMARY_MAX_CHARS = 500
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ts TEXT NOT NULL,
+        type TEXT NOT NULL DEFAULT 'qa',
+        question TEXT,
+        summary TEXT,
+        record TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_history_ts ON history (ts)",
+    "CREATE INDEX IF NOT EXISTS idx_history_type_ts ON history (type, ts)",
+]
+
+
+def _summarize(record: dict) -> str:
+    """타임라인 한 줄 표시용 답변 요약"""
+    answers = record.get("answers", [])
+    if isinstance(answers, list):
+        parts = []
+        for a in answers:
+            if isinstance(a, dict):
+                parts.append(str(a.get("content", a)))
+            else:
+                parts.append(str(a))
+        text = "; ".join(parts) if parts else "(없음)"
+    else:
+        text = str(answers) if answers else "(없음)"
+    if len(text) > SUMMARY_MAX_CHARS:
+        text = text[:SUMMARY_MAX_CHARS] + " …"
+    return text
+
+
+class HistoryStore:
+    """SQLite 기반 채팅 이력 저장소 (path=':memory:'이면 세션 한정 저장)"""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        # Streamlit은 rerun마다 다른 스레드에서 스크립트를 실행할 수 있으므로 잠금으로 보호
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            for stmt in _SCHEMA:
+                self._conn.execute(stmt)
+            self._conn.commit()
+
+    def append(self, record: dict) -> None:
+        rec_type = record.get("type") or "qa"
+        question = record.get("question") or record.get("prompt") or ""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO history (ts, type, question, summary, record) VALUES (?, ?, ?, ?, ?)",
+                (
+                    record.get("ts", ""),
+                    rec_type,
+                    question,
+                    _summarize(record),
+                    json.dumps(record, ensure_ascii=False),
+                ),
+            )
+            self._conn.commit()
+
+    def count(self, rec_type: Optional[str] = None) -> int:
+        with self._lock:
+            if rec_type:
+                row = self._conn.execute("SELECT COUNT(*) FROM history WHERE type = ?", (rec_type,)).fetchone()
+            else:
+                row = self._conn.execute("SELECT COUNT(*) FROM history").fetchone()
+        return int(row[0])
+
+    def page(self, offset: int, limit: int, rec_type: Optional[str] = None) -> list[dict]:
+        """최신순 페이지 조회: ts/question/summary만 반환(원본 record는 필요 시 get()으로 조회)"""
+        sql = "SELECT id, ts, type, question, summary FROM history"
+        params: list = []
+        if rec_type:
+            sql += " WHERE type = ?"
+            params.append(rec_type)
+        sql += " ORDER BY ts DESC, id DESC LIMIT ? OFFSET ?"
+        params += [limit, offset]
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [dict(r) for r in rows]
+
+    def get(self, rec_id: int) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT record FROM history WHERE id = ?", (rec_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def iter_jsonl(self, batch_size: int = 1000) -> Iterator[str]:
+        """저장 순서대로 JSONL 라인을 배치 단위로 순회"""
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, record FROM history WHERE id > ? ORDER BY id LIMIT ?", (last_id, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for r in rows:
+                yield r["record"] + "\n"
+            last_id = rows[-1]["id"]
+
+    def export_jsonl(self, out_path: Union[str, Path]) -> Path:
+        """JSONL 파일로 스트리밍 내보내기"""
+        out = Path(out_path)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        with out.open("w", encoding="utf-8") as f:
+            for line in self.iter_jsonl():
+                f.write(line)
+        return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM history")
+            self._conn.commit()
+            self._conn.execute("VACUUM")
+
+    def import_jsonl(self, jsonl_path: Union[str, Path]) -> int:
+        """기존 jsonl 이력 가져오기(손상된 라인은 건너뜀). 가져온 건수 반환"""
+        path = Path(jsonl_path)
+        if not path.exists():
+            return 0
+        rows = []
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except Exception:
+                    continue
+                rows.append(
+                    (
+                        record.get("ts", ""),
+                        record.get("type") or "qa",
+                        record.get("question") or record.get("prompt") or "",
+                        _summarize(record),
+                        json.dumps(record, ensure_ascii=False),
+                    )
+                )
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO history (ts, type, question, summary, record) VALUES (?, ?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def migrate_from_jsonl(self, jsonl_path: Union[str, Path]) -> int:
+        """jsonl 이력이 남아 있으면 1회 가져오고 파일명을 .migrated로 변경"""
+        path = Path(jsonl_path)
+        if not path.exists():
+            return 0
+        imported = self.import_jsonl(path)
+        try:
+            path.rename(path.with_suffix(path.suffix + ".migrated"))
+        except Exception:
+            pass
+        return imported
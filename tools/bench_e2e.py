@@ -0,0 +1,374 @@
+r"""
+End-to-end 벤치마크 하네스
+
+1) ETL: 지정 데이터 디렉터리(예: gen_synthetic_data.py 출력)로 run_etl을 실행하고 단계별 rows/sec 측정
+2) API: 실행 중인 API 서버의 `/qa`, `/llm/chat`에 동시 부하를 걸어 p50/p95/p99 지연시간/처리량 측정
+   - 질문 목록은 --questions(jsonl)에서 읽는다. 각 줄의 question | prompt | title | body 필드를 사용
+     (예: 작업 요청 로그 requests.jsonl 재생)
+   - --stub-llm 지정 시 로컬 LLM 대역 서버를 띄운다(API 서버의 LLM_BASE_URL을 해당 주소로 지정해야 함)
+3) context: 검색 결과 행을 LLM 프롬프트에 그대로 붙인 경우와 압축(backend.app.context)한 경우의
+   추정 토큰 수와 생성 시간 비교
+   - --api-base 지정 시 실제 /qa 결과, 아니면 --data-dir CSV에서 인접 행 top_k개를 뽑아 검색 결과를 모사
+   - --llm-url 미지정 시 프롬프트 길이 비례 지연(--stub-per-char-ms)의 LLM 대역 서버로 측정
+4) llm-pool: 모델 교체 시 콜드 로딩을 모사하는 LLM 대역 서버 N개로 두 모델 혼합 요청을 보내
+   단일 호스트(첫 서버) 대비 백엔드 풀(backend.app.llm_pool: 모델 친화도 + 최소 진행 요청 + preload)의 지연/콜드 로딩 횟수 비교
+
+사용 예시:
+    python tools/gen_synthetic_data.py --hosts 300 --days 7 --out-dir bench_data
+    python tools/bench_e2e.py etl --data-dir bench_data --days 7
+    python tools/bench_e2e.py api --api-base http://127.0.0.1:5443 --concurrency 32 --requests 500 \
+        --questions requests.jsonl --stub-llm 11500
+    python tools/bench_e2e.py context --data-dir mock_data --top-k 50 --samples 20
+    python tools/bench_e2e.py context --api-base http://127.0.0.1:5443 --llm-url http://pgaiap09:11434 --top-k 20
+    python tools/bench_e2e.py llm-pool --backends 2 --load-ms 3000 --concurrency 8 --requests 200
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+# 같은 디렉터리의 도구 스크립트(stub_llm_server, bench_vector_storage) 임포트용
+_TOOLS_DIR = str(Path(__file__).resolve().parent)
+if _TOOLS_DIR not in sys.path:
+    sys.path.insert(0, _TOOLS_DIR)
+from bench_vector_storage import percentile
+
+
+DEFAULT_QUESTIONS = [
+    "어제 CPU 사용률이 가장 높았던 호스트는?",
+    "Ping LOSS가 발생한 서버 목록",
+    "ORA-01555 snapshot too old 발생 이력",
+    "WAS thread pool exhausted 이벤트가 많은 호스트",
+    "Disk usage high on /data 경고가 발생한 시간대",
+]
+
+
+def _load_questions(path: str) -> list[str]:
+    if not path:
+        return list(DEFAULT_QUESTIONS)
+    out: list[str] = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+            except Exception:
+                out.append(line)
+                continue
+            for key in ("question", "prompt", "title", "body"):
+                if isinstance(rec.get(key), str) and rec[key].strip():
+                    out.append(rec[key].strip())
+                    break
+    return out or list(DEFAULT_QUESTIONS)
+
+
+def bench_etl(args) -> None:
+    """run_etl 단계별 처리량 측정"""
+    project_root = Path(__file__).resolve().parents[1]
+    if str(project_root) not in sys.path:
+        sys.path.insert(0, str(project_root))
+    # settings는 임포트 시점에 환경변수를 읽으므로 임포트 전에 지정
+    os.environ["MOCK_DB_ENABLED"] = "true"
+    os.environ["MOCK_DB_DIR"] = args.data_dir
+    os.environ["ETL_DAYS"] = str(args.days)
+    if args.vectordb:
+        os.environ["VECTORDB_ENABLED"] = "true"
+    if args.log_dir:
+        os.environ["LOG_WAS_ENABLED"] = "true"
+        os.environ["LOG_DB_ENABLED"] = "true"
+        os.environ["WAS_LOG_DIR"] = str(Path(args.log_dir) / "was")
+        os.environ["DB_LOG_DIR"] = str(Path(args.log_dir) / "db")
+    from etl.pipeline import run_etl
+
+    t0 = time.perf_counter()
+    metrics = run_etl()
+    wall = time.perf_counter() - t0
+
+    phase_for_stage = {"collect": "collected", "embed": "embedded", "load": "loaded"}
+    print(f"\n[BENCH-ETL] wall={wall:.2f}s")
+    print(f"{'stage':<12}{'rows':>12}{'seconds':>12}{'rows/sec':>14}")
+    for stage, seconds in metrics.stages.items():
+        phase = phase_for_stage.get(stage)
+        rows = sum(n for (_, p), n in metrics.rows.items() if p == phase) if phase else 0
+        rate = rows / seconds if seconds > 0 and rows else 0.0
+        print(f"{stage:<12}{rows:>12}{seconds:>12.2f}{rate:>14.1f}")
+    print("\nper source:")
+    for (source, phase), n in sorted(metrics.rows.items()):
+        print(f"  {source:<10} {phase:<10} {n}")
+
+
+def _run_load(name: str, func, payloads: list, concurrency: int, extra=None) -> None:
+    latencies: list[float] = []
+    errors = 0
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(func, p) for p in payloads]
+        for fut in as_completed(futures):
+            ok, ms = fut.result()
+            if ok:
+                latencies.append(ms)
+            else:
+                errors += 1
+    wall = time.perf_counter() - t0
+    total = len(payloads)
+    print(
+        f"{name:<10}{total:>8}{errors:>8}{total / wall if wall else 0:>10.1f}"
+        f"{statistics.median(latencies) if latencies else 0:>10.1f}"
+        f"{percentile(latencies, 95):>10.1f}{percentile(latencies, 99):>10.1f}"
+        + (f"{extra():>8}" if extra is not None else "")
+    )
+
+
+def bench_api(args) -> None:
+    """/qa, /llm/chat 동시 부하 측정"""
+    import requests
+
+    stub = None
+    if args.stub_llm:
+        from stub_llm_server import start_stub_server
+
+        stub = start_stub_server(port=args.stub_llm, latency_ms=args.stub_latency_ms)
+        print(f"[BENCH-API] stub LLM on http://127.0.0.1:{stub.server_address[1]} (set API LLM_BASE_URL to this)")
+
+    questions = _load_questions(args.questions)
+    payloads = [questions[i % len(questions)] for i in range(args.requests)]
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=args.concurrency, pool_maxsize=args.concurrency)
+    session.mount("http://", adapter)
+
+    def call_qa(q: str, path: str = "/qa"):
+        t0 = time.perf_counter()
+        try:
+            r = session.post(f"{args.api_base}{path}", json={"question": q, "top_k": args.top_k}, timeout=args.timeout)
+            ok = r.ok
+        except Exception:
+            ok = False
+        return ok, (time.perf_counter() - t0) * 1000.0
+
+    def call_llm(q: str):
+        t0 = time.perf_counter()
+        try:
+            r = session.post(
+                f"{args.api_base}/llm/chat", json={"prompt": q, "model": args.model, "stream": False}, timeout=args.timeout
+            )
+            ok = r.ok
+        except Exception:
+            ok = False
+        return ok, (time.perf_counter() - t0) * 1000.0
+
+    print(f"[BENCH-API] base={args.api_base} concurrency={args.concurrency} requests={args.requests}")
+    print(f"{'endpoint':<10}{'total':>8}{'errors':>8}{'rps':>10}{'p50_ms':>10}{'p95_ms':>10}{'p99_ms':>10}")
+    targets = args.endpoints.split(",")
+    if "qa" in targets:
+        _run_load("/qa", call_qa, payloads, args.concurrency)
+    if "qa_async" in targets:
+        _run_load("/qa/async", lambda q: call_qa(q, "/qa/async"), payloads, args.concurrency)
+    if "llm" in targets:
+        _run_load("/llm/chat", call_llm, payloads, args.concurrency)
+    if stub is not None:
+        stub.shutdown()
+
+
+def _sample_contexts(args, questions: list[str]) -> list[list[str]]:
+    """질문별 검색 결과 행(content) 목록"""
+    if args.api_base:
+        import requests
+
+        out = []
+        for q in questions[: args.samples]:
+            r = requests.post(f"{args.api_base}/qa", json={"question": q, "top_k": args.top_k}, timeout=args.timeout)
+            r.raise_for_status()
+            out.append([str(a.get("content") or "") for a in r.json().get("answers", [])])
+        return out
+
+    import random
+
+    from etl.sources import CSV_SOURCES, read_source
+
+    day = args.date or max(
+        (p.stem.rsplit("_", 1)[-1] for p in Path(args.data_dir).glob("history_*.csv")), default=""
+    )
+    feeds = [rows for rows in (read_source(s, args.data_dir, day) for s in CSV_SOURCES) if rows]
+    if not feeds:
+        raise SystemExit(f"[BENCH-CONTEXT] no CSV rows in {args.data_dir} for {day or '(no date)'}")
+    # 벡터 검색 상위 결과는 같은 피드의 인접 시각/유사 행이 대부분이므로 인접 구간에서 top_k개를 뽑는다.
+    rng = random.Random(0)
+    out = []
+    for _ in range(args.samples):
+        rows = rng.choice(feeds)
+        start = rng.randrange(max(1, len(rows) - args.top_k * 4))
+        window = rows[start:start + args.top_k * 4]
+        out.append(rng.sample(window, min(args.top_k, len(window))))
+    return out
+
+
+def bench_context(args) -> None:
+    """검색 결과 컨텍스트 압축 전후 프롬프트 토큰/생성 시간 비교"""
+    project_root = Path(__file__).resolve().parents[1]
+    if str(project_root) not in sys.path:
+        sys.path.insert(0, str(project_root))
+    from backend.app.context import build_prompt, compact_rows, estimate_tokens
+    from backend.app.llm import LLMClient
+    from backend.app.settings import settings
+
+    stub = None
+    llm_url = args.llm_url
+    if not llm_url:
+        from stub_llm_server import start_stub_server
+
+        stub = start_stub_server(latency_ms=args.stub_latency_ms, per_char_ms=args.stub_per_char_ms)
+        llm_url = f"http://127.0.0.1:{stub.server_address[1]}"
+    settings.LLM_ENABLED = True
+    client = LLMClient(base_url=llm_url, timeout=int(args.timeout), stream=False)
+
+    questions = _load_questions(args.questions)
+    contexts = _sample_contexts(args, questions)
+    print(f"[BENCH-CONTEXT] samples={len(contexts)} top_k={args.top_k} budget={args.budget} llm={llm_url}")
+    totals = {"raw": [0, 0, []], "compact": [0, 0, []]}
+    for i, rows in enumerate(contexts):
+        question = questions[i % len(questions)]
+        result = compact_rows(rows, args.budget)
+        variants = {"raw": build_prompt(question, "\n".join(rows)), "compact": build_prompt(question, result.text)}
+        for name, prompt in variants.items():
+            t0 = time.perf_counter()
+            resp = client.chat(prompt=prompt, model=args.model, stream=False)
+            ms = (time.perf_counter() - t0) * 1000.0
+            total = totals[name]
+            total[0] += estimate_tokens(prompt)
+            # 업스트림(Ollama)이 돌려준 실제 프롬프트 토큰 수(없으면 0)
+            total[1] += int(resp.get("prompt_eval_count") or 0)
+            total[2].append(ms)
+    if stub is not None:
+        stub.shutdown()
+
+    n = max(1, len(contexts))
+    print(f"{'variant':<10}{'est_tokens':>12}{'llm_tokens':>12}{'p50_ms':>10}{'p95_ms':>10}")
+    for name, (est, actual, latencies) in totals.items():
+        print(
+            f"{name:<10}{est / n:>12.0f}{actual / n:>12.0f}"
+            f"{statistics.median(latencies) if latencies else 0:>10.1f}{percentile(latencies, 95):>10.1f}"
+        )
+    raw, comp = totals["raw"], totals["compact"]
+    saved = 1 - comp[0] / raw[0] if raw[0] else 0.0
+    speedup = statistics.median(raw[2]) / statistics.median(comp[2]) if comp[2] and statistics.median(comp[2]) else 0.0
+    print(f"[BENCH-CONTEXT] prompt tokens saved={saved:.1%} generation p50 speedup={speedup:.2f}x")
+
+
+def bench_llm_pool(args) -> None:
+    """단일 LLM 호스트 vs 백엔드 풀: 두 모델 혼합 요청의 지연/콜드 로딩 횟수"""
+    project_root = Path(__file__).resolve().parents[1]
+    if str(project_root) not in sys.path:
+        sys.path.insert(0, str(project_root))
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from stub_llm_server import start_stub_server
+    from backend.app.llm import LLMClient
+    from backend.app.llm_pool import LLMBackendPool, parse_backends
+    from backend.app.settings import settings
+
+    models = args.models.split(",")
+    settings.LLM_ENABLED = True
+    print(
+        f"[BENCH-LLM-POOL] backends={args.backends} load_ms={args.load_ms} latency_ms={args.latency_ms} "
+        f"concurrency={args.concurrency} requests={args.requests} models={models}"
+    )
+    print(f"{'mode':<10}{'total':>8}{'errors':>8}{'rps':>10}{'p50_ms':>10}{'p95_ms':>10}{'p99_ms':>10}{'cold':>8}")
+    payloads = [models[i % len(models)] for i in range(args.requests)]
+    for mode in ("single", "pool"):
+        stubs = [
+            start_stub_server(latency_ms=args.latency_ms, load_ms=args.load_ms, max_loaded=1, name=f"s{i}", models=tuple(models))
+            for i in range(args.backends)
+        ]
+        urls = [f"http://127.0.0.1:{s.server_address[1]}" for s in stubs]
+        pool = None
+        if mode == "pool":
+            # 모델을 호스트에 순서대로 배정(호스트 수 > 모델 수면 모델을 반복 배정)
+            spec = ",".join(f"{u}={models[i % len(models)]}" for i, u in enumerate(urls))
+            pool = LLMBackendPool(parse_backends(spec), health_interval=1.0)
+            pool.probe_all()
+            # preload 완료 대기(첫 요청부터 상주 모델 사용)
+            time.sleep(args.load_ms / 1000.0 + 0.5)
+            pool.probe_all()
+        client = LLMClient(base_url=urls[0], timeout=int(args.timeout), stream=False)
+        client.pool = pool
+        cold_before = sum(s.state.cold_loads for s in stubs)
+
+        def call(model: str):
+            t0 = time.perf_counter()
+            try:
+                client.chat(prompt="bench", model=model, stream=False)
+                ok = True
+            except Exception:
+                ok = False
+            return ok, (time.perf_counter() - t0) * 1000.0
+
+        # cold: 측정 구간 중 모델 교체(콜드 로딩) 횟수(풀의 기동 시 preload 제외)
+        _run_load(
+            mode, call, payloads, args.concurrency,
+            extra=lambda: sum(s.state.cold_loads for s in stubs) - cold_before,
+        )
+        for s in stubs:
+            s.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_etl = sub.add_parser("etl", help="ETL 단계별 처리량 측정")
+    p_etl.add_argument("--data-dir", default="bench_data", help="CSV 데이터 디렉터리(MOCK_DB_DIR)")
+    p_etl.add_argument("--log-dir", default="", help="로그 디렉터리(was/, db/ 하위 포함)")
+    p_etl.add_argument("--days", type=int, default=7)
+    p_etl.add_argument("--vectordb", action="store_true", help="임베딩/pgvector 적재까지 측정")
+    p_etl.set_defaults(func=bench_etl)
+
+    p_api = sub.add_parser("api", help="/qa, /llm/chat 동시 부하 측정")
+    p_api.add_argument("--api-base", default="http://127.0.0.1:5443")
+    p_api.add_argument("--concurrency", type=int, default=16)
+    p_api.add_argument("--requests", type=int, default=200)
+    p_api.add_argument("--questions", default="", help="질문 jsonl 파일(requests.jsonl 등)")
+    p_api.add_argument("--endpoints", default="qa,llm", help="측정 대상(qa,qa_async,llm)")
+    p_api.add_argument("--top-k", type=int, default=5)
+    p_api.add_argument("--model", default="qwen3:8b")
+    p_api.add_argument("--timeout", type=float, default=120.0)
+    p_api.add_argument("--stub-llm", type=int, default=0, help="지정 포트로 로컬 LLM 대역 서버 실행")
+    p_api.add_argument("--stub-latency-ms", type=float, default=200.0)
+    p_api.set_defaults(func=bench_api)
+
+    p_ctx = sub.add_parser("context", help="LLM 컨텍스트 압축 전후 토큰/생성 시간 비교")
+    p_ctx.add_argument("--api-base", default="", help="지정 시 실제 /qa 결과를 컨텍스트로 사용")
+    p_ctx.add_argument("--data-dir", default="mock_data", help="--api-base 미지정 시 행을 뽑을 CSV 디렉터리")
+    p_ctx.add_argument("--date", default="", help="CSV 일자(YYYYMMDD, 미지정 시 최신)")
+    p_ctx.add_argument("--questions", default="", help="질문 jsonl 파일")
+    p_ctx.add_argument("--samples", type=int, default=20)
+    p_ctx.add_argument("--top-k", type=int, default=30)
+    p_ctx.add_argument("--budget", type=int, default=1500, help="압축 컨텍스트 토큰 예산(0 이하: 무제한)")
+    p_ctx.add_argument("--llm-url", default="", help="LLM 서버 주소(미지정 시 로컬 대역 서버)")
+    p_ctx.add_argument("--model", default="qwen3:8b")
+    p_ctx.add_argument("--timeout", type=float, default=120.0)
+    p_ctx.add_argument("--stub-latency-ms", type=float, default=50.0)
+    p_ctx.add_argument("--stub-per-char-ms", type=float, default=0.05, help="대역 서버 프롬프트 글자당 지연(ms)")
+    p_ctx.set_defaults(func=bench_context)
+
+    p_pool = sub.add_parser("llm-pool", help="단일 LLM 호스트 vs 백엔드 풀(모델 친화도/preload) 비교")
+    p_pool.add_argument("--backends", type=int, default=2, help="LLM 대역 서버 수")
+    p_pool.add_argument("--models", default="qwen3:8b,gemma3:27b-it-q4_0")
+    p_pool.add_argument("--load-ms", type=float, default=2000.0, help="모델 교체(콜드 로딩) 지연")
+    p_pool.add_argument("--latency-ms", type=float, default=100.0)
+    p_pool.add_argument("--concurrency", type=int, default=8)
+    p_pool.add_argument("--requests", type=int, default=100)
+    p_pool.add_argument("--timeout", type=float, default=120.0)
+    p_pool.set_defaults(func=bench_llm_pool)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
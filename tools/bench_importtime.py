@@ -0,0 +1,125 @@
+r"""
+엔트리포인트 임포트 시간 벤치마크(-X importtime)
+
+각 엔트리포인트 모듈을 새 인터프리터에서 `python -X importtime`으로 임포트하여
+- 모듈 누적 임포트 시간(ms, 반복 중 최솟값)
+- 임포트 시점에 로딩되면 안 되는 무거운 의존성(torch, sentence-transformers, oracledb, psycopg2 등)
+을 측정하고, 예산(budget) 초과 또는 금지 모듈 로딩 시 종료 코드 1을 반환한다(CI 기동 시간 회귀 감시용).
+
+사용 예시:
+    python tools/bench_importtime.py
+    python tools/bench_importtime.py --repeat 5 --budget-scale 1.5 --json importtime.json
+    python tools/bench_importtime.py --top 15          # 엔트리포인트별 누적 시간 상위 모듈 출력
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# 기동 시 로딩되면 안 되는 무거운 의존성(실제 사용 경로에서만 지연 임포트)
+HEAVY_COMMON = ("torch", "sentence_transformers", "transformers", "oracledb", "psycopg2")
+
+# 엔트리포인트: (임포트 모듈, 예산 ms, 금지 모듈)
+ENTRY_POINTS = {
+    "etl.pipeline": ("etl.pipeline", 800, HEAVY_COMMON),
+    "etl.sched": ("etl.sched", 1000, HEAVY_COMMON),
+    "ensure_schema": ("backend.app.db.vector", 600, HEAVY_COMMON),
+    "embed_service": ("backend.app.embed_service", 600, HEAVY_COMMON),
+    "api": ("backend.app.main", 1500, HEAVY_COMMON + ("pandas",)),
+}
+
+
+def _parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """'import time: self | cumulative | name' 라인을 (name, self_us, cumulative_us)로 파싱"""
+    out = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        # 이름 앞 공백(구분자 뒤 1칸 제외)은 중첩 깊이를 나타낸다
+        out.append((parts[2][1:].rstrip(), int(parts[0]), int(parts[1])))
+    return out
+
+
+def measure(module: str, forbidden: tuple) -> dict:
+    """새 인터프리터에서 1회 임포트 후 누적 시간과 로딩된 금지 모듈 반환"""
+    code = (
+        f"import {module}, sys, json; "
+        f"print(json.dumps([m for m in {list(forbidden)!r} if m in sys.modules]))"
+    )
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([str(ROOT), env.get("PYTHONPATH", "")]).rstrip(os.pathsep)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=str(ROOT),
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        tail = "\n".join(l for l in proc.stderr.splitlines() if not l.startswith("import time:"))[-2000:]
+        raise RuntimeError(f"import {module} failed:\n{tail}")
+    records = _parse_importtime(proc.stderr)
+    total_us = next((cum for name, _, cum in records if name.strip() == module and name == name.lstrip()), 0)
+    loaded = json.loads(proc.stdout.strip().splitlines()[-1])
+    return {"total_ms": total_us / 1000.0, "loaded_forbidden": loaded, "records": records}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3, help="엔트리포인트별 측정 반복 횟수(최솟값 사용)")
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="느린 머신/CI용 예산 배율")
+    parser.add_argument("--only", default="", help="측정할 엔트리포인트(콤마 구분, 기본: 전체)")
+    parser.add_argument("--top", type=int, default=0, help="누적 시간 상위 N개 하위 모듈 출력")
+    parser.add_argument("--json", default="", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    names = [n.strip() for n in args.only.split(",") if n.strip()] or list(ENTRY_POINTS)
+    results = {}
+    failed = False
+    for name in names:
+        module, budget_ms, forbidden = ENTRY_POINTS[name]
+        budget = budget_ms * args.budget_scale
+        runs = [measure(module, forbidden) for _ in range(max(1, args.repeat))]
+        best = min(runs, key=lambda r: r["total_ms"])
+        over = best["total_ms"] > budget
+        status = "OK"
+        if over:
+            status = "OVER_BUDGET"
+        if best["loaded_forbidden"]:
+            status = "HEAVY_IMPORT"
+        failed = failed or status != "OK"
+        results[name] = {
+            "module": module,
+            "import_ms": round(best["total_ms"], 1),
+            "budget_ms": round(budget, 1),
+            "loaded_forbidden": best["loaded_forbidden"],
+            "status": status,
+        }
+        heavy = ",".join(best["loaded_forbidden"]) or "-"
+        print(
+            f"[IMPORTTIME] {name:<14} {module:<28} {best['total_ms']:8.1f}ms "
+            f"budget={budget:.0f}ms heavy={heavy} {status}"
+        )
+        if args.top:
+            nested = sorted(
+                (r for r in best["records"] if r[0].strip() != module), key=lambda r: -r[2]
+            )[: args.top]
+            for mod_name, _, cum in nested:
+                print(f"    {cum / 1000.0:8.1f}ms {mod_name.strip()}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+r"""
+벡터 저장 모드 벤치마크 (vector / halfvec / binary quantize + 재정렬)
+
+documents 테이블에서 표본을 복사한 벤치마크 전용 테이블을 모드별로 만들고 다음을 비교한다.
+- 테이블+인덱스 크기(pg_total_relation_size)
+- 질의 지연시간 p50/p95/p99 (ms)
+- recall@k: 정확 검색(인덱스 미사용, float32) 결과 대비 일치율
+
+사용 예시:
+    python tools/bench_vector_storage.py --rows 100000 --queries 50 --top-k 10
+벤치마크 테이블(bench_vs_*)은 종료 시 삭제한다(--keep 지정 시 보존).
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+
+MODES = ("vector", "halfvec", "halfvec_bq")
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """최근접 순위 백분위(빈 목록은 0). bench_e2e와 공용"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def _build_table(cur, mode: str, rows: int, dim: int) -> str:
+    """모드별 벤치마크 테이블과 ANN 인덱스 생성"""
+    table = f"bench_vs_{mode}"
+    vtype = "vector" if mode == "vector" else "halfvec"
+    ops = "vector_cosine_ops" if vtype == "vector" else "halfvec_cosine_ops"
+    cur.execute(f"DROP TABLE IF EXISTS {table};")
+    cur.execute(
+        f"CREATE TABLE {table} AS SELECT id, embedding::{vtype}({dim}) AS embedding "
+        f"FROM documents ORDER BY id LIMIT %s;",
+        (rows,),
+    )
+    cur.execute(f"CREATE INDEX ON {table} USING ivfflat (embedding {ops});")
+    if mode.endswith("_bq"):
+        cur.execute(
+            f"CREATE INDEX ON {table} USING hnsw ((binary_quantize(embedding)::bit({dim})) bit_hamming_ops);"
+        )
+    cur.execute(f"ANALYZE {table};")
+    return table
+
+
+def _query_sql(mode: str, table: str, dim: int, rescore_factor: int) -> str:
+    if mode == "vector":
+        return f"SELECT id FROM {table} ORDER BY embedding <=> %(q)s::vector LIMIT %(k)s;"
+    if mode == "halfvec":
+        return f"SELECT id FROM {table} ORDER BY embedding <=> %(q)s::halfvec({dim}) LIMIT %(k)s;"
+    return (
+        f"SELECT id FROM (SELECT id, embedding FROM {table} "
+        f"ORDER BY binary_quantize(embedding)::bit({dim}) <~> binary_quantize(%(q)s::halfvec({dim})) "
+        f"LIMIT %(k)s * {rescore_factor}) c ORDER BY embedding::vector <=> %(q)s::vector LIMIT %(k)s;"
+    )
+
+
+def main() -> None:
+    project_root = Path(__file__).resolve().parents[1]
+    if str(project_root) not in sys.path:
+        sys.path.insert(0, str(project_root))
+    from backend.app.settings import settings
+    from backend.app.db.vector import get_pg_connection
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000, help="벤치마크 테이블에 복사할 행 수")
+    parser.add_argument("--queries", type=int, default=50, help="질의 수(기존 임베딩을 질의로 사용)")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--rescore-factor", type=int, default=settings.VECTORDB_RESCORE_FACTOR)
+    parser.add_argument("--keep", action="store_true", help="벤치마크 테이블 보존")
+    args = parser.parse_args()
+    dim = settings.EMBEDDING_DIM
+
+    with get_pg_connection() as conn:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT embedding::vector::text AS q FROM documents ORDER BY random() LIMIT %s;",
+                (args.queries,),
+            )
+            queries = [r["q"] for r in cur.fetchall()]
+            if not queries:
+                print("[BENCH] documents is empty; run ETL first")
+                return
+
+            tables = {mode: _build_table(cur, mode, args.rows, dim) for mode in MODES}
+
+            # 정답셋: float32 정확 검색(인덱스 미사용)
+            cur.execute("SET enable_indexscan = off;")
+            truth = []
+            for q in queries:
+                cur.execute(
+                    f"SELECT id FROM {tables['vector']} ORDER BY embedding <=> %s::vector LIMIT %s;",
+                    (q, args.top_k),
+                )
+                truth.append({r["id"] for r in cur.fetchall()})
+            cur.execute("SET enable_indexscan = on;")
+
+            print(f"[BENCH] rows={args.rows} queries={len(queries)} top_k={args.top_k} dim={dim}")
+            print(f"{'mode':<12}{'size_MB':>10}{'p50_ms':>10}{'p95_ms':>10}{'p99_ms':>10}{'recall':>10}")
+            for mode, table in tables.items():
+                cur.execute("SELECT pg_total_relation_size(%s) AS size;", (table,))
+                size_mb = cur.fetchone()["size"] / (1024 * 1024)
+                sql = _query_sql(mode, table, dim, args.rescore_factor)
+                latencies: list[float] = []
+                hits = 0
+                for q, expected in zip(queries, truth):
+                    t0 = time.perf_counter()
+                    cur.execute(sql, {"q": q, "k": args.top_k})
+                    got = {r["id"] for r in cur.fetchall()}
+                    latencies.append((time.perf_counter() - t0) * 1000.0)
+                    hits += len(got & expected)
+                recall = hits / float(len(queries) * args.top_k)
+                print(
+                    f"{mode:<12}{size_mb:>10.1f}{statistics.median(latencies):>10.2f}"
+                    f"{percentile(latencies, 95):>10.2f}{percentile(latencies, 99):>10.2f}{recall:>10.3f}"
+                )
+
+            if not args.keep:
+                for table in tables.values():
+                    cur.execute(f"DROP TABLE IF EXISTS {table};")
+
+
+if __name__ == "__main__":
+    main()
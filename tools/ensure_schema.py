@@ -1,3 +1,4 @@
+import argparse
 import sys
 from pathlib import Path
 
@@ -6,13 +7,25 @@ def main() -> None:
     project_root = Path(__file__).resolve().parents[1]
     if str(project_root) not in sys.path:
         sys.path.insert(0, str(project_root))
-    from backend.app.db.vector import ensure_schema
+    from backend.app.db.vector import ensure_schema, migrate_storage
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--migrate-storage",
+        action="store_true",
+        help="기존 documents.embedding 컬럼을 VECTORDB_STORAGE 타입(vector|halfvec)으로 변환",
+    )
+    args = parser.parse_args()
 
     ensure_schema()
+    if args.migrate_storage:
+        previous = migrate_storage()
+        if previous:
+            print(f"storage_migrated: {previous} -> current VECTORDB_STORAGE")
+        else:
+            print("storage_unchanged")
     print("schema_ok")
 
 
 if __name__ == "__main__":
     main()
-
-
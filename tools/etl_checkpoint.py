@@ -0,0 +1,54 @@
+r"""
+ETL 청크 체크포인트 조회/초기화
+- list: (일자, 소스)별 완료 청크 수/전체 청크 수, 완료 행 수, 마지막 커밋 시각
+- reset: 체크포인트 삭제 → 다음 ETL 실행에서 해당 (일자, 소스)를 처음부터 다시 임베딩/적재
+
+사용 예시:
+    python tools/etl_checkpoint.py list
+    python tools/etl_checkpoint.py list --date 20250910 --source mock_db
+    python tools/etl_checkpoint.py reset --date 20250910            # 해당 일자 전체 소스
+    python tools/etl_checkpoint.py reset --all
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+
+def main() -> None:
+    project_root = Path(__file__).resolve().parents[1]
+    if str(project_root) not in sys.path:
+        sys.path.insert(0, str(project_root))
+    from etl.checkpoint import list_checkpoints, reset_checkpoints
+
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_list = sub.add_parser("list", help="체크포인트 요약 출력")
+    p_reset = sub.add_parser("reset", help="체크포인트 삭제(다음 실행에서 전체 재적재)")
+    for p in (p_list, p_reset):
+        p.add_argument("--date", default=None, help="대상 일자(YYYYMMDD)")
+        p.add_argument("--source", default=None, help="대상 소스(documents.feed, 예: mock_db)")
+    p_reset.add_argument("--all", action="store_true", help="일자/소스 지정 없이 전체 삭제")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        rows = list_checkpoints(args.date, args.source)
+        if not rows:
+            print("no checkpoints")
+            return
+        print(f"{'date':<12}{'source':<12}{'chunks':>10}{'rows':>10}  {'state':<10}last_loaded_at")
+        for r in rows:
+            chunks = f"{r['chunks_done']}/{r['chunks_total']}"
+            # pending: 게시 대기(대기 테이블에 적재 중, 검색에는 이전 행이 보임)
+            state = "complete" if r["complete"] else ("pending" if r["pending"] else "partial")
+            print(f"{str(r['event_date']):<12}{r['feed']:<12}{chunks:>10}{r['rows_done']:>10}  {state:<10}{r['last_loaded_at']}")
+        return
+
+    if not (args.date or args.source or args.all):
+        parser.error("reset needs --date, --source or --all")
+    deleted = reset_checkpoints(args.date, args.source)
+    print(f"deleted {deleted} checkpoint chunks")
+
+
+if __name__ == "__main__":
+    main()
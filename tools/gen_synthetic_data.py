@@ -0,0 +1,185 @@
+r"""
+대용량 합성 모니터링 데이터 생성기
+
+mock_data와 동일한 포맷으로 운영 규모(수백 호스트 × 1주 × 1분 해상도)의 파일을 생성한다.
+- {out}/history_YYYYMMDD.csv        : 호스트별 1분 단위 성능 지표
+- {out}/event_history_YYYYMMDD.csv  : 시스템 이벤트
+- {out}/was_event_YYYYMMDD.csv      : WAS 이벤트
+- {out}/db_event_YYYYMMDD.csv       : DB 이벤트
+- {log_dir}/was/middleware_YYYYMMDD, {log_dir}/db/db_YYYYMMDD : 로그 파일(LOG_WAS/LOG_DB 수집용)
+
+사용 예시:
+    python tools/gen_synthetic_data.py --hosts 300 --days 7 --out-dir bench_data --log-dir bench_data/logs
+    # 이후 MOCK_DB_DIR=bench_data WAS_LOG_DIR=bench_data/logs/was DB_LOG_DIR=bench_data/logs/db 로 ETL 실행
+"""
+
+import argparse
+import csv
+import random
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+
+SYSTEM_EVENTS = [
+    ("INFO", "Service restarted"),
+    ("WARN", "Login failures detected"),
+    ("WARN", "Disk usage high on /data"),
+    ("ERROR", "OutOfMemory at service X"),
+    ("CRITICAL", "Ping lost to db-server"),
+]
+WAS_EVENTS = [
+    "TMAX JEUS Event Message: thread pool exhausted",
+    "TMAX JEUS Event Message: connection timeout",
+    "TMAX JEUS Event Message: JVM GC pause",
+    "TMAX JEUS Event Message: application restart",
+]
+DB_EVENTS = [
+    "Oracle ORA Event: ORA-01555 snapshot too old",
+    "Oracle ORA Event: ORA-00060 deadlock detected",
+    "Oracle ORA Event: ORA-1653 unable to extend table",
+    "Oracle ORA Event: ORA-12170 TNS:Connect timeout occurred",
+]
+
+
+class _HostState:
+    """호스트별 지표를 랜덤 워크로 생성(간헐적 스파이크 포함)"""
+
+    def __init__(self, rng: random.Random) -> None:
+        self.rng = rng
+        self.cpu = rng.uniform(10, 50)
+        self.mem = rng.uniform(20, 60)
+        self.swap = rng.uniform(0, 10)
+        self.fs = rng.uniform(20, 70)
+
+    @staticmethod
+    def _clamp(v: float) -> float:
+        return max(0.0, min(100.0, v))
+
+    def step(self, spike_rate: float) -> tuple[int, int, int, int, str]:
+        rng = self.rng
+        self.cpu = self._clamp(self.cpu + rng.gauss(0, 4))
+        self.mem = self._clamp(self.mem + rng.gauss(0, 1.5))
+        self.swap = self._clamp(self.swap + rng.gauss(0, 0.8))
+        self.fs = self._clamp(self.fs + rng.gauss(0.01, 0.2))
+        cpu = self.cpu
+        if rng.random() < spike_rate:
+            cpu = rng.uniform(85, 100)
+        ping = "LOSS" if rng.random() < spike_rate / 2 else "OK"
+        return int(cpu), int(self.mem), int(self.swap), int(self.fs), ping
+
+
+def _hosts(n: int) -> list[tuple[str, str]]:
+    """h1..hN 호스트명과 10.x.y.z IP 목록"""
+    out = []
+    for i in range(1, n + 1):
+        out.append((f"h{i}", f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}"))
+    return out
+
+
+def generate_day(
+    day: date,
+    hosts: list[tuple[str, str]],
+    out_dir: Path,
+    log_dir: Optional[Path],
+    interval_minutes: int,
+    event_rate: float,
+    spike_rate: float,
+    rng: random.Random,
+    states: dict[str, _HostState],
+) -> dict[str, int]:
+    """하루치 파일 생성 후 파일 종류별 행 수 반환"""
+    ds = day.strftime("%Y%m%d")
+    counts = {"history": 0, "event_history": 0, "was_event": 0, "db_event": 0}
+    # 기존 mock_data와 동일하게 BOM 포함 UTF-8로 저장
+    files = {
+        name: (out_dir / f"{name}_{ds}.csv").open("w", encoding="utf-8-sig", newline="")
+        for name in counts
+    }
+    logs = {}
+    if log_dir is not None:
+        (log_dir / "was").mkdir(parents=True, exist_ok=True)
+        (log_dir / "db").mkdir(parents=True, exist_ok=True)
+        logs["was"] = (log_dir / "was" / f"middleware_{ds}").open("w", encoding="utf-8")
+        logs["db"] = (log_dir / "db" / f"db_{ds}").open("w", encoding="utf-8")
+    try:
+        w = {name: csv.writer(f) for name, f in files.items()}
+        w["history"].writerow(
+            ["YYYYMMDDHHmmss", "Hostname", "IP", "CPU_Usage", "Memory_Usage", "Swap_Usage", "Filesystem_Usage", "Ping_Status"]
+        )
+        w["event_history"].writerow(["YYYYMMDDHHmmss", "Hostname", "IP", "Severity", "Event_Message"])
+        w["was_event"].writerow(["YYYYMMDDHHmmss", "Hostname", "Event_Message"])
+        w["db_event"].writerow(["YYYYMMDDHHmmss", "Hostname", "Event_Message"])
+
+        start = datetime.combine(day, datetime.min.time())
+        for minute in range(0, 24 * 60, interval_minutes):
+            ts_dt = start + timedelta(minutes=minute)
+            ts = ts_dt.strftime("%Y%m%d%H%M%S")
+            for host, ip in hosts:
+                cpu, mem, swap, fs, ping = states[host].step(spike_rate)
+                w["history"].writerow([ts, host, ip, cpu, mem, swap, fs, ping])
+                counts["history"] += 1
+                if rng.random() < event_rate:
+                    sev, msg = rng.choice(SYSTEM_EVENTS)
+                    w["event_history"].writerow([ts, host, ip, sev, msg])
+                    counts["event_history"] += 1
+                if rng.random() < event_rate:
+                    msg = rng.choice(WAS_EVENTS)
+                    w["was_event"].writerow([ts, host, msg])
+                    counts["was_event"] += 1
+                    if "was" in logs:
+                        sec = rng.randint(0, 59)
+                        logs["was"].write(f"{ds} {ts_dt.strftime('%H%M')}{sec:02d} {host} {msg}\n")
+                if rng.random() < event_rate:
+                    msg = rng.choice(DB_EVENTS)
+                    w["db_event"].writerow([ts, host, msg])
+                    counts["db_event"] += 1
+                    if "db" in logs:
+                        sec = rng.randint(0, 59)
+                        logs["db"].write(f"{ds} {ts_dt.strftime('%H%M')}{sec:02d} {host} {msg}\n")
+    finally:
+        for f in list(files.values()) + list(logs.values()):
+            f.close()
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hosts", type=int, default=100, help="호스트 수")
+    parser.add_argument("--days", type=int, default=7, help="생성 일수(종료일 포함 과거 방향)")
+    parser.add_argument("--end-date", default="", help="마지막 일자 YYYYMMDD (기본: 오늘)")
+    parser.add_argument("--interval-minutes", type=int, default=1, help="history 행 간격(분)")
+    parser.add_argument("--event-rate", type=float, default=0.002, help="호스트·분당 이벤트 발생 확률(종류별)")
+    parser.add_argument("--spike-rate", type=float, default=0.001, help="CPU 스파이크/Ping LOSS 발생 확률")
+    parser.add_argument("--out-dir", default="bench_data", help="CSV 출력 디렉터리(MOCK_DB_DIR)")
+    parser.add_argument("--log-dir", default="", help="로그 파일 출력 디렉터리(미지정 시 생성 안 함)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    end = datetime.strptime(args.end_date, "%Y%m%d").date() if args.end_date else datetime.now().date()
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    log_dir = Path(args.log_dir) if args.log_dir else None
+
+    rng = random.Random(args.seed)
+    hosts = _hosts(args.hosts)
+    states = {h: _HostState(rng) for h, _ in hosts}
+
+    total = 0
+    t0 = time.perf_counter()
+    for i in reversed(range(args.days)):
+        day = end - timedelta(days=i)
+        counts = generate_day(
+            day, hosts, out_dir, log_dir, args.interval_minutes, args.event_rate, args.spike_rate, rng, states
+        )
+        day_total = sum(counts.values())
+        total += day_total
+        detail = " ".join(f"{k}={v}" for k, v in counts.items())
+        print(f"[GEN] {day.strftime('%Y%m%d')} | {detail}")
+    elapsed = time.perf_counter() - t0
+    print(f"[GEN] done | hosts={args.hosts} days={args.days} rows={total} elapsed={elapsed:.1f}s -> {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+r"""
+로컬 LLM 대역(stand-in) 서버
+
+Ollama Chat API(`POST /api/chat`)와 모델 목록(`GET /api/tags`), 적재 모델 목록(`GET /api/ps`)을 흉내 내어
+사내 GPU 서버 없이 `/llm/chat` 부하 테스트/라우팅 테스트를 할 수 있게 한다.
+응답 지연은 고정 지연 + 프롬프트 길이 비례 지연으로 모사한다.
+--load-ms 지정 시 적재되지 않은 모델 요청에 콜드 로딩 지연을 더하고, GPU 메모리 한도(--max-loaded)를
+넘으면 가장 오래 쓰지 않은 모델을 내린다. keep_alive(초 또는 '30m' 형식, 0=즉시 해제)도 반영한다.
+prompt/messages 없는 `/api/generate` 요청은 Ollama처럼 모델 적재만 수행한다(preload).
+
+사용 예시:
+    python tools/stub_llm_server.py --port 11500 --latency-ms 200 --per-char-ms 0.05
+    python tools/stub_llm_server.py --port 11501 --load-ms 5000 --max-loaded 1
+    # API 서버는 LLM_ENABLED=true LLM_BASE_URL=http://127.0.0.1:11500 으로 실행
+    # 또는 LLM_BACKENDS=http://127.0.0.1:11500=qwen3:8b,http://127.0.0.1:11501=gemma3:27b-it-q4_0
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+class _StubConfig:
+    latency_ms: float = 200.0
+    per_char_ms: float = 0.0
+    models: tuple = ("qwen3:8b", "gemma3:27b-it-q4_0")
+    name: str = "stub"
+    # 콜드 로딩 지연(ms, 0이면 적재 모사 안 함)과 동시 적재 가능 모델 수
+    load_ms: float = 0.0
+    max_loaded: int = 1
+    default_keep_alive: float = 300.0
+
+
+def _parse_keep_alive(value, default: float) -> float:
+    """keep_alive 값(초 숫자 또는 '30s'/'5m'/'1h', 음수=무기한)을 초로 변환"""
+    if value is None or value == "":
+        return default
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip()
+    units = {"s": 1, "m": 60, "h": 3600}
+    try:
+        if text[-1:] in units:
+            return float(text[:-1]) * units[text[-1]]
+        return float(text)
+    except ValueError:
+        return default
+
+
+class _ModelState:
+    """적재 모델 상태(모델명 → 만료 시각)와 콜드 로딩 횟수"""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.loaded: dict[str, float] = {}
+        self.last_used: dict[str, float] = {}
+        self.cold_loads = 0
+
+    def ensure(self, model: str, config: "_StubConfig", keep_alive) -> float:
+        """모델 적재(필요 시 가장 오래 안 쓴 모델 해제). 콜드 로딩 지연(ms) 반환"""
+        if config.load_ms <= 0:
+            return 0.0
+        ttl = _parse_keep_alive(keep_alive, config.default_keep_alive)
+        now = time.monotonic()
+        with self.lock:
+            for m, expires in list(self.loaded.items()):
+                if expires <= now:
+                    del self.loaded[m]
+            cold = model not in self.loaded
+            if cold:
+                while len(self.loaded) >= max(1, config.max_loaded):
+                    victim = min(self.loaded, key=lambda m: self.last_used.get(m, 0.0))
+                    del self.loaded[victim]
+                self.cold_loads += 1
+            self.loaded[model] = now + ttl if ttl >= 0 else float("inf")
+            self.last_used[model] = now
+        return config.load_ms if cold else 0.0
+
+    def resident(self) -> list[str]:
+        now = time.monotonic()
+        with self.lock:
+            return [m for m, expires in self.loaded.items() if expires > now]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    config = _StubConfig()
+    state = _ModelState()
+
+    def log_message(self, fmt, *args):  # noqa: D401 - 기본 접근 로그 출력 억제
+        return
+
+    def _send_json(self, status: int, body: dict) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):  # noqa: N802
+        if self.path.rstrip("/") == "/api/tags":
+            self._send_json(200, {"models": [{"name": m} for m in self.config.models]})
+            return
+        if self.path.rstrip("/") == "/api/ps":
+            self._send_json(200, {"models": [{"name": m} for m in self.state.resident()]})
+            return
+        self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):  # noqa: N802
+        length = int(self.headers.get("Content-Length", "0") or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except Exception:
+            self._send_json(400, {"error": "invalid json"})
+            return
+        path = self.path.rstrip("/")
+        if path not in ("/api/chat", "/api/generate"):
+            self._send_json(404, {"error": "not found"})
+            return
+        messages = payload.get("messages") or []
+        prompt = payload.get("prompt") or (messages[-1].get("content", "") if messages else "")
+        model = payload.get("model") or self.config.models[0]
+        if model not in self.config.models:
+            self._send_json(404, {"error": f"model '{model}' not found"})
+            return
+        load_ms = self.state.ensure(model, self.config, payload.get("keep_alive"))
+        if path == "/api/generate" and not prompt:
+            # Ollama: 프롬프트 없는 generate = 모델 적재(preload)만 수행
+            time.sleep(load_ms / 1000.0)
+            self._send_json(200, {"model": model, "response": "", "done": True, "load_duration": int(load_ms * 1e6)})
+            return
+        delay = load_ms + self.config.latency_ms + self.config.per_char_ms * len(prompt)
+        time.sleep(delay / 1000.0)
+        text = f"[{self.config.name}] {prompt[:80]}"
+        if path == "/api/generate":
+            self._send_json(200, {"model": model, "response": text, "done": True})
+            return
+        self._send_json(
+            200,
+            {
+                "model": model,
+                "message": {"role": "assistant", "content": text},
+                "done": True,
+                "prompt_eval_count": len(prompt) // 4,
+                "eval_count": len(text) // 4,
+                "total_duration": int(delay * 1e6),
+                "load_duration": int(load_ms * 1e6),
+            },
+        )
+
+
+def start_stub_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    latency_ms: float = 200.0,
+    per_char_ms: float = 0.0,
+    name: str = "stub",
+    models: Optional[tuple] = None,
+    load_ms: float = 0.0,
+    max_loaded: int = 1,
+) -> ThreadingHTTPServer:
+    """백그라운드 스레드에서 대역 서버 시작 후 서버 객체 반환(port=0이면 임의 포트)
+
+    종료는 server.shutdown() 호출. 콜드 로딩 횟수는 server.state.cold_loads
+    """
+    config = _StubConfig()
+    config.latency_ms = latency_ms
+    config.per_char_ms = per_char_ms
+    config.name = name
+    config.load_ms = load_ms
+    config.max_loaded = max_loaded
+    if models:
+        config.models = tuple(models)
+    state = _ModelState()
+    handler = type("StubHandler", (_Handler,), {"config": config, "state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.state = state
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="요청당 고정 지연(ms)")
+    parser.add_argument("--per-char-ms", type=float, default=0.0, help="프롬프트 글자당 추가 지연(ms)")
+    parser.add_argument("--name", default="stub", help="응답 텍스트에 표시할 서버 이름")
+    parser.add_argument("--load-ms", type=float, default=0.0, help="미적재 모델 콜드 로딩 지연(ms)")
+    parser.add_argument("--max-loaded", type=int, default=1, help="동시에 적재 가능한 모델 수")
+    args = parser.parse_args()
+
+    server = start_stub_server(
+        args.host, args.port, args.latency_ms, args.per_char_ms, args.name,
+        load_ms=args.load_ms, max_loaded=args.max_loaded,
+    )
+    print(f"[STUB-LLM] listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+r"""
+VectorDB 유지보수 실행
+- 보존 기간 밖 파티션/레거시 행 정리 → VACUUM ANALYZE → 행 수 변화율 기반 ANN 인덱스 재구성
+- 실행 전/후 테이블·인덱스 크기와 프로브 질의 지연시간을 출력한다.
+
+사용 예시:
+    python tools/vector_maintenance.py --dry-run          # 대상만 확인
+    python tools/vector_maintenance.py                    # 실행
+    python tools/vector_maintenance.py --force-reindex --json maint.json
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def main() -> None:
+    project_root = Path(__file__).resolve().parents[1]
+    if str(project_root) not in sys.path:
+        sys.path.insert(0, str(project_root))
+    from backend.app.db.maintenance import print_report, run_maintenance
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true", help="변경 없이 정리/재구성 대상만 보고")
+    parser.add_argument("--force-reindex", action="store_true", help="변화율과 무관하게 모든 ANN 인덱스 재구성")
+    parser.add_argument("--no-vacuum", action="store_true", help="VACUUM ANALYZE 생략")
+    parser.add_argument("--no-retention", action="store_true", help="보존 기간 정리 생략")
+    parser.add_argument("--json", default="", help="보고서 JSON 저장 경로")
+    args = parser.parse_args()
+
+    report = run_maintenance(
+        dry_run=args.dry_run,
+        force_reindex=args.force_reindex,
+        vacuum=not args.no_vacuum,
+        retention=False if args.no_retention else None,
+    )
+    print_report(report)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, ensure_ascii=False, indent=2, default=str), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()